@@ -0,0 +1,250 @@
+"""Local stand-in for the Home Assistant WebSocket API.
+
+Serves a synthetic install (see fixtures.make_install) over the same
+WebSocket protocol the add-on uses: auth, get_states, the area, entity
+and device registries, call_service, logbook/get_events and
+subscribe_events, plus a configurable stream of random state_changed
+events for storm and soak tests.
+
+    python3 ha-minitel/bench/fake_ha.py --entities 10000 --areas 300 --event-rate 200
+    SUPERVISOR_TOKEN=bench python3 ha-minitel/rootfs/usr/share/ha-minitel/main.py \\
+        --ha-url ws://127.0.0.1:8123/api/websocket
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import copy
+import json
+import logging
+import random
+from datetime import datetime, timezone
+
+import websockets
+
+from fixtures import make_install
+
+logger = logging.getLogger("fake_ha")
+
+HA_VERSION = "2026.10.0"
+
+# Service -> new state, for the services the add-on calls
+SERVICE_STATES = {
+    "turn_on": "on",
+    "turn_off": "off",
+    "open_cover": "open",
+    "close_cover": "closed",
+}
+
+
+def now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+class FakeHAServer:
+    """Serves one synthetic install to any number of clients."""
+
+    def __init__(
+        self,
+        install: dict,
+        port: int = 8123,
+        token: str = "",
+        event_rate: float = 0.0,
+        latency: float = 0.0,
+        seed: int = 3615,
+    ):
+        self.install = copy.deepcopy(install)
+        self.port = port
+        self.token = token
+        self.event_rate = event_rate
+        self.latency = latency
+        self._rng = random.Random(seed)
+        self._states = {s["entity_id"]: s for s in self.install["states"]}
+        self._subscribers: dict = {}  # connection -> {event type: subscription id}
+        self.events_sent = 0
+        self.commands = 0
+
+    async def serve(self):
+        async with websockets.serve(self._handler, "127.0.0.1", self.port, max_size=None):
+            logger.info("Fake HA on ws://127.0.0.1:%d/api/websocket (%d entities, %d areas)",
+                        self.port, len(self._states), len(self.install["areas"]))
+            if self.event_rate > 0:
+                await self._event_storm()
+            else:
+                await asyncio.Future()
+
+    async def _handler(self, ws):
+        await ws.send(json.dumps({"type": "auth_required", "ha_version": HA_VERSION}))
+        auth = json.loads(await ws.recv())
+        if auth.get("type") != "auth" or (self.token and auth.get("access_token") != self.token):
+            await ws.send(json.dumps({"type": "auth_invalid", "message": "Invalid access token"}))
+            return
+        await ws.send(json.dumps({"type": "auth_ok", "ha_version": HA_VERSION}))
+        try:
+            async for raw in ws:
+                msg = json.loads(raw)
+                self.commands += 1
+                if self.latency:
+                    await asyncio.sleep(self.latency)
+                await self._dispatch(ws, msg)
+        except websockets.exceptions.ConnectionClosed:
+            pass
+        finally:
+            self._subscribers.pop(ws, None)
+
+    async def _dispatch(self, ws, msg: dict):
+        msg_id = msg.get("id")
+        kind = msg.get("type")
+        if kind == "ping":
+            await ws.send(json.dumps({"id": msg_id, "type": "pong"}))
+            return
+        if kind == "subscribe_events":
+            self._subscribers.setdefault(ws, {})[msg.get("event_type") or "*"] = msg_id
+            await self._result(ws, msg_id, None)
+            return
+        if kind == "call_service":
+            changed = self._call_service(msg)
+            await self._result(ws, msg_id, {"context": {"id": f"ctx{msg_id}"}})
+            for entity_id, old in changed:
+                await self._broadcast(entity_id, old)
+            return
+        results = {
+            "get_states": lambda: list(self._states.values()),
+            "config/area_registry/list": lambda: self.install["areas"],
+            "config/entity_registry/list": lambda: self.install["entities"],
+            "config/device_registry/list": lambda: self.install["devices"],
+            "logbook/get_events": lambda: self.install["logbook"],
+        }
+        if kind in results:
+            await self._result(ws, msg_id, results[kind]())
+        else:
+            await ws.send(json.dumps({
+                "id": msg_id, "type": "result", "success": False,
+                "error": {"code": "unknown_command", "message": f"Unknown command: {kind}"},
+            }))
+
+    async def _result(self, ws, msg_id, result):
+        await ws.send(json.dumps({"id": msg_id, "type": "result", "success": True, "result": result}))
+
+    def _targets(self, msg: dict) -> list[str]:
+        target = msg.get("target", {})
+        entity_ids = target.get("entity_id", [])
+        if isinstance(entity_ids, str):
+            entity_ids = [entity_ids]
+        area_ids = target.get("area_id", [])
+        if isinstance(area_ids, str):
+            area_ids = [area_ids]
+        if area_ids:
+            device_area = {d["id"]: d.get("area_id") for d in self.install["devices"]}
+            for ent in self.install["entities"]:
+                area = ent.get("area_id") or device_area.get(ent.get("device_id"))
+                if area in area_ids and ent["entity_id"].startswith(msg["domain"] + "."):
+                    entity_ids.append(ent["entity_id"])
+        return [e for e in entity_ids if e in self._states]
+
+    def _call_service(self, msg: dict) -> list[tuple[str, dict]]:
+        """Apply a service call to the install; return (entity_id, old_state) pairs."""
+        service = msg.get("service", "")
+        data = msg.get("service_data", {})
+        changed = []
+        for entity_id in self._targets(msg):
+            old = self._states[entity_id]
+            new = copy.deepcopy(old)
+            if service == "toggle":
+                new["state"] = "off" if old["state"] in ("on", "open") else "on"
+            elif service in SERVICE_STATES:
+                new["state"] = SERVICE_STATES[service]
+            elif service == "set_cover_position":
+                new["attributes"]["current_position"] = data.get("position", 0)
+                new["state"] = "open" if data.get("position", 0) > 0 else "closed"
+            elif service == "trigger":
+                new["attributes"]["last_triggered"] = now()
+            for key, value in data.items():
+                if key != "position":
+                    new["attributes"][key] = value
+            new["last_changed"] = now()
+            self._states[entity_id] = new
+            changed.append((entity_id, old))
+        return changed
+
+    async def _broadcast(self, entity_id: str, old_state: dict):
+        new_state = self._states[entity_id]
+        for ws, subscriptions in list(self._subscribers.items()):
+            sub_id = subscriptions.get("state_changed", subscriptions.get("*"))
+            if sub_id is None:
+                continue
+            try:
+                await ws.send(json.dumps({
+                    "id": sub_id,
+                    "type": "event",
+                    "event": {
+                        "event_type": "state_changed",
+                        "data": {"entity_id": entity_id, "old_state": old_state, "new_state": new_state},
+                        "origin": "LOCAL",
+                        "time_fired": new_state["last_changed"],
+                    },
+                }))
+                self.events_sent += 1
+            except websockets.exceptions.ConnectionClosed:
+                self._subscribers.pop(ws, None)
+
+    def random_change(self) -> tuple[str, dict]:
+        """Mutate a random entity like a real device would."""
+        entity_id = self._rng.choice(list(self._states))
+        old = self._states[entity_id]
+        new = copy.deepcopy(old)
+        if entity_id.startswith("sensor."):
+            new["state"] = f"{float(old['state']) + self._rng.uniform(-0.3, 0.3):.1f}"
+        elif old["state"] in ("on", "off"):
+            new["state"] = "off" if old["state"] == "on" else "on"
+        elif old["state"] in ("open", "closed"):
+            new["state"] = "closed" if old["state"] == "open" else "open"
+        new["last_changed"] = now()
+        self._states[entity_id] = new
+        return entity_id, old
+
+    async def _event_storm(self):
+        """Emit random state_changed events at event_rate per second."""
+        loop = asyncio.get_running_loop()
+        interval = 1.0 / self.event_rate
+        next_at = loop.time()
+        while True:
+            next_at += interval
+            if self._subscribers:
+                await self._broadcast(*self.random_change())
+            delay = next_at - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            elif delay < -1.0:
+                next_at = loop.time()  # falling behind: don't burst to catch up
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake Home Assistant WebSocket API for benchmarks")
+    parser.add_argument("--port", type=int, default=8123)
+    parser.add_argument("--token", default="", help="Required access token (any if empty)")
+    parser.add_argument("--areas", type=int, default=30)
+    parser.add_argument("--entities", type=int, default=1000)
+    parser.add_argument("--event-rate", type=float, default=0.0, help="state_changed events per second")
+    parser.add_argument("--latency", type=float, default=0.0, help="Delay before each reply (s)")
+    parser.add_argument("--seed", type=int, default=3615)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(name)s: %(message)s")
+
+    server = FakeHAServer(
+        make_install(args.areas, args.entities, args.seed),
+        port=args.port,
+        token=args.token,
+        event_rate=args.event_rate,
+        latency=args.latency,
+        seed=args.seed,
+    )
+    try:
+        asyncio.run(server.serve())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
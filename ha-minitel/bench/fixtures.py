@@ -0,0 +1,104 @@
+"""Synthetic Home Assistant installs and an in-process HA client for benchmarks."""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "rootfs", "usr", "share", "ha-minitel"))
+
+from ha_minitel.ha_client.client import HAClient  # noqa: E402
+
+# Domain -> (share of entities, state choices, attributes factory)
+DOMAINS = {
+    "light": (0.25, ["on", "off"], lambda r: {"brightness": r.randint(0, 255)}),
+    "switch": (0.10, ["on", "off"], lambda r: {}),
+    "sensor": (0.25, None, lambda r: {"device_class": "temperature", "unit_of_measurement": "°C"}),
+    "binary_sensor": (0.10, ["on", "off"], lambda r: {"device_class": "door"}),
+    "cover": (0.08, ["open", "closed"], lambda r: {"current_position": r.randint(0, 100)}),
+    "climate": (0.05, ["heat", "off"], lambda r: {"temperature": r.randint(16, 24)}),
+    "fan": (0.03, ["on", "off"], lambda r: {"percentage": r.randint(0, 100)}),
+    "automation": (0.08, ["on", "off"], lambda r: {}),
+    "script": (0.03, ["off"], lambda r: {}),
+    "scene": (0.03, ["scening"], lambda r: {}),
+}
+
+ROOM_NAMES = [
+    "Salon", "Cuisine", "Chambre", "Bureau", "Entrée", "Garage", "Cave",
+    "Jardin", "Grenier", "Salle de bain", "Buanderie", "Véranda",
+]
+
+
+def make_install(n_areas: int = 8, n_entities: int = 120, seed: int = 3615) -> dict:
+    """Generate a deterministic install: areas, registries and states."""
+    rng = random.Random(seed)
+    areas = []
+    for i in range(n_areas):
+        base = ROOM_NAMES[i % len(ROOM_NAMES)]
+        name = base if i < len(ROOM_NAMES) else f"{base} {i // len(ROOM_NAMES) + 1}"
+        areas.append({"area_id": f"area_{i}", "name": name})
+
+    domains = list(DOMAINS)
+    weights = [DOMAINS[d][0] for d in domains]
+    devices, registry, states = [], [], []
+    for i in range(n_entities):
+        domain = rng.choices(domains, weights)[0]
+        _, choices, attrs = DOMAINS[domain]
+        entity_id = f"{domain}.{domain}_{i}"
+        area_id = areas[i % n_areas]["area_id"] if n_areas else None
+        # Half the entities get their area through a device
+        if i % 2:
+            device_id = f"device_{i}"
+            devices.append({"id": device_id, "area_id": area_id})
+            registry.append({"entity_id": entity_id, "device_id": device_id, "area_id": None})
+        else:
+            registry.append({"entity_id": entity_id, "device_id": None, "area_id": area_id})
+        state = rng.choice(choices) if choices else f"{rng.uniform(15, 25):.1f}"
+        attributes = {"friendly_name": f"{domain.replace('_', ' ').title()} {i}"}
+        attributes.update(attrs(rng))
+        states.append({
+            "entity_id": entity_id,
+            "state": state,
+            "attributes": attributes,
+            "last_changed": "2026-01-01T00:00:00+00:00",
+        })
+
+    logbook = [
+        {"name": s["attributes"]["friendly_name"], "entity_id": s["entity_id"], "message": f"turned {s['state']}"}
+        for s in states[:60]
+    ]
+    return {
+        "areas": areas,
+        "devices": devices,
+        "entities": registry,
+        "states": states,
+        "logbook": logbook,
+    }
+
+
+class StaticHAClient(HAClient):
+    """HAClient answering commands from a fixed install, without a network."""
+
+    def __init__(self, install: dict, latency: float = 0.0):
+        super().__init__("static://", "")
+        self.install = install
+        self.latency = latency
+        self._connected = True
+
+    async def _send_command(self, payload: dict, on_result=None) -> dict:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        kind = payload["type"]
+        result = {
+            "get_states": lambda: self.install["states"],
+            "config/area_registry/list": lambda: self.install["areas"],
+            "config/entity_registry/list": lambda: self.install["entities"],
+            "config/device_registry/list": lambda: self.install["devices"],
+            "logbook/get_events": lambda: self.install["logbook"],
+        }.get(kind, lambda: None)()
+        msg = {"id": payload.get("id", 0), "type": "result", "success": True, "result": result}
+        if on_result:
+            on_result(msg)
+        return msg
@@ -0,0 +1,314 @@
+"""Load generator: many simulated Minitels replaying keystroke scripts.
+
+Runs the session manager and a WebSocket (or raw TCP) server in a
+dedicated thread against a synthetic Home Assistant (in-process, or the
+real HAClient talking to fake_ha.py with --ha fake), then connects N
+clients from the main thread. Each client replays a script of
+keys and measures, per keypress, the time until the last byte of the
+response (the response is over once the link stays quiet for --settle
+ms). Nothing leaves the machine.
+
+    python3 ha-minitel/bench/loadgen.py --clients 50 --script "1 SUITE RETOUR SOMMAIRE 9 0"
+    python3 ha-minitel/bench/loadgen.py --ha fake --entities 10000 --areas 300 --event-rate 500
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import socket
+import statistics
+import sys
+import threading
+import time
+
+from fake_ha import FakeHAServer
+from fixtures import StaticHAClient, make_install
+
+from ha_minitel.ha_client.client import HAClient
+from ha_minitel.i18n import I18n
+from ha_minitel.protocol import constants as C
+from ha_minitel.protocol.videotex import VideotexProtocol
+from ha_minitel.session import SessionManager
+from ha_minitel.transport.tcp_server import TcpServer
+from ha_minitel.transport.websocket_server import WebSocketServer
+
+KEYS = {
+    "ENVOI": bytes([C.SEP, C.FKEY_ENVOI]),
+    "RETOUR": bytes([C.SEP, C.FKEY_RETOUR]),
+    "REPETITION": bytes([C.SEP, C.FKEY_REPETITION]),
+    "GUIDE": bytes([C.SEP, C.FKEY_GUIDE]),
+    "ANNULATION": bytes([C.SEP, C.FKEY_ANNULATION]),
+    "SOMMAIRE": bytes([C.SEP, C.FKEY_SOMMAIRE]),
+    "CORRECTION": bytes([C.SEP, C.FKEY_CORRECTION]),
+    "SUITE": bytes([C.SEP, C.FKEY_SUITE]),
+}
+
+DEFAULT_SCRIPT = "1 SUITE RETOUR 1 ENVOI RETOUR SOMMAIRE 9 SUITE SOMMAIRE 0 SOMMAIRE"
+
+
+def parse_script(script: str) -> list[tuple[str, bytes]]:
+    """Turn "1 SUITE 12 ENVOI" into (label, bytes) keypresses."""
+    keys = []
+    for token in script.split():
+        upper = token.upper()
+        if upper in KEYS:
+            keys.append((upper, KEYS[upper]))
+        else:
+            keys.extend((ch, ch.encode("latin-1")) for ch in token)
+    return keys
+
+
+def percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered) + 0.5) - 1))
+    return ordered[index]
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class ServerThread(threading.Thread):
+    """Runs the add-on's session stack on its own event loop and thread."""
+
+    def __init__(self, transport: str, port: int, install: dict, ha_latency: float,
+                 fake_ha: bool = False, event_rate: float = 0.0):
+        super().__init__(daemon=True)
+        self.transport = transport
+        self.port = port
+        self.install = install
+        self.ha_latency = ha_latency
+        self.fake_ha = fake_ha
+        self.event_rate = event_rate
+        self.loop = asyncio.new_event_loop()
+        self.ready = threading.Event()
+        self.server = None
+        self.ha_server = None
+        self.cpu_start = 0.0
+        self._tasks: list[asyncio.Task] = []
+
+    def run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_until_complete(self._start())
+        self.loop.call_later(0.2, self.ready.set)
+        self.cpu_start = time.thread_time()
+        self.loop.run_forever()
+
+    async def _start(self):
+        if self.fake_ha:
+            # Real HAClient over a local WebSocket, events included
+            self.ha_server = FakeHAServer(self.install, port=free_port(),
+                                          event_rate=self.event_rate, latency=self.ha_latency)
+            self._tasks.append(asyncio.create_task(self.ha_server.serve()))
+            await asyncio.sleep(0.1)
+            ha_client = HAClient(f"ws://127.0.0.1:{self.ha_server.port}/api/websocket", "")
+            await ha_client.connect()
+        else:
+            ha_client = StaticHAClient(self.install, latency=self.ha_latency)
+        manager = SessionManager(
+            ha_client=ha_client,
+            protocol=VideotexProtocol(),
+            i18n=I18n("fr"),
+        )
+        if self.fake_ha:
+            self._tasks.append(asyncio.create_task(ha_client.recv_loop(manager.on_state_changed)))
+        server_cls = WebSocketServer if self.transport == "ws" else TcpServer
+        self.server = server_cls(
+            port=self.port,
+            on_connect=manager.on_transport_connected,
+            on_disconnect=manager.on_transport_disconnected,
+        )
+        self._tasks.append(asyncio.create_task(self.server.serve()))
+
+    def cpu_seconds(self) -> float:
+        """CPU time used by the server thread since it started."""
+        future = asyncio.run_coroutine_threadsafe(self._cpu(), self.loop)
+        return future.result()
+
+    async def _cpu(self) -> float:
+        return time.thread_time() - self.cpu_start
+
+    def stop(self):
+        asyncio.run_coroutine_threadsafe(self._shutdown(), self.loop).result()
+        self.join()
+
+    async def _shutdown(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self.loop.call_soon(self.loop.stop)
+
+
+class Client:
+    """One simulated terminal."""
+
+    def __init__(self, transport: str, port: int, rom: bytes, settle: float, first_byte: float):
+        self.transport = transport
+        self.port = port
+        self.rom = rom
+        self.settle = settle
+        self.first_byte = first_byte
+        self.samples: list[tuple[str, float, int]] = []
+        self._ws = None
+        self._reader = None
+        self._writer = None
+
+    async def connect(self):
+        if self.transport == "ws":
+            import websockets
+            self._ws = await websockets.connect(f"ws://127.0.0.1:{self.port}", compression=None)
+        else:
+            self._reader, self._writer = await asyncio.open_connection("127.0.0.1", self.port)
+        # Answer the ROM identification like a real terminal would
+        first = await self._recv(5.0)
+        if self.rom and first and b"\x1b\x39\x7b" in first:
+            await self._send(b"\x01" + self.rom + b"\x04")
+        # The home screen does not wait for the answer
+        await self._read_response(first_timeout=5.0)
+
+    async def close(self):
+        if self._ws:
+            await self._ws.close()
+        elif self._writer:
+            self._writer.close()
+
+    async def _send(self, data: bytes):
+        if self._ws:
+            await self._ws.send(data)
+        else:
+            self._writer.write(data)
+            await self._writer.drain()
+
+    async def _recv(self, timeout: float) -> bytes:
+        try:
+            if self._ws:
+                data = await asyncio.wait_for(self._ws.recv(), timeout)
+                return data if isinstance(data, bytes) else data.encode("latin-1")
+            return await asyncio.wait_for(self._reader.read(65536), timeout)
+        except asyncio.TimeoutError:
+            return b""
+
+    async def _read_response(self, first_timeout: float | None = None) -> tuple[float, int]:
+        """Read until the link is quiet; return (time of last byte, byte count)."""
+        last = time.perf_counter()
+        total = 0
+        while True:
+            data = await self._recv(first_timeout if first_timeout and not total else self.settle)
+            if not data:
+                return last, total
+            last = time.perf_counter()
+            total += len(data)
+
+    async def run_script(self, keys: list[tuple[str, bytes]], iterations: int):
+        for _ in range(iterations):
+            for label, data in keys:
+                start = time.perf_counter()
+                await self._send(data)
+                last, total = await self._read_response(first_timeout=self.first_byte)
+                self.samples.append((label, (last - start) * 1000 if total else 0.0, total))
+
+
+async def run_clients(args, keys) -> list[Client]:
+    clients = [Client(args.transport, args.port, args.rom.encode(), args.settle / 1000, args.first_byte / 1000)
+               for _ in range(args.clients)]
+    # Connect in small batches: a burst of handshakes is a different test
+    for i in range(0, len(clients), 20):
+        await asyncio.gather(*(c.connect() for c in clients[i:i + 20]))
+    await asyncio.gather(*(c.run_script(keys, args.iterations) for c in clients))
+    await asyncio.gather(*(c.close() for c in clients))
+    return clients
+
+
+def report(clients: list[Client], cpu: float, wall: float, server, ha_server=None) -> dict:
+    by_key: dict[str, list[tuple[float, int]]] = {}
+    for client in clients:
+        for label, latency, size in client.samples:
+            by_key.setdefault(label, []).append((latency, size))
+
+    def summary(samples):
+        latencies = [l for l, size in samples if size]
+        sizes = [size for _, size in samples]
+        return {
+            "count": len(samples),
+            "p50_ms": round(percentile(latencies, 50), 2),
+            "p90_ms": round(percentile(latencies, 90), 2),
+            "p99_ms": round(percentile(latencies, 99), 2),
+            "max_ms": round(max(latencies, default=0.0), 2),
+            "bytes_mean": round(statistics.fmean(sizes), 1) if sizes else 0,
+        }
+
+    all_samples = [s for samples in by_key.values() for s in samples]
+    return {
+        "clients": len(clients),
+        "keypresses": len(all_samples),
+        "wall_s": round(wall, 2),
+        "server_cpu_s": round(cpu, 3),
+        "server_cpu_ms_per_key": round(cpu * 1000 / max(1, len(all_samples)), 3),
+        "overall": summary(all_samples),
+        "keys": {label: summary(samples) for label, samples in by_key.items()},
+        "server_stats": vars(server.stats) if server is not None else {},
+        "ha_events": ha_server.events_sent if ha_server is not None else 0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate many Minitel clients against ha-minitel")
+    parser.add_argument("--clients", type=int, default=10)
+    parser.add_argument("--transport", choices=["ws", "tcp"], default="ws")
+    parser.add_argument("--script", default=DEFAULT_SCRIPT,
+                        help="Keys separated by spaces: digits, letters, ENVOI, SUITE, RETOUR, SOMMAIRE...")
+    parser.add_argument("--iterations", type=int, default=1)
+    parser.add_argument("--settle", type=float, default=50, help="Quiet gap (ms) that ends a response")
+    parser.add_argument("--first-byte", type=float, default=2000,
+                        help="Longest wait (ms) for a response to start; keys without output cost this much")
+    parser.add_argument("--rom", default="Cv4", help="ROM id to answer with ('' to stay silent)")
+    parser.add_argument("--areas", type=int, default=8)
+    parser.add_argument("--entities", type=int, default=200)
+    parser.add_argument("--ha-latency", type=float, default=0.002, help="Simulated HA round trip (s)")
+    parser.add_argument("--ha", choices=["static", "fake"], default="static",
+                        help="In-process HA, or the real HAClient against fake_ha.py")
+    parser.add_argument("--event-rate", type=float, default=0.0,
+                        help="state_changed events per second (--ha fake only)")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+    args.port = free_port()
+    logging.basicConfig(level=logging.WARNING)
+
+    keys = parse_script(args.script)
+    server = ServerThread(args.transport, args.port, make_install(args.areas, args.entities), args.ha_latency,
+                          fake_ha=args.ha == "fake", event_rate=args.event_rate)
+    server.start()
+    server.ready.wait()
+
+    start = time.perf_counter()
+    clients = asyncio.run(run_clients(args, keys))
+    wall = time.perf_counter() - start
+    time.sleep(0.2)  # let disconnects fold into the server stats
+    result = report(clients, server.cpu_seconds(), wall, server.server, server.ha_server)
+    server.stop()
+
+    if args.json:
+        json.dump(result, sys.stdout, indent=2)
+        print()
+        return
+    print(f"{result['clients']} clients, {result['keypresses']} keypresses in {result['wall_s']}s, "
+          f"server CPU {result['server_cpu_s']}s ({result['server_cpu_ms_per_key']} ms/key)")
+    print(f"{'key':<12}{'count':>7}{'p50 ms':>9}{'p90 ms':>9}{'p99 ms':>9}{'max ms':>9}{'bytes':>9}")
+    for label, s in [("ALL", result["overall"])] + sorted(result["keys"].items()):
+        print(f"{label:<12}{s['count']:>7}{s['p50_ms']:>9}{s['p90_ms']:>9}{s['p99_ms']:>9}"
+              f"{s['max_ms']:>9}{s['bytes_mean']:>9}")
+    if result["server_stats"]:
+        print("server:", result["server_stats"])
+    if result["ha_events"]:
+        print("HA state_changed events delivered:", result["ha_events"])
+
+
+if __name__ == "__main__":
+    main()
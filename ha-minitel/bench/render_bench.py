@@ -0,0 +1,331 @@
+"""Microbenchmarks for the Videotex encoder, Screen helpers and screen draws.
+
+Every case runs against the same synthetic install and records the time
+per call, the memory it allocates and the number of bytes it produces.
+Results are compared with a stored baseline: bytes per frame are what a
+1200 baud Minitel user waits for, so any growth is reported as a
+regression (and fails the run). Timings are noisy and only compared when
+--time-tolerance is given. Partial updates are also checked, with the
+headless emulator, to leave the same screen as a full repaint.
+
+    python3 ha-minitel/bench/render_bench.py            # compare with baseline
+    python3 ha-minitel/bench/render_bench.py --save     # record a new baseline
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import copy
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+from fixtures import StaticHAClient, make_install
+
+from ha_minitel.i18n import I18n
+from ha_minitel.protocol import terminal
+from ha_minitel.protocol.emulator import VideotexEmulator
+from ha_minitel.protocol.videotex import VideotexProtocol
+from ha_minitel.screens import (
+    AutomationsScreen, EntityControlScreen, EntityDetailScreen, FavoritesScreen, HomeScreen, LogsScreen,
+    RoomsScreen, SearchScreen, favorites,
+)
+from ha_minitel.session import Session
+from ha_minitel.transport.base import Transport
+
+BASELINE = os.path.join(os.path.dirname(__file__), "render_baseline.json")
+
+PROFILES = {
+    "default": terminal.DEFAULT_PROFILE,
+    "minitel2": terminal.profile_from_rom(b"Cv4"),
+}
+
+TEXTS = {
+    "ascii": "Lumiere salon allumee depuis 10 minutes",
+    "accents": "Température élevée à l'entrée du grenier",
+    "runs": "=" * 40,
+}
+
+# Cases measure writing a favorites cell, not its rate limit
+favorites.CELL_INTERVAL = 0
+
+
+def pick_favorites(install: dict) -> list[str]:
+    """A dashboard's worth of entities, a few of each domain."""
+    picked: dict[str, list[str]] = {}
+    for state in install["states"]:
+        domain = state["entity_id"].partition(".")[0]
+        if len(picked.setdefault(domain, [])) < 4:
+            picked[domain].append(state["entity_id"])
+    return [entity_id for ids in picked.values() for entity_id in ids][:favorites.MAX_FAVORITES]
+
+
+class NullTransport(Transport):
+    """Transport that discards output; screens never reach it in draw()."""
+
+    async def send(self, data: bytes) -> None:
+        pass
+
+    async def recv(self) -> bytes:
+        await asyncio.Future()
+
+    async def close(self, reason=None) -> None:
+        pass
+
+    @property
+    def is_connected(self) -> bool:
+        return True
+
+    @property
+    def transport_id(self) -> str:
+        return "bench"
+
+
+def build_cases(loop: asyncio.AbstractEventLoop, install: dict, language: str) -> dict:
+    """Return {name: zero-argument callable returning bytes or a coroutine}."""
+    i18n = I18n(language)
+    states = install["states"]
+    light = next(s for s in states if s["entity_id"].startswith("light."))
+    cover = next(s for s in states if s["entity_id"].startswith("cover."))
+    area = install["areas"][0]
+
+    cases = {}
+    for label, profile in PROFILES.items():
+        # Partial updates edit entity dicts in place: give each profile its own
+        ha_client = StaticHAClient(copy.deepcopy(install))
+        protocol = VideotexProtocol(profile)
+        session = Session(NullTransport(), ha_client, protocol, i18n, profile=profile,
+                          favorites=pick_favorites(install))
+
+        for name, text in TEXTS.items():
+            cases[f"text.{name}[{label}]"] = lambda p=protocol, t=text: p.text(t)
+
+        base = HomeScreen(session)
+        cases[f"helper.header[{label}]"] = lambda s=base: s.draw_header("Maison")
+        cases[f"helper.footer[{label}]"] = lambda s=base: s.draw_footer("SOMMAIRE: accueil")
+        cases[f"helper.menu_item[{label}]"] = lambda s=base: s.draw_menu_item(8, 1, "Lumière salon", "on")
+        cases[f"helper.text_line[{label}]"] = lambda s=base: s.draw_text_line(5, "Aucune entité")
+        cases[f"helper.clear_row[{label}]"] = lambda s=base: s.clear_row(5)
+        cases[f"helper.input_field[{label}]"] = lambda s=base: s.draw_input_field(6, "Valeur ")
+
+        home = HomeScreen(session)
+        rooms = RoomsScreen(session, area)
+        detail = EntityDetailScreen(session, dict(light))
+        control = EntityControlScreen(session, dict(cover))
+        automations = AutomationsScreen(session)
+        logs = LogsScreen(session)
+        search = SearchScreen(session, query="light 1")
+        dashboard = FavoritesScreen(session)
+        cases[f"home.draw[{label}]"] = home.draw
+        cases[f"rooms.draw[{label}]"] = rooms.draw
+        cases[f"entity_detail.draw[{label}]"] = detail.draw
+        cases[f"entity_control.draw[{label}]"] = control.draw
+        cases[f"automations.draw[{label}]"] = automations.draw
+        cases[f"logs.draw[{label}]"] = logs.draw
+        cases[f"search.draw[{label}]"] = search.draw
+        cases[f"favorites.draw[{label}]"] = dashboard.draw
+
+        # Partial updates, once the screens hold their data
+        loop.run_until_complete(rooms.draw())
+        first = rooms.entities[0]
+        update = {"state": "off" if first.get("state") == "on" else "on"}
+        cases[f"rooms.state_changed[{label}]"] = (
+            lambda s=rooms, e=first["entity_id"], u=update: s.on_state_changed(e, u)
+        )
+        cases[f"entity_detail.state_changed[{label}]"] = (
+            lambda s=detail, e=light["entity_id"]: s.on_state_changed(e, {"state": "on"})
+        )
+        loop.run_until_complete(home.draw())
+        cases[f"home.state_changed[{label}]"] = (
+            lambda s=home, c=ha_client, e=light["entity_id"]: toggle_light(s, c, e)
+        )
+        # Not the light the home case toggles: the dashboard does not see those
+        # changes, so its cell could end up matching the store after either one
+        pinned = next(e for e in session.favorites if e.startswith("light.") and e != light["entity_id"])
+        loop.run_until_complete(dashboard.draw())
+        cases[f"favorites.state_changed[{label}]"] = (
+            lambda s=dashboard, c=ha_client, e=pinned: toggle_light(s, c, e)
+        )
+    return cases
+
+
+def toggle_light(screen, ha_client, entity_id: str):
+    """Flip a light in the state mirror (so the area totals move) and notify the screen."""
+    state = ha_client.store.get(entity_id)
+    new_state = {**state, "state": "off" if state["state"] == "on" else "on"}
+    ha_client.store.apply(entity_id, new_state)
+    return screen.on_state_changed(entity_id, new_state)
+
+
+def build_partial_checks(loop: asyncio.AbstractEventLoop, install: dict, language: str) -> dict:
+    """Return {name: (screen, entity_id, new_state)} for partial update checks."""
+    i18n = I18n(language)
+    checks = {}
+    for label, profile in PROFILES.items():
+        ha_client = StaticHAClient(copy.deepcopy(install))
+        session = Session(NullTransport(), ha_client, VideotexProtocol(profile), i18n, profile=profile,
+                          favorites=pick_favorites(install))
+        rooms = RoomsScreen(session, install["areas"][0])
+        loop.run_until_complete(rooms.draw())
+        for ent in rooms.entities[:2]:
+            for state in ("on", "off", "unavailable"):
+                checks[f"rooms.{ent['entity_id']}={state}[{label}]"] = (rooms, ent["entity_id"], {"state": state})
+        light = next(s for s in ha_client.install["states"] if s["entity_id"].startswith("light."))
+        detail = EntityDetailScreen(session, light)
+        for state in ("on", "off", "unavailable"):
+            checks[f"entity_detail={state}[{label}]"] = (detail, light["entity_id"], {"state": state})
+        cover = next(s for s in ha_client.install["states"] if s["entity_id"].startswith("cover."))
+        control = EntityControlScreen(session, dict(cover))
+        for position in (5, 100, 42):
+            new_state = {"state": "open", "attributes": {**cover["attributes"], "current_position": position}}
+            checks[f"entity_control.position={position}[{label}]"] = (control, cover["entity_id"], new_state)
+        home = HomeScreen(session)
+        loop.run_until_complete(home.draw())
+        area_index = ha_client.area_index
+        area_states = [ha_client.store.get(e) for e in area_index.entity_ids(install["areas"][0]["area_id"])]
+        for prefix, values in (("light.", ("on", "off")), ("cover.", ("open", "closed")), ("sensor.", ("19.5", "x"))):
+            ent = next((s for s in area_states if s["entity_id"].startswith(prefix)), None)
+            if ent is None:
+                continue
+            for state in values:
+                checks[f"home.{ent['entity_id']}={state}[{label}]"] = (home, ent["entity_id"], {"state": state})
+        dashboard = FavoritesScreen(session)
+        for entity_id in dashboard.entity_ids[::5]:
+            for state in ("on", "unavailable", "12345678901234"):
+                checks[f"favorites.{entity_id}={state}[{label}]"] = (dashboard, entity_id, {"state": state})
+        automations = AutomationsScreen(session)
+        loop.run_until_complete(automations.draw())
+        for auto in automations.automations[:2]:
+            for state in ("off", "on", "unavailable"):
+                checks[f"automations.{auto['entity_id']}={state}[{label}]"] = (
+                    automations, auto["entity_id"], {"state": state}
+                )
+    return checks
+
+
+def verify_partial(loop: asyncio.AbstractEventLoop, screen, entity_id: str, new_state: dict) -> bool:
+    """Full draw + partial update must show what a fresh full draw shows."""
+    incremental = VideotexEmulator()
+    incremental.feed(loop.run_until_complete(screen.draw()))
+    # Like the receive loop: the state mirror sees the event before the screens
+    store = screen.session.ha_client.store
+    if store.get(entity_id):
+        store.apply(entity_id, {**store.get(entity_id), **new_state})
+    incremental.feed(loop.run_until_complete(screen.on_state_changed(entity_id, new_state)) or b"")
+    repaint = VideotexEmulator()
+    repaint.feed(loop.run_until_complete(screen.draw()))
+    return incremental.snapshot() == repaint.snapshot()
+
+
+def call(loop: asyncio.AbstractEventLoop, fn) -> bytes:
+    result = fn()
+    if asyncio.iscoroutine(result):
+        result = loop.run_until_complete(result)
+    return result or b""
+
+
+def measure(loop: asyncio.AbstractEventLoop, fn, min_time: float) -> dict:
+    """Time fn until min_time has elapsed; then trace one call's allocations."""
+    output = call(loop, fn)  # warm up caches and lazy imports
+    samples = []
+    deadline = time.perf_counter() + min_time
+    while len(samples) < 5 or time.perf_counter() < deadline:
+        start = time.perf_counter()
+        call(loop, fn)
+        samples.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    blocks = sys.getallocatedblocks()
+    tracemalloc.reset_peak()
+    base, _ = tracemalloc.get_traced_memory()
+    call(loop, fn)
+    _, peak = tracemalloc.get_traced_memory()
+    retained = sys.getallocatedblocks() - blocks
+    tracemalloc.stop()
+
+    return {
+        "bytes": len(output),
+        "time_us": round(statistics.median(samples) * 1e6, 2),
+        "alloc_peak": peak - base,
+        "blocks_retained": retained,
+        "runs": len(samples),
+    }
+
+
+def compare(results: dict, baseline: dict, time_tolerance: float | None) -> list[str]:
+    """Return regression messages: byte growth, and slowdowns if asked."""
+    problems = []
+    for name, result in results.items():
+        old = baseline.get(name)
+        if old is None:
+            continue
+        if result["bytes"] > old["bytes"]:
+            problems.append(f"{name}: {old['bytes']} -> {result['bytes']} bytes")
+        if time_tolerance is not None and result["time_us"] > old["time_us"] * (1 + time_tolerance):
+            problems.append(f"{name}: {old['time_us']} -> {result['time_us']} us")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Encoder and screen rendering microbenchmarks")
+    parser.add_argument("--filter", default="", help="Only run cases whose name contains this")
+    parser.add_argument("--language", default="fr", choices=["fr", "en"])
+    parser.add_argument("--min-time", type=float, default=0.05, help="Seconds of timing per case")
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--save", action="store_true", help="Write the results as the new baseline")
+    parser.add_argument("--time-tolerance", type=float, default=None,
+                        help="Also flag cases slower than baseline by this fraction (e.g. 0.5)")
+    parser.add_argument("--json", action="store_true", help="Print the results as JSON")
+    args = parser.parse_args()
+
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    cases = build_cases(loop, make_install(), args.language)
+    results = {
+        name: measure(loop, fn, args.min_time)
+        for name, fn in cases.items()
+        if args.filter in name
+    }
+    checks = build_partial_checks(loop, make_install(), args.language)
+    mismatches = [
+        name for name, (screen, entity_id, new_state) in checks.items()
+        if args.filter in name and not verify_partial(loop, screen, entity_id, new_state)
+    ]
+    loop.close()
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    if args.json:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+    else:
+        print(f"{'case':<38}{'bytes':>7}{'base':>7}{'us':>10}{'alloc B':>10}{'blocks':>8}")
+        for name, r in results.items():
+            old = baseline.get(name, {}).get("bytes", "")
+            print(f"{name:<38}{r['bytes']:>7}{old:>7}{r['time_us']:>10}"
+                  f"{r['alloc_peak']:>10}{r['blocks_retained']:>8}")
+
+    if args.save:
+        baseline.update(results)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"Baseline written to {args.baseline}", file=sys.stderr)
+        return
+
+    problems = compare(results, baseline, args.time_tolerance)
+    problems += [f"{name}: partial update differs from a full repaint" for name in mismatches]
+    for problem in problems:
+        print("REGRESSION", problem, file=sys.stderr)
+    sys.exit(1 if problems else 0)
+
+
+if __name__ == "__main__":
+    main()
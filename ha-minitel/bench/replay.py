@@ -0,0 +1,321 @@
+"""Replay a recording (see ha_minitel/recorder.py) through the application.
+
+Home Assistant is replaced by the recorded frames: events arrive in their
+recorded order, and each command the application sends is answered with
+the recorded reply to the same command. Terminals are replaced by
+transports that type the recorded input. Nothing touches the network, so
+an incident captured with the `record_path` option becomes a repeatable
+benchmark.
+
+    python3 ha-minitel/bench/replay.py recording.jsonl.gz             # as fast as possible
+    python3 ha-minitel/bench/replay.py recording.jsonl.gz --speed 1   # recorded pace
+    python3 ha-minitel/bench/replay.py recording.jsonl.gz --json
+
+As fast as possible, each record is delivered once the previous one has
+been fully handled (every session waiting for input and the receive loop
+waiting for a frame), so runs are repeatable and their time is the
+processing time alone. With --speed, records follow their timestamps
+(divided by the speed) and replies come after their recorded delay.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import sys
+import time
+from collections import defaultdict, deque
+
+import fixtures  # noqa: F401  (puts ha_minitel on sys.path)
+
+from ha_minitel import tracing
+from ha_minitel.app import Application
+from ha_minitel.config import Config
+from ha_minitel.ha_client.client import HAClient
+from ha_minitel.protocol import terminal
+from ha_minitel.recorder import read_recording
+from ha_minitel.transport.base import CloseReason, Transport
+
+logger = logging.getLogger("replay")
+
+
+def command_key(payload: dict) -> str:
+    """What identifies a command across runs: everything but its id."""
+    return json.dumps({k: v for k, v in payload.items() if k != "id"}, sort_keys=True)
+
+
+class Recording:
+    """A recording split into a timeline and the replies to look up."""
+
+    def __init__(self, path: str):
+        self.header, records = read_recording(path)
+        self.timeline: list[list] = []
+        # command key -> recorded (id, time sent), oldest first
+        self.commands: dict[str, deque] = defaultdict(deque)
+        # same, by command type only, for commands whose details changed
+        self.commands_by_type: dict[str, deque] = defaultdict(deque)
+        self.replies: dict[int, tuple[float, dict]] = {}
+        self._taken: set[int] = set()
+        sent: set[int] = set()
+        for record in records:
+            kind = record[1]
+            if kind == "out":
+                payload = record[2]
+                entry = (payload["id"], record[0])
+                self.commands[command_key(payload)].append(entry)
+                self.commands_by_type[payload["type"]].append(entry)
+                sent.add(payload["id"])
+            elif kind == "ha":
+                msg = json.loads(record[2])
+                if msg.get("type") == "result" and msg.get("id") in sent:
+                    self.replies[msg["id"]] = (record[0], msg)
+                elif msg.get("type") == "event":
+                    self.timeline.append([record[0], "ha", msg])
+            else:
+                self.timeline.append(record)
+        self.duration = self.timeline[-1][0] if self.timeline else 0.0
+
+    def take_reply(self, payload: dict) -> tuple[int | None, float, dict | None]:
+        """Recorded id, reply delay and reply for a command being replayed."""
+        entry = (self._take(self.commands.get(command_key(payload)))
+                 or self._take(self.commands_by_type.get(payload["type"])))
+        if entry is None:
+            return None, 0.0, None
+        recorded_id, sent_at = entry
+        replied_at, reply = self.replies.get(recorded_id, (sent_at, None))
+        return recorded_id, replied_at - sent_at, reply
+
+    def _take(self, queue: deque | None) -> tuple[int, float] | None:
+        """Oldest entry of queue whose reply has not been used yet."""
+        while queue:
+            entry = queue.popleft()
+            if entry[0] not in self._taken:
+                self._taken.add(entry[0])
+                return entry
+        return None
+
+
+class ReplayConnection:
+    """Stands in for the Home Assistant WebSocket."""
+
+    def __init__(self, recording: Recording, speed: float):
+        self.recording = recording
+        self.speed = speed
+        self.ids: dict[int, int] = {}  # recorded id -> id in this run
+        self.unmatched = 0
+        self._frames: asyncio.Queue = asyncio.Queue()
+        self.idle = asyncio.Event()
+
+    async def send(self, text: str):
+        payload = json.loads(text)
+        recorded_id, delay, reply = self.recording.take_reply(payload)
+        if recorded_id is not None:
+            self.ids[recorded_id] = payload["id"]
+        if reply is None:
+            self.unmatched += 1
+            reply = {"type": "result", "success": False,
+                     "error": {"code": "not_recorded", "message": "No recorded reply"}}
+        reply = {**reply, "id": payload["id"]}
+        if self.speed and delay > 0:
+            asyncio.get_running_loop().call_later(delay / self.speed, self.deliver, reply)
+        else:
+            self.deliver(reply)
+
+    def deliver(self, msg: dict):
+        self.idle.clear()
+        self._frames.put_nowait(json.dumps(msg))
+
+    def event(self, msg: dict) -> bool:
+        """Deliver a recorded event to its subscription; False if it has none."""
+        sub_id = self.ids.get(msg.get("id"))
+        if sub_id is None:
+            return False
+        self.deliver({**msg, "id": sub_id})
+        return True
+
+    def end(self):
+        self.idle.clear()
+        self._frames.put_nowait(None)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> str:
+        if self._frames.empty():
+            self.idle.set()
+        frame = await self._frames.get()
+        if frame is None:
+            raise StopAsyncIteration
+        return frame
+
+    async def close(self):
+        pass
+
+
+class ReplayHAClient(HAClient):
+    def __init__(self, connection: ReplayConnection):
+        super().__init__("replay://", "")
+        self.connection = connection
+
+    async def connect(self):
+        self._ws = self.connection
+        self._connected = True
+
+
+class ReplayTransport(Transport):
+    """Types the recorded input of one terminal and discards the output."""
+
+    def __init__(self, transport_id: str, kind: str, rom: str):
+        super().__init__()
+        self._id = transport_id
+        self.kind = kind
+        # A ROM known at connect time; otherwise the session identifies the
+        # terminal from the recorded input, as it did live
+        self._profile = terminal.profile_from_rom(rom.encode("latin-1")) if rom else None
+        self._input: asyncio.Queue = asyncio.Queue()
+        self.idle = asyncio.Event()
+
+    def type(self, data: str):
+        self.idle.clear()
+        self._input.put_nowait(data.encode("latin-1"))
+
+    async def send(self, data: bytes) -> None:
+        if self._closed.is_set():
+            raise ConnectionError("Transport closed")
+        self.stats.writes += 1
+        self.stats.frames += 1
+        self.stats.bytes_sent += len(data)
+
+    async def recv(self) -> bytes:
+        if self._input.empty():
+            self.idle.set()
+        get = asyncio.ensure_future(self._input.get())
+        closed = asyncio.ensure_future(self._closed.wait())
+        try:
+            # Cancelled by identification timeouts: the input stays queued
+            await asyncio.wait((get, closed), return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            closed.cancel()
+            get.cancel()
+        if get.done() and not get.cancelled():
+            return get.result()
+        raise ConnectionError("Transport closed")
+
+    async def close(self, reason: CloseReason = CloseReason.LOCAL) -> None:
+        self.idle.set()
+        self._set_closed(reason)
+
+    @property
+    def is_connected(self) -> bool:
+        return not self._closed.is_set()
+
+    @property
+    def transport_id(self) -> str:
+        return self._id
+
+    @property
+    def terminal_profile(self):
+        return self._profile
+
+
+async def replay(recording: Recording, speed: float, config: Config) -> dict:
+    connection = ReplayConnection(recording, speed)
+    app = Application(config, ha_client=ReplayHAClient(connection))
+    manager = app.session_manager
+    await app.ha_client.connect()
+    receiving = asyncio.create_task(app.ha_client.recv_loop(manager.on_state_changed))
+    transports: dict[str, ReplayTransport] = {}
+    opened: list[ReplayTransport] = []
+    connecting: list[asyncio.Task] = []
+    counts = defaultdict(int)
+
+    async def settle():
+        waiters = [connection.idle.wait()] + [t.idle.wait() for t in transports.values()]
+        await asyncio.gather(*waiters)
+
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    cpu = time.process_time()
+    for record in recording.timeline:
+        if speed:
+            delay = started + record[0] / speed - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+        else:
+            await settle()
+        kind = record[1]
+        if kind == "ha":
+            counts["events" if connection.event(record[2]) else "events_dropped"] += 1
+        elif kind == "open":
+            transport = transports[record[2]] = ReplayTransport(record[2], record[3], record[4])
+            opened.append(transport)
+            connecting.append(asyncio.create_task(manager.on_transport_connected(transport)))
+            counts["sessions"] += 1
+        elif kind == "in" and record[2] in transports:
+            transports[record[2]].type(record[3])
+            counts["inputs"] += 1
+        elif kind == "close" and record[2] in transports:
+            transport = transports.pop(record[2])
+            await transport.close(CloseReason.REMOTE)
+            await manager.on_transport_disconnected(transport)
+    if not speed:
+        await settle()
+    elapsed = loop.time() - started
+    cpu = time.process_time() - cpu
+
+    for transport in list(transports.values()):
+        await transport.close()
+        await manager.on_transport_disconnected(transport)
+    for task in connecting:
+        task.cancel()
+    connection.end()
+    await receiving
+
+    return {
+        "recorded_s": round(recording.duration, 3),
+        "elapsed_s": round(elapsed, 3),
+        "cpu_s": round(cpu, 3),
+        **counts,
+        "bytes_sent": sum(t.stats.bytes_sent for t in opened),
+        "unmatched_commands": connection.unmatched,
+        "latency": tracing.summary(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("recording")
+    parser.add_argument("--speed", type=float, default=0,
+                        help="1 for the recorded pace, 2 for twice as fast... (0: as fast as possible)")
+    parser.add_argument("--language", help="Override the recorded language")
+    parser.add_argument("--json", action="store_true")
+    parser.add_argument("--log-level", default="warning")
+    args = parser.parse_args()
+    logging.basicConfig(level=args.log_level.upper(), format="%(levelname)s %(name)s: %(message)s")
+
+    recording = Recording(args.recording)
+    settings = recording.header.get("settings", {})
+    config = Config(
+        language=args.language or settings.get("language", "fr"),
+        favorites=settings.get("favorites", []),
+        max_sessions=0,
+        session_hibernate_after=0,
+        session_idle_timeout=0,
+    )
+    result = asyncio.run(replay(recording, args.speed, config))
+    if args.json:
+        json.dump(result, sys.stdout, indent=2)
+        print()
+        return
+    latency = result.pop("latency")
+    for name, value in result.items():
+        print(f"{name:<24}{value}")
+    print(f"\n{'screen':<22}{'keys':>6}{'mean ms':>9}{'p50':>8}{'p90':>8}{'p99':>8}")
+    for screen, s in latency.items():
+        print(f"{screen:<22}{s['keys']:>6}{s['mean_ms']:>9}{s['p50_ms']:>8}{s['p90_ms']:>8}{s['p99_ms']:>8}")
+
+
+if __name__ == "__main__":
+    main()
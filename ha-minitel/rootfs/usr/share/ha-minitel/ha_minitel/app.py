@@ -1,15 +1,25 @@
 """Application orchestrator."""
 
+from __future__ import annotations
+
 import asyncio
 import logging
+import signal
 
 from .config import Config
 from .ha_client.client import HAClient
+from .ha_client.snapshot import Snapshot
 from .i18n import I18n
+from .loop_monitor import LoopMonitor, StackSampler
+from .metrics import REGISTRY, MetricsServer
+from . import tracing
 from .protocol.videotex import VideotexProtocol
+from .recorder import Recorder
+from .screens.favorites import MAX_FAVORITES
 from .session import SessionManager
 from .transport.websocket_server import WebSocketServer
-from .transport.serial_transport import SerialMinitelTransport
+from .transport.serial_discovery import SerialSupervisor
+from .transport.tcp_server import TcpServer
 
 logger = logging.getLogger(__name__)
 
@@ -17,46 +27,93 @@ logger = logging.getLogger(__name__)
 class Application:
     """Main application: starts transports, HA client, and session manager."""
 
-    def __init__(self, config: Config):
+    def __init__(self, config: Config, ha_client: HAClient | None = None):
         self.config = config
         self.i18n = I18n(config.language)
         self.protocol = VideotexProtocol()
-        self.ha_client = HAClient(config.ha_url, config.ha_token)
+        self.recorder = None
+        if config.record_path:
+            self.recorder = Recorder(config.record_path, {
+                "language": config.language,
+                "favorites": config.favorites,
+            })
+        self.ha_client = ha_client or HAClient(
+            config.ha_url, config.ha_token, recorder=self.recorder,
+            snapshot=Snapshot(config.snapshot_dir) if config.snapshot_dir else None,
+        )
+        if len(config.favorites) > MAX_FAVORITES:
+            logger.warning("%d favorites configured, only the first %d are shown",
+                           len(config.favorites), MAX_FAVORITES)
         self.session_manager = SessionManager(
             ha_client=self.ha_client,
             protocol=self.protocol,
             i18n=self.i18n,
+            max_sessions=config.max_sessions,
+            idle_timeout=config.session_idle_timeout,
+            hibernate_after=config.session_hibernate_after,
+            favorites=config.favorites,
+            recorder=self.recorder,
         )
 
     async def run(self):
         logger.info("Starting ha-minitel")
 
-        await self.ha_client.connect()
+        # Home Assistant is connected alongside the transports, not before
+        # them: terminals get a waiting screen until it answers
+        tasks = [asyncio.create_task(self.ha_client.run(
+            self.session_manager.on_state_changed,
+            self.session_manager.on_ha_connection,
+        ))]
 
-        tasks = []
+        monitor = None
+        if self.config.slow_callback_ms:
+            monitor = LoopMonitor(self.config.slow_callback_ms / 1000)
+            monitor.install()
+            tasks.append(asyncio.create_task(monitor.sample_lag()))
+        profiler = StackSampler()
+        asyncio.get_running_loop().add_signal_handler(signal.SIGUSR1, profiler.toggle)
 
         ws_server = WebSocketServer(
             port=self.config.websocket_port,
             on_connect=self.session_manager.on_transport_connected,
             on_disconnect=self.session_manager.on_transport_disconnected,
+            compression=self.config.websocket_compression,
+            deflate_window_bits=self.config.websocket_deflate_window_bits,
+            ping_interval=self.config.websocket_ping_interval or None,
         )
         tasks.append(asyncio.create_task(ws_server.serve()))
         logger.info("WebSocket server starting on port %d", self.config.websocket_port)
 
-        if self.config.serial_device:
-            serial_transport = SerialMinitelTransport(
-                device=self.config.serial_device,
+        if self.config.tcp_port:
+            tcp_server = TcpServer(
+                port=self.config.tcp_port,
+                on_connect=self.session_manager.on_transport_connected,
+                on_disconnect=self.session_manager.on_transport_disconnected,
+                telnet=self.config.tcp_telnet,
+            )
+            tasks.append(asyncio.create_task(tcp_server.serve()))
+            logger.info("TCP server starting on port %d", self.config.tcp_port)
+
+        if self.config.serial_devices:
+            serial_supervisor = SerialSupervisor(
+                patterns=self.config.serial_devices,
+                on_connect=self.session_manager.on_transport_connected,
+                on_disconnect=self.session_manager.on_transport_disconnected,
                 baud_rate=self.config.serial_baud_rate,
                 parity=self.config.serial_parity,
+                auto_speed=self.config.serial_auto_speed,
             )
-            tasks.append(asyncio.create_task(
-                self._run_serial(serial_transport)
-            ))
-            logger.info("Serial transport on %s", self.config.serial_device)
+            tasks.append(asyncio.create_task(serial_supervisor.run()))
+            logger.info("Serial transport on %s", ", ".join(self.config.serial_devices))
 
-        tasks.append(asyncio.create_task(self.ha_client.recv_loop(
-            self.session_manager.on_state_changed
-        )))
+        if self.config.metrics_port:
+            REGISTRY.add_collector(self.session_manager.collect_metrics)
+            REGISTRY.add_collector(self.ha_client.collect_metrics)
+            metrics_server = MetricsServer(port=self.config.metrics_port)
+            metrics_server.add_route("/latency", "application/json", tracing.summary_json)
+            metrics_server.add_route("/profile", "text/plain; charset=utf-8", lambda: profiler.last_report)
+            tasks.append(asyncio.create_task(metrics_server.serve()))
+            logger.info("Metrics endpoint on port %d", self.config.metrics_port)
 
         try:
             await asyncio.gather(*tasks)
@@ -64,22 +121,7 @@ class Application:
             logger.info("Shutting down")
         finally:
             await self.ha_client.close()
-
-    async def _run_serial(self, transport: SerialMinitelTransport):
-        """Connect serial transport and register with session manager."""
-        backoff = 1
-        while True:
-            try:
-                await transport.open()
-                backoff = 1
-                await self.session_manager.on_transport_connected(transport)
-                # Wait until disconnected
-                while transport.is_connected:
-                    await asyncio.sleep(1)
-            except Exception:
-                logger.exception("Serial transport error, reconnecting in %ds", backoff)
-                await asyncio.sleep(backoff)
-                backoff = min(backoff * 2, 60)
-            finally:
-                await self.session_manager.on_transport_disconnected(transport)
-                await transport.close()
+            if monitor:
+                monitor.uninstall()
+            if self.recorder:
+                self.recorder.close()
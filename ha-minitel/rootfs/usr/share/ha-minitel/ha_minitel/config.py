@@ -1,6 +1,6 @@
 """Configuration dataclass for ha-minitel."""
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 
 @dataclass
@@ -9,9 +9,23 @@ class Config:
 
     language: str = "fr"
     websocket_port: int = 3615
-    serial_device: str = ""
+    websocket_compression: bool = True
+    websocket_deflate_window_bits: int = 11
+    websocket_ping_interval: int = 30
+    max_sessions: int = 16
+    session_hibernate_after: int = 600
+    session_idle_timeout: int = 3600
+    tcp_port: int = 0
+    tcp_telnet: bool = False
+    serial_devices: list[str] = field(default_factory=list)
     serial_baud_rate: int = 1200
     serial_parity: str = "even"
+    serial_auto_speed: bool = False
+    favorites: list[str] = field(default_factory=list)
+    metrics_port: int = 0
+    record_path: str = ""
+    slow_callback_ms: int = 100
+    snapshot_dir: str = ""
     log_level: str = "info"
     ha_url: str = "ws://supervisor/core/websocket"
     ha_token: str = ""
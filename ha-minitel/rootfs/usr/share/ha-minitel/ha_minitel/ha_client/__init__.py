@@ -1,5 +1,11 @@
 """Home Assistant WebSocket API client."""
 
+from .area_index import AreaIndex, AreaSummary
 from .client import HAClient
+from .coalescer import CommandCoalescer
+from .domain_index import DomainIndex
+from .search_index import SearchIndex
+from .snapshot import Snapshot
+from .store import StateStore, StoreListener
 
-__all__ = ["HAClient"]
+__all__ = ["HAClient", "AreaIndex", "AreaSummary", "CommandCoalescer", "DomainIndex", "SearchIndex", "Snapshot", "StateStore", "StoreListener"]
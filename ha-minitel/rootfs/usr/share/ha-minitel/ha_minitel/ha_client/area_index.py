@@ -0,0 +1,141 @@
+"""Entities grouped by area, with running per-area aggregates."""
+
+from __future__ import annotations
+
+import bisect
+from dataclasses import dataclass
+from typing import Optional
+
+from .search_index import display_name, sort_key
+from .store import StoreListener
+
+
+@dataclass
+class AreaSummary:
+    """Running totals for one area, adjusted by each state change."""
+
+    lights_on: int = 0
+    covers_open: int = 0
+    temperature_sum: float = 0.0
+    temperature_count: int = 0
+
+    @property
+    def temperature(self) -> Optional[float]:
+        if not self.temperature_count:
+            return None
+        return self.temperature_sum / self.temperature_count
+
+
+def contribution(state: Optional[dict]) -> tuple[int, int, Optional[float]]:
+    """What one entity adds to its area: (light on, cover open, temperature)."""
+    if not state:
+        return 0, 0, None
+    entity_id = state["entity_id"]
+    value = state.get("state")
+    if entity_id.startswith("light."):
+        return int(value == "on"), 0, None
+    if entity_id.startswith("cover."):
+        return 0, int(value in ("open", "opening")), None
+    if entity_id.startswith("sensor.") and state.get("attributes", {}).get("device_class") == "temperature":
+        try:
+            return 0, 0, float(value)
+        except (TypeError, ValueError):
+            return 0, 0, None
+    return 0, 0, None
+
+
+def entity_areas(entities: list[dict], devices: list[dict]) -> dict[str, str]:
+    """Map entity IDs to areas: the entity's own area, else its device's."""
+    device_area = {dev["id"]: dev["area_id"] for dev in devices if dev.get("area_id")}
+    areas = {}
+    for ent in entities:
+        area_id = ent.get("area_id") or device_area.get(ent.get("device_id"))
+        if area_id:
+            areas[ent["entity_id"]] = area_id
+    return areas
+
+
+class AreaIndex(StoreListener):
+    """Area membership from the registries, and AreaSummary totals per area.
+
+    Members of each area are kept as sorted name keys (like DomainIndex).
+    A state change costs one subtraction and one addition on its area's
+    summary; nothing is rescanned.
+    """
+
+    def __init__(self):
+        self.areas: list[dict] = []
+        self.loaded = False
+        self._area_of: dict[str, str] = {}
+        self._members: dict[str, list[str]] = {}
+        self._key_of: dict[str, str] = {}
+        self._summaries: dict[str, AreaSummary] = {}
+
+    def set_registries(self, areas: list[dict], entities: list[dict], devices: list[dict],
+                       states: list[dict]) -> None:
+        """Load (or reload) area membership, then rebuild from the current states."""
+        self.areas = areas
+        self._area_of = entity_areas(entities, devices)
+        self.loaded = True
+        self.on_load(states)
+
+    @property
+    def assignments(self) -> dict[str, str]:
+        """Entity ID -> area ID, for every entity with an area."""
+        return dict(self._area_of)
+
+    def on_load(self, states: list[dict]) -> None:
+        self._members = {}
+        self._key_of = {}
+        self._summaries = {}
+        for state in states:
+            self._add(state)
+        for keys in self._members.values():
+            keys.sort()
+
+    def on_change(self, entity_id: str, old_state: Optional[dict], new_state: Optional[dict]) -> None:
+        area_id = self._area_of.get(entity_id)
+        if area_id is None:
+            return
+        summary = self._summaries.setdefault(area_id, AreaSummary())
+        self._adjust(summary, contribution(old_state), -1)
+        self._adjust(summary, contribution(new_state), 1)
+
+        old_key = self._key_of.get(entity_id)
+        new_key = sort_key(entity_id, display_name(new_state)) if new_state else None
+        if old_key != new_key:
+            keys = self._members.setdefault(area_id, [])
+            if old_key is not None:
+                del keys[bisect.bisect_left(keys, old_key)]
+                del self._key_of[entity_id]
+            if new_key is not None:
+                bisect.insort(keys, new_key)
+                self._key_of[entity_id] = new_key
+
+    def _add(self, state: dict):
+        entity_id = state["entity_id"]
+        area_id = self._area_of.get(entity_id)
+        if area_id is None:
+            return
+        key = self._key_of[entity_id] = sort_key(entity_id, display_name(state))
+        self._members.setdefault(area_id, []).append(key)
+        self._adjust(self._summaries.setdefault(area_id, AreaSummary()), contribution(state), 1)
+
+    @staticmethod
+    def _adjust(summary: AreaSummary, values: tuple[int, int, Optional[float]], sign: int):
+        lights, covers, temperature = values
+        summary.lights_on += sign * lights
+        summary.covers_open += sign * covers
+        if temperature is not None:
+            summary.temperature_sum += sign * temperature
+            summary.temperature_count += sign
+
+    def area_of(self, entity_id: str) -> Optional[str]:
+        return self._area_of.get(entity_id)
+
+    def entity_ids(self, area_id: str) -> list[str]:
+        """Entity IDs in an area, by name."""
+        return [key[key.rindex("\0") + 1:] for key in self._members.get(area_id, [])]
+
+    def summary(self, area_id: str) -> AreaSummary:
+        return self._summaries.get(area_id) or AreaSummary()
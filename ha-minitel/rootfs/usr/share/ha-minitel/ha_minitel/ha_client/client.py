@@ -5,23 +5,76 @@ from __future__ import annotations
 import asyncio
 import json
 import logging
+import time
 from typing import Callable, Awaitable, Any
 
 import websockets
 
+from .area_index import AreaIndex
+from .coalescer import CommandCoalescer
+from .domain_index import DomainIndex
+from .search_index import SearchIndex
+from .snapshot import Snapshot
+from .store import StateStore
+from .. import metrics, tracing
+from ..recorder import Recorder
+
 logger = logging.getLogger(__name__)
 
+# Registry changes that invalidate the area index
+REGISTRY_EVENTS = ("area_registry_updated", "entity_registry_updated", "device_registry_updated")
+
+# Seconds between connection attempts; the last one repeats
+RECONNECT_DELAYS = (1, 2, 5, 10, 30)
+
+# get_states on a large install (10k entities) is several MB in one frame,
+# well past the websockets default of 1 MiB
+MAX_MESSAGE_SIZE = 64 * 1024 * 1024
+
 
 class HAClient:
     """Client for the Home Assistant WebSocket API."""
 
-    def __init__(self, url: str, token: str):
+    def __init__(self, url: str, token: str, recorder: Recorder | None = None,
+                 snapshot: Snapshot | None = None):
         self._url = url
         self._token = token
+        self.recorder = recorder
+        self.snapshot = snapshot
         self._ws: websockets.WebSocketClientProtocol | None = None
         self._msg_id = 0
         self._pending: dict[int, asyncio.Future] = {}
+        self._result_hooks: dict[int, Callable[[dict], None]] = {}
         self._connected = False
+        self.store = StateStore()
+        self.search_index = SearchIndex()
+        self.domain_index = DomainIndex()
+        self.area_index = AreaIndex()
+        self.store.add_listener(self.search_index)
+        self.store.add_listener(self.domain_index)
+        self.store.add_listener(self.area_index)
+        self._store_loading: asyncio.Task | None = None
+        self._areas_loading: asyncio.Task | None = None
+        self.commands = CommandCoalescer(self.call_service)
+
+    @property
+    def connected(self) -> bool:
+        return self._connected
+
+    @property
+    def has_data(self) -> bool:
+        """Whether states and areas are at hand (possibly from the snapshot)."""
+        return self.store.loaded and self.area_index.loaded
+
+    def _restore_snapshot(self):
+        """Fill the store and area index from the snapshot, then keep it current."""
+        restored = self.snapshot.load()
+        if restored:
+            states, areas, area_of = restored
+            self.store.load(states)
+            entities = [{"entity_id": entity_id, "area_id": area_id} for entity_id, area_id in area_of.items()]
+            self.area_index.set_registries(areas, entities, [], self.store.all())
+        self.store.add_listener(self.snapshot)
 
     def _next_id(self) -> int:
         self._msg_id += 1
@@ -29,7 +82,7 @@ class HAClient:
 
     async def connect(self):
         """Connect and authenticate with Home Assistant."""
-        self._ws = await websockets.connect(self._url)
+        self._ws = await websockets.connect(self._url, max_size=MAX_MESSAGE_SIZE)
         # Wait for auth_required
         msg = json.loads(await self._ws.recv())
         if msg.get("type") != "auth_required":
@@ -48,13 +101,85 @@ class HAClient:
         self._connected = True
         logger.info("Connected to Home Assistant")
 
+    async def run(
+        self,
+        on_state_changed: Callable[[dict], Awaitable[None]],
+        on_connection: Callable[[bool], Awaitable[None]] | None = None,
+    ):
+        """Stay connected: connect, receive until the link drops, then retry.
+
+        Never raises for an unreachable Home Assistant, so transports can
+        run meanwhile. on_connection is told about each connection and loss.
+        """
+        if self.snapshot:
+            self._restore_snapshot()
+        attempt = 0
+        while True:
+            try:
+                await self.connect()
+            except Exception as e:
+                delay = RECONNECT_DELAYS[min(attempt, len(RECONNECT_DELAYS) - 1)]
+                attempt += 1
+                logger.warning("Home Assistant unreachable (%s), retrying in %d s", e or type(e).__name__, delay)
+                await asyncio.sleep(delay)
+                continue
+            attempt = 0
+            receiving = asyncio.create_task(self.recv_loop(on_state_changed))
+            warming = asyncio.create_task(self._warm_caches())
+            try:
+                if on_connection:
+                    await on_connection(True)
+                await receiving
+            finally:
+                receiving.cancel()
+                warming.cancel()
+                self._on_disconnected()
+            if on_connection:
+                await on_connection(False)
+            await asyncio.sleep(RECONNECT_DELAYS[0])
+
+    async def _warm_caches(self):
+        """Load (or refresh) the states and areas together.
+
+        States and areas already at hand (from before a reconnection, or
+        from the on-disk snapshot) keep serving screens until the fresh
+        ones replace them, which also catches up on missed events.
+        """
+        self._store_loading = asyncio.ensure_future(self._load_store())
+        self._areas_loading = asyncio.ensure_future(self._load_areas())
+        results = await asyncio.gather(self._store_loading, self._areas_loading, return_exceptions=True)
+        for result in results:
+            if isinstance(result, Exception):
+                logger.warning("Failed to load Home Assistant data: %s", result)
+
+    def _on_disconnected(self):
+        """Fail the commands still waiting for a reply."""
+        self._connected = False
+        self._ws = None
+        for future in self._pending.values():
+            if not future.done():
+                future.set_exception(ConnectionError("Home Assistant connection lost"))
+        self._pending.clear()
+        self._result_hooks.clear()
+
     async def close(self):
         self._connected = False
+        if self.snapshot:
+            self.snapshot.close()
         if self._ws:
             await self._ws.close()
 
-    async def _send_command(self, payload: dict) -> dict:
-        """Send a command and wait for the response."""
+    async def _send(self, payload: dict):
+        if self.recorder:
+            self.recorder.command(payload)
+        await self._ws.send(json.dumps(payload))
+
+    async def _send_command(self, payload: dict, on_result: Callable[[dict], None] | None = None) -> dict:
+        """Send a command and wait for the response.
+
+        on_result runs inside the receive loop as soon as the response
+        arrives, before any later event is dispatched.
+        """
         if not self._ws:
             raise ConnectionError("Not connected to HA")
 
@@ -62,9 +187,20 @@ class HAClient:
         payload["id"] = msg_id
         future: asyncio.Future = asyncio.get_event_loop().create_future()
         self._pending[msg_id] = future
+        if on_result:
+            self._result_hooks[msg_id] = on_result
 
-        await self._ws.send(json.dumps(payload))
-        return await future
+        start = time.perf_counter()
+        await self._send(payload)
+        with tracing.span("ha"):
+            result = await future
+        metrics.HA_COMMAND_SECONDS.observe(time.perf_counter() - start, payload["type"])
+        return result
+
+    def collect_metrics(self):
+        """Refresh the connection gauges (run at scrape time)."""
+        metrics.HA_CONNECTED.set(int(self._connected))
+        metrics.HA_PENDING_COMMANDS.set(len(self._pending))
 
     async def recv_loop(self, on_state_changed: Callable[[dict], Awaitable[None]]):
         """Background receive loop: dispatches responses and events."""
@@ -74,25 +210,48 @@ class HAClient:
         # Subscribe to state changes
         sub_id = self._next_id()
         self._pending[sub_id] = asyncio.get_event_loop().create_future()
-        await self._ws.send(json.dumps({
+        await self._send({
             "id": sub_id,
             "type": "subscribe_events",
             "event_type": "state_changed",
-        }))
+        })
+        # ...and to registry changes, which move entities between areas
+        registry_subs = set()
+        for event_type in REGISTRY_EVENTS:
+            registry_id = self._next_id()
+            registry_subs.add(registry_id)
+            self._pending[registry_id] = asyncio.get_event_loop().create_future()
+            await self._send({
+                "id": registry_id,
+                "type": "subscribe_events",
+                "event_type": event_type,
+            })
 
         try:
             async for raw in self._ws:
+                if self.recorder:
+                    self.recorder.ha_frame(raw)
                 msg = json.loads(raw)
                 msg_id = msg.get("id")
 
+                if msg.get("type") == "event":
+                    metrics.HA_EVENTS.inc(msg.get("event", {}).get("event_type", ""))
                 if msg.get("type") == "event" and msg_id == sub_id:
                     event_data = msg.get("event", {}).get("data", {})
+                    if self.store.loaded and event_data.get("entity_id"):
+                        self.store.apply(event_data["entity_id"], event_data.get("new_state"))
                     await on_state_changed(event_data)
+                elif msg.get("type") == "event" and msg_id in registry_subs:
+                    # Reloaded on next use; the current membership stays meanwhile
+                    self.area_index.loaded = False
                 elif msg_id and msg_id in self._pending:
+                    hook = self._result_hooks.pop(msg_id, None)
+                    if hook:
+                        hook(msg)
                     future = self._pending.pop(msg_id)
                     if not future.done():
                         future.set_result(msg)
-        except websockets.exceptions.ConnectionClosed:
+        except (websockets.exceptions.ConnectionClosed, OSError):
             logger.warning("HA WebSocket connection closed")
             self._connected = False
 
@@ -101,12 +260,69 @@ class HAClient:
         result = await self._send_command({"type": "get_states"})
         return result.get("result", [])
 
+    async def ensure_store(self) -> StateStore:
+        """Load the state mirror on first use; events keep it current after that."""
+        if not self.store.loaded:
+            if self._store_loading is None or self._store_loading.done():
+                self._store_loading = asyncio.ensure_future(self._load_store())
+            await asyncio.shield(self._store_loading)
+        return self.store
+
+    async def _load_store(self):
+        def load(msg: dict):
+            self.store.load(msg.get("result") or [])
+
+        result = await self._send_command({"type": "get_states"}, on_result=load)
+        if not self.store.loaded:
+            # No receive loop ran the hook (e.g. an offline client)
+            load(result)
+
+    async def search_entities(self, query: str, limit: int = 8, offset: int = 0) -> tuple[list[dict], int]:
+        """One page of entities whose name or ID words start with the query words."""
+        await self.ensure_store()
+        return self.find_entities(query, limit, offset)
+
+    def find_entities(self, query: str, limit: int = 8, offset: int = 0) -> tuple[list[dict], int]:
+        """search_entities() from the store as it is, without loading it (safe in event handlers)."""
+        entity_ids, total = self.search_index.search(query, limit, offset)
+        return [self.store.get(e) for e in entity_ids], total
+
+    async def get_domain_entities(
+        self, domain: str, offset: int = 0, limit: int | None = None
+    ) -> tuple[list[dict], int]:
+        """Entities of one domain sorted by name (optionally one page) and the domain total."""
+        await self.ensure_store()
+        return self.domain_entities(domain, offset, limit)
+
+    def domain_entities(
+        self, domain: str, offset: int = 0, limit: int | None = None
+    ) -> tuple[list[dict], int]:
+        """get_domain_entities() from the store as it is, without loading it (safe in event handlers)."""
+        entity_ids = self.domain_index.entity_ids(domain, offset, limit)
+        return [self.store.get(e) for e in entity_ids], self.domain_index.count(domain)
+
+    async def ensure_areas(self) -> AreaIndex:
+        """Load area membership from the registries on first use (and after registry changes)."""
+        if not self.area_index.loaded:
+            if self._areas_loading is None or self._areas_loading.done():
+                self._areas_loading = asyncio.ensure_future(self._load_areas())
+            await asyncio.shield(self._areas_loading)
+        return self.area_index
+
+    async def _load_areas(self):
+        store, result, entities, devices = await asyncio.gather(
+            self.ensure_store(),
+            self._send_command({"type": "config/area_registry/list"}),
+            self.get_entity_registry(),
+            self.get_device_registry(),
+        )
+        self.area_index.set_registries(result.get("result", []), entities, devices, store.all())
+        if self.snapshot:
+            self.snapshot.save_areas(self.area_index)
+
     async def get_areas(self) -> list[dict]:
         """Get all areas (rooms)."""
-        result = await self._send_command({
-            "type": "config/area_registry/list",
-        })
-        return result.get("result", [])
+        return (await self.ensure_areas()).areas
 
     async def get_entity_registry(self) -> list[dict]:
         """Get the entity registry to map entities to areas."""
@@ -123,30 +339,16 @@ class HAClient:
         return result.get("result", [])
 
     async def get_area_entities(self, area_id: str) -> list[dict]:
-        """Get entities for a given area by cross-referencing registries."""
-        entities = await self.get_entity_registry()
-        devices = await self.get_device_registry()
-        states = await self.get_states()
-
-        # Build device -> area map
-        device_area = {}
-        for dev in devices:
-            if dev.get("area_id"):
-                device_area[dev["id"]] = dev["area_id"]
-
-        # Find entity_ids in area (direct or via device)
-        area_entity_ids = set()
-        for ent in entities:
-            if ent.get("area_id") == area_id:
-                area_entity_ids.add(ent["entity_id"])
-            elif ent.get("device_id") and device_area.get(ent["device_id"]) == area_id:
-                area_entity_ids.add(ent["entity_id"])
-
-        # Return matching states
-        return [s for s in states if s["entity_id"] in area_entity_ids]
-
-    async def call_service(self, domain: str, service: str, entity_id: str = "", data: dict | None = None) -> dict:
-        """Call a Home Assistant service."""
+        """Get entities for a given area (directly or through their device), by name."""
+        area_index = await self.ensure_areas()
+        states = [self.store.get(e) for e in area_index.entity_ids(area_id)]
+        return [s for s in states if s]
+
+    async def call_service(
+        self, domain: str, service: str, entity_id: str | list[str] = "", data: dict | None = None,
+        area_id: str = "",
+    ) -> dict:
+        """Call a Home Assistant service on one entity, a list of entities and/or an area."""
         payload: dict[str, Any] = {
             "type": "call_service",
             "domain": domain,
@@ -155,16 +357,22 @@ class HAClient:
         target: dict[str, Any] = {}
         if entity_id:
             target["entity_id"] = entity_id
+        if area_id:
+            target["area_id"] = area_id
         if target:
             payload["target"] = target
         if data:
             payload["service_data"] = data
         return await self._send_command(payload)
 
+    async def control(self, domain: str, service: str, entity_id: str, data: dict | None = None) -> dict:
+        """Call a service on one entity from a user control, coalesced and rate limited per entity."""
+        return await self.commands.submit(domain, service, entity_id, data)
+
     async def get_automations(self) -> list[dict]:
         """Get automation entities."""
-        states = await self.get_states()
-        return [s for s in states if s["entity_id"].startswith("automation.")]
+        automations, _ = await self.get_domain_entities("automation")
+        return automations
 
     async def get_logbook(self, hours: int = 24) -> list[dict]:
         """Get recent logbook entries."""
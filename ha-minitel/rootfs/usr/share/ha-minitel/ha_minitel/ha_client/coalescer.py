@@ -0,0 +1,117 @@
+"""Per-entity coalescing and rate limiting of control commands."""
+
+from __future__ import annotations
+
+import asyncio
+import itertools
+import logging
+from typing import Awaitable, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+# Shortest gap between two commands sent to one entity (seconds)
+MIN_INTERVAL = 0.5
+
+# Services that set the same thing: a later one replaces an earlier one still waiting
+SERVICE_GROUPS = {
+    "turn_on": "power",
+    "turn_off": "power",
+    "open_cover": "position",
+    "close_cover": "position",
+    "set_cover_position": "position",
+    "stop_cover": "position",
+}
+
+_unique = itertools.count()
+
+
+def merge_key(service: str) -> tuple:
+    """Commands with equal keys supersede each other; toggles never merge."""
+    if service == "toggle":
+        return ("toggle", next(_unique))
+    return (SERVICE_GROUPS.get(service, service),)
+
+
+class _Command:
+    __slots__ = ("domain", "service", "data", "future")
+
+    def __init__(self, domain: str, service: str, data: Optional[dict]):
+        self.domain = domain
+        self.service = service
+        self.data = data
+        self.future: asyncio.Future = asyncio.get_event_loop().create_future()
+
+
+class _EntityQueue:
+    __slots__ = ("waiting", "last_sent", "task")
+
+    def __init__(self):
+        self.waiting: dict[tuple, _Command] = {}  # merge key -> command, oldest first
+        self.last_sent = float("-inf")
+        self.task: Optional[asyncio.Task] = None
+
+
+class CommandCoalescer:
+    """Send control commands so that each entity gets at most one per MIN_INTERVAL.
+
+    A command for an idle entity goes out at once. Commands arriving
+    while the entity is rate limited wait; one that sets the same thing
+    as a waiting command replaces it (same service: data merged, later
+    values winning), so only the latest target is sent. Callers of
+    merged commands all get the result of the call that was made.
+    """
+
+    def __init__(
+        self,
+        send: Callable[[str, str, str, Optional[dict]], Awaitable[dict]],
+        min_interval: float = MIN_INTERVAL,
+    ):
+        self._send = send
+        self.min_interval = min_interval
+        self._queues: dict[str, _EntityQueue] = {}
+        self.sent = 0
+        self.merged = 0
+
+    async def submit(self, domain: str, service: str, entity_id: str, data: Optional[dict] = None) -> dict:
+        queue = self._queues.get(entity_id)
+        if queue is None:
+            queue = self._queues[entity_id] = _EntityQueue()
+        key = merge_key(service)
+        command = queue.waiting.pop(key, None)
+        if command is None:
+            command = _Command(domain, service, data)
+        else:
+            self.merged += 1
+            if command.service == service and command.data and data:
+                data = {**command.data, **data}
+            command.domain, command.service, command.data = domain, service, data
+        # Re-inserted last: it now comes after anything queued before this call
+        queue.waiting[key] = command
+        if queue.task is None or queue.task.done():
+            queue.task = asyncio.ensure_future(self._drain(entity_id, queue))
+        return await asyncio.shield(command.future)
+
+    async def _drain(self, entity_id: str, queue: _EntityQueue):
+        loop = asyncio.get_event_loop()
+        while queue.waiting:
+            delay = queue.last_sent + self.min_interval - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            key = next(iter(queue.waiting))
+            command = queue.waiting.pop(key)
+            queue.last_sent = loop.time()
+            self.sent += 1
+            try:
+                result = await self._send(command.domain, command.service, entity_id, command.data)
+            except Exception as exc:
+                command.future.set_exception(exc)
+                # Retrieved by the callers; don't warn if they were cancelled
+                command.future.exception()
+            else:
+                command.future.set_result(result)
+        # Forget the entity once its rate limit no longer applies
+        loop.call_later(self.min_interval, self._forget, entity_id, queue)
+
+    def _forget(self, entity_id: str, queue: _EntityQueue):
+        if self._queues.get(entity_id) is queue and not queue.waiting and queue.task.done():
+            del self._queues[entity_id]
@@ -0,0 +1,68 @@
+"""Entities grouped by domain, each group kept sorted by name."""
+
+from __future__ import annotations
+
+import bisect
+from typing import Optional
+
+from .search_index import display_name, sort_key
+from .store import StoreListener
+
+
+def domain_of(entity_id: str) -> str:
+    return entity_id.partition(".")[0]
+
+
+def _entity_id(key: str) -> str:
+    return key[key.rindex("\0") + 1:]
+
+
+class DomainIndex(StoreListener):
+    """Per-domain sorted lists of entities, for paging lists without scanning all states.
+
+    Each domain holds sorted name keys (which end with the entity ID), so
+    a page is a slice and a change is one bisect.
+    """
+
+    def __init__(self):
+        self._keys: dict[str, list[str]] = {}
+        self._key_of: dict[str, str] = {}
+
+    def on_load(self, states: list[dict]) -> None:
+        self._keys = {}
+        self._key_of = {}
+        for state in states:
+            entity_id = state["entity_id"]
+            key = self._key_of[entity_id] = sort_key(entity_id, display_name(state))
+            self._keys.setdefault(domain_of(entity_id), []).append(key)
+        for keys in self._keys.values():
+            keys.sort()
+
+    def on_change(self, entity_id: str, old_state: Optional[dict], new_state: Optional[dict]) -> None:
+        old_key = self._key_of.get(entity_id)
+        new_key = sort_key(entity_id, display_name(new_state)) if new_state else None
+        if old_key == new_key:
+            return  # state change only
+        keys = self._keys.setdefault(domain_of(entity_id), [])
+        if old_key is not None:
+            del keys[bisect.bisect_left(keys, old_key)]
+            del self._key_of[entity_id]
+        if new_key is not None:
+            bisect.insort(keys, new_key)
+            self._key_of[entity_id] = new_key
+
+    def count(self, domain: str) -> int:
+        return len(self._keys.get(domain, ()))
+
+    def entity_ids(self, domain: str, offset: int = 0, limit: Optional[int] = None) -> list[str]:
+        """Entity IDs of a domain, by name, optionally one page of them."""
+        keys = self._keys.get(domain, [])
+        end = len(keys) if limit is None else offset + limit
+        return [_entity_id(key) for key in keys[offset:end]]
+
+    def position(self, entity_id: str) -> int:
+        """Index of an entity within its domain's list, or -1."""
+        key = self._key_of.get(entity_id)
+        if key is None:
+            return -1
+        return bisect.bisect_left(self._keys[domain_of(entity_id)], key)
@@ -0,0 +1,155 @@
+"""Prefix search over entity friendly names and entity IDs."""
+
+from __future__ import annotations
+
+import bisect
+import heapq
+import re
+import unicodedata
+from typing import Optional
+
+from .store import StoreListener
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+# Cached query results; the cache is dropped whenever a name changes
+MAX_CACHED_QUERIES = 512
+
+
+def normalize(text: str) -> str:
+    """Lowercase and strip accents, so "entree" finds "Entrée"."""
+    decomposed = unicodedata.normalize("NFKD", text.lower())
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+def display_name(state: dict) -> str:
+    return state.get("attributes", {}).get("friendly_name") or state["entity_id"]
+
+
+def tokens_for(entity_id: str, name: str) -> frozenset[str]:
+    """Searchable words: those of the friendly name and of the entity ID."""
+    return frozenset(_WORD.findall(normalize(name)) + _WORD.findall(entity_id.lower()))
+
+
+def sort_key(entity_id: str, name: str) -> str:
+    """Order by name, then entity ID; one string compares faster than a tuple."""
+    return f"{normalize(name)}\0{entity_id}"
+
+
+class SearchIndex(StoreListener):
+    """Inverted index from name words to entities, with a sorted word list for prefixes.
+
+    Each query word matches entities having a word that starts with it;
+    all query words must match. Results are ordered by name. Only adding,
+    removing or renaming an entity touches the index: ordinary state
+    changes leave it (and its query cache) alone.
+    """
+
+    def __init__(self):
+        self._words: list[str] = []  # sorted, for bisect prefix ranges
+        self._postings: dict[str, set[str]] = {}
+        self._tokens: dict[str, frozenset[str]] = {}
+        self._names: dict[str, str] = {}
+        self._sort_keys: dict[str, str] = {}
+        # query -> [matching set, first page, fully sorted list or None until paged]
+        self._cache: dict[str, list] = {}
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def name(self, entity_id: str) -> str:
+        return self._names.get(entity_id, entity_id)
+
+    def on_load(self, states: list[dict]) -> None:
+        self._postings = {}
+        self._tokens = {}
+        self._names = {}
+        self._sort_keys = {}
+        for state in states:
+            entity_id = state["entity_id"]
+            name = display_name(state)
+            tokens = tokens_for(entity_id, name)
+            self._names[entity_id] = name
+            self._sort_keys[entity_id] = sort_key(entity_id, name)
+            self._tokens[entity_id] = tokens
+            for token in tokens:
+                self._postings.setdefault(token, set()).add(entity_id)
+        self._words = sorted(self._postings)
+        self._cache.clear()
+
+    def on_change(self, entity_id: str, old_state: Optional[dict], new_state: Optional[dict]) -> None:
+        if new_state is None:
+            self._remove(entity_id)
+            return
+        name = display_name(new_state)
+        if self._names.get(entity_id) == name:
+            return  # state change only
+        self._remove(entity_id)
+        tokens = tokens_for(entity_id, name)
+        self._names[entity_id] = name
+        self._sort_keys[entity_id] = sort_key(entity_id, name)
+        self._tokens[entity_id] = tokens
+        for token in tokens:
+            posting = self._postings.get(token)
+            if posting is None:
+                posting = self._postings[token] = set()
+                bisect.insort(self._words, token)
+            posting.add(entity_id)
+        self._cache.clear()
+
+    def _remove(self, entity_id: str):
+        tokens = self._tokens.pop(entity_id, None)
+        if tokens is None:
+            return
+        del self._names[entity_id]
+        del self._sort_keys[entity_id]
+        for token in tokens:
+            posting = self._postings[token]
+            posting.discard(entity_id)
+            if not posting:
+                del self._postings[token]
+                del self._words[bisect.bisect_left(self._words, token)]
+        self._cache.clear()
+
+    def _prefix_matches(self, prefix: str) -> set[str]:
+        """Entities with a word starting with prefix (a fresh set)."""
+        words = self._words
+        start = i = bisect.bisect_left(words, prefix)
+        while i < len(words) and words[i].startswith(prefix):
+            i += 1
+        if i - start == 1:
+            return self._postings[words[start]].copy()
+        return set().union(*(self._postings[w] for w in words[start:i]))
+
+    def _matches(self, query: str) -> list:
+        """[matching set, first page, sorted list or None] for query (cached)."""
+        entry = self._cache.get(query)
+        if entry is not None:
+            return entry
+        words = _WORD.findall(normalize(query))
+        found: set[str] = set()
+        if words:
+            # Narrow the longest (most selective) words first
+            words.sort(key=len, reverse=True)
+            found = self._prefix_matches(words[0])
+            for word in words[1:]:
+                if not found:
+                    break
+                found &= self._prefix_matches(word)
+        if len(self._cache) >= MAX_CACHED_QUERIES:
+            self._cache.pop(next(iter(self._cache)))
+        entry = self._cache[query] = [found, None, None]
+        return entry
+
+    def search(self, query: str, limit: int = 8, offset: int = 0) -> tuple[list[str], int]:
+        """Return one page of matching entity IDs (by name) and the total match count."""
+        entry = self._matches(query.strip())
+        found, first, ordered = entry
+        if ordered is None and offset == 0 and limit < len(found):
+            # Typing only ever needs the first page: skip sorting every match
+            if first is None or len(first) != limit:
+                first = entry[1] = heapq.nsmallest(limit, found, key=self._sort_keys.__getitem__)
+            return first, len(found)
+        if ordered is None:
+            ordered = entry[2] = sorted(found, key=self._sort_keys.__getitem__)
+        return ordered[offset:offset + limit], len(found)
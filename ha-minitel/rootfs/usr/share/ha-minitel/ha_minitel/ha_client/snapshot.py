@@ -0,0 +1,186 @@
+"""On-disk snapshot of states and areas, for a warm start after a restart.
+
+The snapshot is a base file plus a journal. The base (snapshot.json)
+holds the states, the areas and which area each entity belongs to, in
+compact JSON, and is only ever replaced whole (write, then rename). The
+journal (snapshot.<generation>.journal) appends one line per state
+change since that base, so keeping the snapshot current costs a buffered
+write per event. Once the journal outgrows the states, a new base is
+written from a worker thread and a new journal started.
+
+A restarted add-on loads it before Home Assistant answers, then starts
+a new generation from it; the reload that follows the connection
+reconciles it with Home Assistant.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import time
+from typing import Optional
+
+from .area_index import AreaIndex
+from .store import StoreListener
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 1
+BASE_NAME = "snapshot.json"
+
+# Seconds between flushes of the journal to disk
+FLUSH_INTERVAL = 2.0
+
+# Rewrite the base once the journal has this many lines, or as many as
+# there are states if that is more
+COMPACT_AFTER = 5000
+
+
+def _dumps(value) -> str:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+
+class Snapshot(StoreListener):
+    """Keeps a snapshot in directory current with the store it listens to."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.generation = 0
+        self._states: dict[str, dict] = {}
+        self._areas: list[dict] = []
+        self._area_of: dict[str, str] = {}
+        self._journal = None
+        self._journal_lines = 0
+        self._flushed = 0.0
+        self._compacting: asyncio.Task | None = None
+        self._compact_again = False
+
+    def _journal_path(self, generation: int) -> str:
+        return os.path.join(self.directory, f"snapshot.{generation}.journal")
+
+    def load(self) -> Optional[tuple[list[dict], list[dict], dict[str, str]]]:
+        """Read the snapshot: (states, areas, entity area IDs), or None if there is none."""
+        path = os.path.join(self.directory, BASE_NAME)
+        try:
+            with open(path, "rb") as f:
+                base = json.loads(f.read())
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning("Ignoring unreadable snapshot %s: %s", path, e)
+            return None
+        if base.get("version") != FORMAT_VERSION:
+            return None
+
+        self.generation = base["generation"]
+        states = {s["entity_id"]: s for s in base["states"]}
+        replayed = 0
+        try:
+            with open(self._journal_path(self.generation), encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entity_id, state = json.loads(line)
+                    except ValueError:
+                        break  # cut short by a crash
+                    if state:
+                        states[entity_id] = state
+                    else:
+                        states.pop(entity_id, None)
+                    replayed += 1
+        except FileNotFoundError:
+            pass
+        logger.info("Loaded snapshot: %d states (%d journaled changes), %d areas",
+                    len(states), replayed, len(base["areas"]))
+        self._areas = base["areas"]
+        self._area_of = base["area_of"]
+        return list(states.values()), self._areas, self._area_of
+
+    # StoreListener: a full load (including the restored one, when this
+    # listener is added) rewrites the base; changes go to the journal
+
+    def on_load(self, states: list[dict]) -> None:
+        self._states = {s["entity_id"]: s for s in states}
+        self.compact()
+
+    def on_change(self, entity_id: str, old_state: Optional[dict], new_state: Optional[dict]) -> None:
+        if new_state:
+            self._states[entity_id] = new_state
+        else:
+            self._states.pop(entity_id, None)
+        if self._journal is None:
+            return
+        self._journal.write(_dumps([entity_id, new_state]) + "\n")
+        self._journal_lines += 1
+        now = time.monotonic()
+        if now - self._flushed >= FLUSH_INTERVAL:
+            self._flushed = now
+            self._journal.flush()
+        if self._journal_lines >= max(COMPACT_AFTER, len(self._states)):
+            self.compact()
+
+    def save_areas(self, area_index: AreaIndex) -> None:
+        """Record the areas and memberships just loaded from the registries."""
+        self._areas = area_index.areas
+        self._area_of = area_index.assignments
+        self.compact()
+
+    def compact(self) -> None:
+        """Write a new base from a worker thread (once at a time) and start a new journal."""
+        if self._compacting and not self._compacting.done():
+            self._compact_again = True
+            return
+        self.generation += 1
+        self._open_journal(self.generation)
+        # Copies: the store replaces state dicts but never edits them, so
+        # the thread can serialize them while the loop goes on
+        base = {
+            "version": FORMAT_VERSION,
+            "generation": self.generation,
+            "areas": list(self._areas),
+            "area_of": dict(self._area_of),
+            "states": list(self._states.values()),
+        }
+        self._compacting = asyncio.ensure_future(asyncio.to_thread(self._write_base, base))
+        self._compacting.add_done_callback(self._compacted)
+
+    def _write_base(self, base: dict) -> None:
+        path = os.path.join(self.directory, BASE_NAME)
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(_dumps(base))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+        # Journals of older bases are no longer needed
+        for name in os.listdir(self.directory):
+            if name.startswith("snapshot.") and name.endswith(".journal"):
+                generation = name[len("snapshot."):-len(".journal")]
+                if generation.isdigit() and int(generation) < base["generation"]:
+                    os.remove(os.path.join(self.directory, name))
+
+    def _compacted(self, task: asyncio.Task) -> None:
+        if task.cancelled():
+            return
+        if task.exception():
+            logger.warning("Failed to write snapshot: %s", task.exception())
+        if self._compact_again:
+            self._compact_again = False
+            self.compact()
+
+    def _open_journal(self, generation: int) -> None:
+        if self._journal is not None:
+            self._journal.close()
+        try:
+            self._journal = open(self._journal_path(generation), "w", encoding="utf-8")
+        except OSError as e:
+            logger.warning("Snapshot journal disabled: %s", e)
+            self._journal = None
+        self._journal_lines = 0
+
+    def close(self) -> None:
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
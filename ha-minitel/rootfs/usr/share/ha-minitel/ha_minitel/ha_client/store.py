@@ -0,0 +1,63 @@
+"""Local mirror of Home Assistant entity states."""
+
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from typing import Iterator, Optional
+
+
+class StoreListener(ABC):
+    """Keeps a derived structure (an index) in step with a StateStore."""
+
+    @abstractmethod
+    def on_load(self, states: list[dict]) -> None:
+        """Rebuild from a full set of states."""
+
+    @abstractmethod
+    def on_change(self, entity_id: str, old_state: Optional[dict], new_state: Optional[dict]) -> None:
+        """Apply one change; old_state is None for a new entity, new_state for a removed one."""
+
+
+class StateStore:
+    """Entity states loaded once with get_states, then kept current by state_changed events."""
+
+    def __init__(self):
+        self._states: dict[str, dict] = {}
+        self._listeners: list[StoreListener] = []
+        self.loaded = False
+
+    def add_listener(self, listener: StoreListener) -> None:
+        self._listeners.append(listener)
+        if self.loaded:
+            listener.on_load(list(self._states.values()))
+
+    def load(self, states: list[dict]) -> None:
+        """Replace the whole mirror (initial load or resync)."""
+        self._states = {s["entity_id"]: s for s in states}
+        self.loaded = True
+        for listener in self._listeners:
+            listener.on_load(states)
+
+    def apply(self, entity_id: str, new_state: Optional[dict]) -> None:
+        """Apply a state_changed event; a None new_state removes the entity."""
+        old_state = self._states.get(entity_id)
+        if new_state:
+            self._states[entity_id] = new_state
+        elif old_state is None:
+            return
+        else:
+            del self._states[entity_id]
+        for listener in self._listeners:
+            listener.on_change(entity_id, old_state, new_state or None)
+
+    def get(self, entity_id: str) -> Optional[dict]:
+        return self._states.get(entity_id)
+
+    def all(self) -> list[dict]:
+        return list(self._states.values())
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+    def __iter__(self) -> Iterator[dict]:
+        return iter(self._states.values())
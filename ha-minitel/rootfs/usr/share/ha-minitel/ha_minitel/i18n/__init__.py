@@ -5,12 +5,27 @@ import os
 from typing import Any
 
 
+def _flatten(strings: dict[str, Any], prefix: str = "") -> dict[str, str]:
+    """Map each dot-notation key of a nested locale to its string."""
+    table = {}
+    for name, value in strings.items():
+        if isinstance(value, dict):
+            table.update(_flatten(value, f"{prefix}{name}."))
+        elif isinstance(value, str):
+            table[prefix + name] = value
+    return table
+
+
 class I18n:
-    """Simple i18n with JSON locale files and dot-key lookup."""
+    """Simple i18n with JSON locale files and dot-key lookup.
+
+    The locale is flattened when loaded, so a lookup is a single dict
+    access whatever the depth of the key.
+    """
 
     def __init__(self, language: str = "fr"):
         self._language = language
-        self._strings: dict[str, Any] = {}
+        self._table: dict[str, str] = {}
         self._load(language)
 
     def _load(self, language: str):
@@ -19,19 +34,13 @@ class I18n:
         if not os.path.exists(path):
             path = os.path.join(locale_dir, "fr.json")
         with open(path, "r", encoding="utf-8") as f:
-            self._strings = json.load(f)
+            self._table = _flatten(json.load(f))
 
     def t(self, key: str, **kwargs) -> str:
         """Look up a translation by dot-notation key, with optional formatting."""
-        parts = key.split(".")
-        value: Any = self._strings
-        for part in parts:
-            if isinstance(value, dict) and part in value:
-                value = value[part]
-            else:
-                return key  # fallback: return the key itself
-        if isinstance(value, str):
-            if kwargs:
-                return value.format(**kwargs)
-            return value
-        return key
+        value = self._table.get(key)
+        if value is None:
+            return key  # fallback: return the key itself
+        if kwargs:
+            return value.format(**kwargs)
+        return value
@@ -0,0 +1,190 @@
+"""Event loop lag, slow step detection and an on-demand stack sampler.
+
+Everything shares one asyncio loop, so one slow draw() delays every
+terminal. LoopMonitor samples how late the loop wakes up and times every
+callback and task step the loop runs; steps over the threshold are
+logged and counted with the sessions and screens they ran, as marked by
+Session through touch().
+
+StackSampler is toggled with SIGUSR1: a thread samples the loop thread's
+stack until the next SIGUSR1, then logs the hottest stacks. Samples taken
+while the loop waits for I/O only count towards the busy ratio.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter as Tally
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+# Seconds between lag samples
+LAG_INTERVAL = 0.25
+
+# At most one slow step warning per this many seconds; the rest are counted
+LOG_INTERVAL = 1.0
+
+LOOP_LAG_SECONDS = metrics.REGISTRY.register(metrics.Histogram(
+    "minitel_loop_lag_seconds", "How late the event loop ran a timer"))
+LOOP_SLOW_STEPS = metrics.REGISTRY.register(metrics.Counter(
+    "minitel_loop_slow_steps_total", "Event loop steps over the slow threshold, by screen", ("screen",)))
+LOOP_SLOW_SECONDS = metrics.REGISTRY.register(metrics.Counter(
+    "minitel_loop_slow_seconds_total", "Time the event loop spent in slow steps, by screen", ("screen",)))
+
+_monitor: LoopMonitor | None = None
+# (session, screen) pairs touched by the step being run
+_touched: list = []
+
+
+def touch(session, screen) -> None:
+    """Mark that the current loop step is running code for session's screen."""
+    if _monitor is not None:
+        _touched.append((session, screen))
+
+
+def _describe(handle: asyncio.Handle) -> str:
+    callback = handle._callback
+    owner = getattr(callback, "__self__", None)
+    if isinstance(owner, asyncio.Task):
+        coro = owner.get_coro()
+        return f"task {owner.get_name()} ({getattr(coro, '__qualname__', coro)})"
+    return getattr(callback, "__qualname__", repr(callback))
+
+
+class LoopMonitor:
+    """Samples loop lag and reports loop steps slower than threshold (seconds)."""
+
+    def __init__(self, threshold: float):
+        self.threshold = threshold
+        self._original_run = None
+        self._last_log = 0.0
+        self._suppressed = 0
+
+    def install(self) -> None:
+        """Start timing loop steps (one monitor per process)."""
+        global _monitor
+        if _monitor is not None:
+            return
+        _monitor = self
+        self._original_run = original = asyncio.events.Handle._run
+        monitor = self
+
+        def timed_run(handle):
+            _touched.clear()
+            start = time.perf_counter()
+            original(handle)
+            elapsed = time.perf_counter() - start
+            if elapsed >= monitor.threshold:
+                monitor._slow_step(handle, elapsed)
+
+        asyncio.events.Handle._run = timed_run
+
+    def uninstall(self) -> None:
+        global _monitor
+        if _monitor is self:
+            asyncio.events.Handle._run = self._original_run
+            _monitor = None
+            _touched.clear()
+
+    async def sample_lag(self):
+        """Measure how late a sleep wakes up, forever."""
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + LAG_INTERVAL
+            await asyncio.sleep(LAG_INTERVAL)
+            LOOP_LAG_SECONDS.observe(max(loop.time() - expected, 0.0))
+
+    def _slow_step(self, handle: asyncio.Handle, elapsed: float) -> None:
+        sessions = {}
+        for session, screen in _touched:
+            sessions[session.transport.transport_id] = type(screen).__name__ if screen else "-"
+        _touched.clear()
+        screens = set(sessions.values()) or {"-"}
+        for screen in screens:
+            # Shared between the screens it ran
+            LOOP_SLOW_STEPS.inc(screen)
+            LOOP_SLOW_SECONDS.inc(screen, amount=elapsed / len(screens))
+
+        now = time.monotonic()
+        if now - self._last_log < LOG_INTERVAL:
+            self._suppressed += 1
+            return
+        where = ", ".join(f"{sid} ({screen})" for sid, screen in list(sessions.items())[:5])
+        if len(sessions) > 5:
+            where += f" and {len(sessions) - 5} more"
+        more = f"; {self._suppressed} more slow steps since the last report" if self._suppressed else ""
+        logger.warning("Event loop blocked %.0f ms by %s%s%s", elapsed * 1000, _describe(handle),
+                       f" for {where}" if where else "", more)
+        self._last_log = now
+        self._suppressed = 0
+
+
+class StackSampler:
+    """Samples the loop thread's stack from another thread while running."""
+
+    def __init__(self, interval: float = 0.005, top: int = 15, depth: int = 40):
+        self.interval = interval
+        self.top = top
+        self.depth = depth
+        self.last_report = ""
+        self._thread_id = threading.get_ident()
+        self._thread: threading.Thread | None = None
+        self._stop = threading.Event()
+        self._stacks: Tally = Tally()
+        self._idle = 0
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    def toggle(self) -> None:
+        if self.running:
+            self.stop()
+        else:
+            self.start()
+
+    def start(self) -> None:
+        self._stacks = Tally()
+        self._idle = 0
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+        logger.warning("Profiler started; send SIGUSR1 again to stop it and log the hot stacks")
+
+    def stop(self) -> str:
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        self.last_report = self.folded()
+        busy = sum(self._stacks.values())
+        total = busy + self._idle or 1
+        lines = [f"Profiler stopped: {total} samples, loop busy {busy / total:.0%}; hottest stacks (innermost last):"]
+        for stack, count in self._stacks.most_common(self.top):
+            frames = stack.split(";")
+            lines.append(f"{count / total:6.1%}  {' > '.join(frames[-6:])}")
+        logger.warning("\n".join(lines))
+        return self.last_report
+
+    def folded(self) -> str:
+        """All stacks in folded format ("outer;inner count"), for flame graph tools."""
+        return "".join(f"{stack} {count}\n" for stack, count in self._stacks.most_common())
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._thread_id)
+            frames = []
+            while frame is not None and len(frames) < self.depth:
+                code = frame.f_code
+                frames.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                frame = frame.f_back
+            if frames and frames[0].startswith("selectors.py:"):
+                self._idle += 1  # waiting for I/O
+            elif frames:
+                self._stacks[";".join(reversed(frames))] += 1
@@ -0,0 +1,210 @@
+"""Prometheus text-format metrics and the HTTP endpoint that serves them.
+
+Recording is a dict update (histograms add a bisect), so instruments
+stay in place whether or not the endpoint is enabled. Values that
+already exist elsewhere (sessions, transport counters, pending
+commands) are read by collectors at scrape time instead.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import bisect
+import logging
+import math
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+# Seconds; covers a fast partial update up to a slow HA round trip
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+REQUEST_TIMEOUT = 5.0
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _number(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Metric:
+    """A named family of samples, one per combination of label values."""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, help_text: str, labels: tuple[str, ...] = ()):
+        self.name = name
+        self.help = help_text
+        self.labels = labels
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def set(self, value: float, *labels: str) -> None:
+        self._values[labels] = value
+
+    def clear(self) -> None:
+        self._values.clear()
+
+    def _label_text(self, values: tuple[str, ...], extra: str = "") -> str:
+        pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(self.labels, values)]
+        if extra:
+            pairs.append(extra)
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+    def samples(self) -> list[str]:
+        return [f"{self.name}{self._label_text(k)} {_number(v)}" for k, v in self._values.items()]
+
+    def render(self) -> list[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}", *self.samples()]
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        self._values[labels] = self._values.get(labels, 0.0) + amount
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+
+class Histogram(Metric):
+    """Fixed buckets; counts are stored per bucket and summed up when rendered."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labels: tuple[str, ...] = (),
+                 buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(buckets)
+        # labels -> [per-bucket counts (+Inf last), sum, count]
+        self._series: dict[tuple[str, ...], list] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        series[0][bisect.bisect_left(self.buckets, value)] += 1
+        series[1] += value
+        series[2] += 1
+
+    def clear(self) -> None:
+        self._series.clear()
+
+    def series(self) -> dict[tuple[str, ...], tuple[list[int], float, int]]:
+        """labels -> (per-bucket counts, sum, count), for callers other than render()."""
+        return {k: (list(v[0]), v[1], v[2]) for k, v in self._series.items()}
+
+    def samples(self) -> list[str]:
+        lines = []
+        for labels, (counts, total, count) in self._series.items():
+            cumulative = 0
+            for bound, n in zip(self.buckets + (math.inf,), counts):
+                cumulative += n
+                le = self._label_text(labels, f'le="{_number(bound)}"')
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            lines.append(f"{self.name}_sum{self._label_text(labels)} {_number(total)}")
+            lines.append(f"{self.name}_count{self._label_text(labels)} {count}")
+        return lines
+
+
+class Registry:
+    """Metrics plus collectors that refresh gauges just before rendering."""
+
+    def __init__(self):
+        self._metrics: list[Metric] = []
+        self._collectors: list[Callable[[], None]] = []
+
+    def register(self, metric: Metric) -> Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def add_collector(self, collector: Callable[[], None]) -> None:
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        for collector in self._collectors:
+            try:
+                collector()
+            except Exception:
+                logger.exception("Metrics collector failed")
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+SESSIONS = REGISTRY.register(Gauge(
+    "minitel_sessions", "Active sessions by transport type", ("transport",)))
+SESSION_BYTES = REGISTRY.register(Counter(
+    "minitel_session_sent_bytes_total", "Bytes sent to each session's terminal", ("session", "transport")))
+SESSION_FRAMES = REGISTRY.register(Counter(
+    "minitel_session_sent_frames_total", "Frames (WebSocket messages, socket and serial writes) sent per session",
+    ("session", "transport")))
+SESSION_QUEUED_BYTES = REGISTRY.register(Gauge(
+    "minitel_session_queued_bytes", "Bytes accepted for a session but not yet written out", ("session", "transport")))
+SCREEN_DRAW_SECONDS = REGISTRY.register(Histogram(
+    "minitel_screen_draw_seconds", "Time to build a full screen", ("screen",)))
+HA_CONNECTED = REGISTRY.register(Gauge(
+    "minitel_ha_connected", "Whether the Home Assistant WebSocket is connected"))
+HA_COMMAND_SECONDS = REGISTRY.register(Histogram(
+    "minitel_ha_command_seconds", "Home Assistant command round-trip time", ("type",)))
+HA_PENDING_COMMANDS = REGISTRY.register(Gauge(
+    "minitel_ha_pending_commands", "Home Assistant commands awaiting a result"))
+HA_EVENTS = REGISTRY.register(Counter(
+    "minitel_ha_events_total", "Events received from Home Assistant", ("event_type",)))
+
+
+class MetricsServer:
+    """Serves GET /metrics, plus any routes added, over plain HTTP/1.0."""
+
+    def __init__(self, port: int, registry: Registry = REGISTRY, host: str = "0.0.0.0"):
+        self.port = port
+        self.host = host
+        self.registry = registry
+        # path -> (content type, body builder)
+        self._routes: dict[str, tuple[str, Callable[[], str]]] = {
+            "/metrics": (CONTENT_TYPE, registry.render),
+        }
+
+    def add_route(self, path: str, content_type: str, render: Callable[[], str]) -> None:
+        self._routes[path] = (content_type, render)
+
+    async def serve(self):
+        server = await asyncio.start_server(self._handle, self.host, self.port)
+        async with server:
+            await server.serve_forever()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            request = await asyncio.wait_for(reader.readline(), REQUEST_TIMEOUT)
+            # Headers are not needed, but must be read before answering
+            while (await asyncio.wait_for(reader.readline(), REQUEST_TIMEOUT)).strip():
+                pass
+            parts = request.decode("latin-1").split()
+            path = parts[1].split("?")[0] if len(parts) >= 2 else ""
+            route = self._routes.get(path) if parts and parts[0] == "GET" else None
+            if route:
+                content_type, render = route
+                status, body = "200 OK", render().encode()
+            else:
+                content_type, status, body = "text/plain; charset=utf-8", "404 Not Found", b"Not found\n"
+            writer.write(
+                f"HTTP/1.0 {status}\r\nContent-Type: {content_type}\r\n"
+                f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode() + body
+            )
+            await writer.drain()
+        except (asyncio.TimeoutError, ConnectionError):
+            pass
+        finally:
+            writer.close()
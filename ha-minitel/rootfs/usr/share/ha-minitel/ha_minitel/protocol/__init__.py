@@ -4,5 +4,6 @@ from .base import MinitelProtocol
 from .videotex import VideotexProtocol
 from .constants import *
 from .input_handler import InputEvent, EventType
+from .emulator import VideotexEmulator
 
-__all__ = ["MinitelProtocol", "VideotexProtocol", "InputEvent", "EventType"]
+__all__ = ["MinitelProtocol", "VideotexProtocol", "VideotexEmulator", "InputEvent", "EventType"]
@@ -26,6 +26,14 @@ class MinitelProtocol(ABC):
     def text(self, s: str) -> bytes:
         """Encode a text string with accent support."""
 
+    def static_text(self, s: str) -> bytes:
+        """Encode a string drawn again and again, such as a translated label.
+
+        Implementations may keep the encoding; only pass strings from a
+        small set, not entity states or user input.
+        """
+        return self.text(s)
+
     @abstractmethod
     def set_text_color(self, color: int) -> bytes:
         """Set text foreground color."""
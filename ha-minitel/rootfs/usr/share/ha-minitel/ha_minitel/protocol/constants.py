@@ -17,6 +17,28 @@ SS2 = 0x19  # Single shift 2 (accented characters)
 REP = 0x12  # Repeat character
 SP = 0x20  # Space
 DEL = 0x7F  # Delete
+SOH = 0x01  # Start of ROM identification reply
+EOT = 0x04  # End of ROM identification reply
+
+# Protocol commands: ESC + PROn + code [+ args]
+PRO1 = 0x39
+PRO2 = 0x3A
+PRO3 = 0x3B
+ENQROM = 0x7B  # PRO1: request ROM identification
+PROG = 0x6B  # PRO2: program serial speed
+STATUS_SPEED = 0x74  # PRO1: request current serial speed
+REP_STATUS_SPEED = 0x75  # PRO2 reply to STATUS_SPEED and PROG
+START = 0x69  # PRO2: enable a mode
+STOP = 0x6A  # PRO2: disable a mode
+ROULEAU = 0x43  # Scrolling mode (for START/STOP)
+
+# Serial speed codes used by PROG and REP_STATUS_SPEED
+SPEED_CODES = {
+    300: 0x52,
+    1200: 0x64,
+    4800: 0x76,
+    9600: 0x7F,
+}
 
 # Cursor positioning: US row col (row and col offset by 0x40)
 CURSOR_POS_OFFSET = 0x40
@@ -100,3 +122,35 @@ ACCENT_MAP = {
     "ü": (ACCENT_DIAERESIS, ord("u")),
     "ç": (ACCENT_CEDILLA, ord("c")),
 }
+
+# G2 symbols: char -> SS2 + code
+G2_SYMBOL_MAP = {
+    "£": 0x23,
+    "§": 0x27,
+    "°": 0x30,
+    "±": 0x31,
+    "¼": 0x3C,
+    "½": 0x3D,
+    "¾": 0x3E,
+    "Œ": 0x6A,
+    "œ": 0x7A,
+    "ß": 0x7B,
+}
+
+# Plain fallbacks when the terminal has no G2 set
+G2_FALLBACK_MAP = {
+    "£": "L",
+    "§": "S",
+    "°": "o",
+    "±": "+",
+    "¼": "1/4",
+    "½": "1/2",
+    "¾": "3/4",
+    "Œ": "OE",
+    "œ": "oe",
+    "ß": "ss",
+}
+
+# REP count is sent as 0x40 + n, n in 1..63
+REP_OFFSET = 0x40
+REP_MAX = 63
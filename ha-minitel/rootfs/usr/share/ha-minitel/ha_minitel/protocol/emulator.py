@@ -0,0 +1,267 @@
+"""Headless Videotex terminal: applies a byte stream to a 40x24 cell grid.
+
+Used to check renderer output without a Minitel: two byte streams are
+equivalent when they leave the same snapshot(). Attributes are modelled
+per character (each printed cell takes the current colours and styles)
+rather than with the Minitel's serial delimiters, which is how the
+renderer uses them.
+"""
+
+from __future__ import annotations
+
+from typing import NamedTuple
+
+from . import constants as C
+
+VT = 0x0B  # Cursor up
+CAN = 0x18  # Clear to end of line
+CSI = 0x5B  # ESC [ starts a CSI sequence
+
+# SS2 sequences back to characters
+_ACCENTED = {(code, base): ch for ch, (code, base) in C.ACCENT_MAP.items()}
+_G2_SYMBOLS = {code: ch for ch, code in C.G2_SYMBOL_MAP.items()}
+_ACCENT_CODES = {code for code, _ in C.ACCENT_MAP.values()}
+
+# ESC + PROn takes n more bytes
+_PRO_LENGTHS = {C.PRO1: 1, C.PRO2: 2, C.PRO3: 3}
+
+
+class Cell(NamedTuple):
+    """One character position and the attributes it was written with."""
+
+    char: str = " "
+    fg: int = C.COLOR_WHITE
+    bg: int = C.COLOR_BLACK
+    double_height: bool = False
+    double_width: bool = False
+    underline: bool = False
+    invert: bool = False
+    blink: bool = False
+
+
+BLANK = Cell()
+
+# Pen = the attribute fields of a Cell, applied to each printed character
+_DEFAULT_PEN = tuple(BLANK)[1:]
+
+
+class VideotexEmulator:
+    """Interprets Videotex output the way a Minitel screen would show it.
+
+    Handles cursor moves (US, CR, LF, BS, HT, VT, RS), clears (FF, CAN),
+    ESC colour and style attributes, SS2 accents and G2 symbols, REP, and
+    skips PRO1/2/3 commands (tracking scrolling mode). Input can be fed in
+    arbitrary chunks.
+    """
+
+    def __init__(self, scroll: bool = False):
+        self.scroll = scroll
+        self.reset()
+
+    def reset(self):
+        """Power-on state: blank screen, cursor home and hidden."""
+        # Row 0 is the status line, rows 1-24 the page
+        self.grid: list[list[Cell]] = [
+            [BLANK] * C.SCREEN_COLS for _ in range(C.SCREEN_ROWS + 1)
+        ]
+        self.row = 1
+        self.col = 1
+        self.cursor_visible = False
+        self.bells = 0
+        self._pen = _DEFAULT_PEN
+        self._last = " "
+        self._pending = b""
+
+    @property
+    def cursor(self) -> tuple[int, int]:
+        return self.row, self.col
+
+    def feed(self, data: bytes) -> None:
+        """Apply bytes; an incomplete trailing sequence waits for the next call."""
+        if self._pending:
+            data = self._pending + data
+            self._pending = b""
+        i = 0
+        n = len(data)
+        while i < n:
+            b = data[i]
+            if 0x20 <= b <= 0x7F:
+                self._put(chr(b))
+                i += 1
+                continue
+            end = self._control(data, i)
+            if end is None:
+                self._pending = bytes(data[i:])
+                return
+            i = end
+
+    def _control(self, data: bytes, i: int) -> int | None:
+        """Apply the control sequence at data[i]; return the index after it."""
+        b = data[i]
+        n = len(data)
+        if b == C.US:
+            if i + 3 > n:
+                return None
+            self._move(data[i + 1] - C.CURSOR_POS_OFFSET, data[i + 2] - C.CURSOR_POS_OFFSET)
+            return i + 3
+        if b == C.ESC:
+            return self._escape(data, i)
+        if b == C.SS2:
+            return self._ss2(data, i)
+        if b == C.REP:
+            if i + 2 > n:
+                return None
+            for _ in range(data[i + 1] - C.REP_OFFSET):
+                self._put(self._last)
+            return i + 2
+        if b == C.SEP:
+            return i + 2 if i + 2 <= n else None
+        if b == C.FF:
+            for row in range(1, C.SCREEN_ROWS + 1):
+                self.grid[row] = [BLANK] * C.SCREEN_COLS
+            self._move(1, 1)
+        elif b == C.RS:
+            self._move(1, 1)
+        elif b == C.CR:
+            self.col = 1
+        elif b == C.LF:
+            self._line_feed()
+        elif b == VT:
+            if self.row > 1:
+                self.row -= 1
+        elif b == C.BS:
+            self.col -= 1
+            if self.col < 1:
+                self.col = C.SCREEN_COLS
+                if self.row > 1:
+                    self.row -= 1
+        elif b == C.HT:
+            self._advance(1)
+        elif b == CAN:
+            row = self.grid[self.row]
+            for col in range(self.col - 1, C.SCREEN_COLS):
+                row[col] = Cell(" ", *self._pen)
+        elif b == C.CON:
+            self.cursor_visible = True
+        elif b == C.COFF:
+            self.cursor_visible = False
+        elif b == C.BEL:
+            self.bells += 1
+        return i + 1
+
+    def _escape(self, data: bytes, i: int) -> int | None:
+        n = len(data)
+        if i + 2 > n:
+            return None
+        code = data[i + 1]
+        if code in _PRO_LENGTHS:
+            end = i + 2 + _PRO_LENGTHS[code]
+            if end > n:
+                return None
+            if code == C.PRO2 and data[i + 3] == C.ROULEAU:
+                if data[i + 2] == C.START:
+                    self.scroll = True
+                elif data[i + 2] == C.STOP:
+                    self.scroll = False
+            return end
+        if code == CSI:
+            j = i + 2
+            while j < n and not 0x40 <= data[j] <= 0x7E:
+                j += 1
+            return j + 1 if j < n else None
+        self._attribute(code)
+        return i + 2
+
+    def _attribute(self, code: int):
+        fg, bg, dh, dw, ul, inv, blink = self._pen
+        if C.ATTR_TEXT <= code <= C.ATTR_TEXT + 7:
+            fg = code - C.ATTR_TEXT
+        elif C.ATTR_BG <= code <= C.ATTR_BG + 7:
+            bg = code - C.ATTR_BG
+        elif code == C.STYLE_NORMAL_SIZE:
+            dh = dw = False
+        elif code == C.STYLE_DOUBLE_HEIGHT:
+            dh, dw = True, False
+        elif code == C.STYLE_DOUBLE_WIDTH:
+            dh, dw = False, True
+        elif code == C.STYLE_DOUBLE_SIZE:
+            dh = dw = True
+        elif code in (C.STYLE_UNDERLINE_ON, C.STYLE_UNDERLINE_OFF):
+            ul = code == C.STYLE_UNDERLINE_ON
+        elif code in (C.STYLE_INVERT_ON, C.STYLE_INVERT_OFF):
+            inv = code == C.STYLE_INVERT_ON
+        elif code in (C.STYLE_BLINK_ON, C.STYLE_BLINK_OFF):
+            blink = code == C.STYLE_BLINK_ON
+        self._pen = (fg, bg, dh, dw, ul, inv, blink)
+
+    def _ss2(self, data: bytes, i: int) -> int | None:
+        n = len(data)
+        if i + 2 > n:
+            return None
+        code = data[i + 1]
+        if code in _ACCENT_CODES:
+            if i + 3 > n:
+                return None
+            self._put(_ACCENTED.get((code, data[i + 2]), chr(data[i + 2])))
+            return i + 3
+        self._put(_G2_SYMBOLS.get(code, "?"))
+        return i + 2
+
+    def _move(self, row: int, col: int):
+        """Absolute positioning; like the Minitel, it resets attributes."""
+        self.row = min(max(row, 0), C.SCREEN_ROWS)
+        self.col = min(max(col, 1), C.SCREEN_COLS)
+        self._pen = _DEFAULT_PEN
+
+    def _put(self, ch: str):
+        self.grid[self.row][self.col - 1] = Cell(ch, *self._pen)
+        self._last = ch
+        self._advance(2 if self._pen[3] else 1)
+
+    def _advance(self, cols: int):
+        self.col += cols
+        if self.col > C.SCREEN_COLS:
+            if self.row == 0:
+                self.col = C.SCREEN_COLS  # the status line does not wrap
+                return
+            self.col = 1
+            self._line_feed()
+
+    def _line_feed(self):
+        if self.row == 0:
+            return
+        if self.row < C.SCREEN_ROWS:
+            self.row += 1
+        elif self.scroll:
+            del self.grid[1]
+            self.grid.append([BLANK] * C.SCREEN_COLS)
+        else:
+            self.row = 1
+
+    def cell(self, row: int, col: int) -> Cell:
+        """Cell at 1-based col of row (0 is the status line)."""
+        return self.grid[row][col - 1]
+
+    def line(self, row: int) -> str:
+        """Characters shown on a row, without attributes."""
+        return "".join(cell.char for cell in self.grid[row])
+
+    def text(self) -> str:
+        """The 24 page rows as text, one line per row."""
+        return "\n".join(self.line(row) for row in range(1, C.SCREEN_ROWS + 1))
+
+    def snapshot(self) -> tuple:
+        """Hashable screen contents (characters and attributes) for comparisons.
+
+        Attributes that cannot be seen (the colour, blinking of a plain
+        space) are normalized away, so padding written in another colour
+        still compares equal to a blank.
+        """
+        return tuple(tuple(_visible(cell) for cell in row) for row in self.grid)
+
+
+def _visible(cell: Cell) -> Cell:
+    if cell.char == " " and not (cell.invert or cell.underline):
+        if cell.fg != C.COLOR_WHITE or cell.blink:
+            return cell._replace(fg=C.COLOR_WHITE, blink=False)
+    return cell
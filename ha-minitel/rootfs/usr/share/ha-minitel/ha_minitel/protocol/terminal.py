@@ -0,0 +1,99 @@
+"""Minitel terminal identification, capability profiles and speed programming."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Optional
+
+from . import constants as C
+
+# ROM type byte -> (model name, highest supported serial speed)
+TERMINAL_MODELS = {
+    ord("b"): ("Minitel 1", 1200),
+    ord("c"): ("Minitel 1", 1200),
+    ord("d"): ("Minitel 10", 1200),
+    ord("e"): ("Minitel 1 couleur", 1200),
+    ord("f"): ("Minitel 10", 1200),
+    ord("g"): ("Emulateur", 9600),
+    ord("r"): ("Minitel 1", 1200),
+    ord("s"): ("Minitel 1 couleur", 1200),
+    ord("t"): ("Terminatel 252", 1200),
+    ord("u"): ("Minitel 1B", 4800),
+    ord("v"): ("Minitel 2", 9600),
+    ord("w"): ("Minitel 10B", 4800),
+    ord("y"): ("Minitel 5", 9600),
+    ord("z"): ("Minitel 12", 9600),
+}
+
+
+@dataclass(frozen=True)
+class TerminalProfile:
+    """Terminal identity and the encoding features it supports.
+
+    repeat: REP run-length encoding of repeated characters
+    g2: SS2 accented letters and G2 symbols
+    """
+
+    rom: bytes
+    model: str
+    max_speed: int = 1200
+    repeat: bool = True
+    g2: bool = True
+
+
+# Terminals that do not answer ENQROM (most browser emulators) get the
+# encoding the add-on has always sent.
+DEFAULT_PROFILE = TerminalProfile(rom=b"", model="Unknown", repeat=False)
+
+
+def enq_rom() -> bytes:
+    """Request the terminal ROM identification (reply: SOH x y z EOT)."""
+    return bytes([C.ESC, C.PRO1, C.ENQROM])
+
+
+def find_rom_reply(data: bytes) -> Optional[tuple[int, int]]:
+    """Return the (start, end) slice of the first ROM reply in data."""
+    start = data.find(C.SOH)
+    if start < 0 or len(data) < start + 5 or data[start + 4] != C.EOT:
+        return None
+    return start, start + 5
+
+
+def parse_rom(data: bytes) -> Optional[TerminalProfile]:
+    """Decode the first complete ROM identification reply found in data."""
+    span = find_rom_reply(data)
+    if span is None:
+        return None
+    start, end = span
+    return profile_from_rom(bytes(data[start + 1:end - 1]))
+
+
+@lru_cache(maxsize=None)
+def profile_from_rom(rom: bytes) -> TerminalProfile:
+    """Build (once per ROM) the profile for a 3-byte ROM identification."""
+    model, max_speed = TERMINAL_MODELS.get(rom[1], ("Minitel", 1200))
+    return TerminalProfile(rom=rom, model=model, max_speed=max_speed)
+
+
+def program_speed(speed: int) -> bytes:
+    """Ask the terminal to switch its serial port to the given speed."""
+    return bytes([C.ESC, C.PRO2, C.PROG, C.SPEED_CODES[speed]])
+
+
+def query_speed() -> bytes:
+    """Request the current serial speed (reply: ESC PRO2 REP_STATUS_SPEED x)."""
+    return bytes([C.ESC, C.PRO1, C.STATUS_SPEED])
+
+
+def parse_speed_status(data: bytes) -> Optional[int]:
+    """Decode the speed from a REP_STATUS_SPEED reply found in data."""
+    prefix = bytes([C.ESC, C.PRO2, C.REP_STATUS_SPEED])
+    start = data.find(prefix)
+    if start < 0 or len(data) < start + 4:
+        return None
+    code = data[start + 3] & 0x07
+    for speed, speed_code in C.SPEED_CODES.items():
+        if speed_code & 0x07 == code:
+            return speed
+    return None
@@ -1,11 +1,27 @@
 """Concrete Videotex protocol implementation."""
 
+from __future__ import annotations
+
 from .base import MinitelProtocol
 from . import constants as C
+from .terminal import DEFAULT_PROFILE, TerminalProfile
+
+# Most encoded labels kept per protocol; the cache starts over when full
+STATIC_CACHE_SIZE = 4096
 
 
 class VideotexProtocol(MinitelProtocol):
-    """Encodes Minitel Videotex display commands."""
+    """Encodes Minitel Videotex display commands.
+
+    The terminal profile selects the encoding features used: REP run-length
+    compression and G2 accents and symbols.
+    """
+
+    def __init__(self, profile: TerminalProfile = DEFAULT_PROFILE):
+        self.profile = profile
+        # Protocols are shared per profile, so labels are encoded once per
+        # profile for the language the application runs in
+        self._static: dict[str, bytes] = {}
 
     def clear_screen(self) -> bytes:
         return bytes([C.FF])
@@ -20,13 +36,41 @@ class VideotexProtocol(MinitelProtocol):
         return bytes([C.COFF])
 
     def text(self, s: str) -> bytes:
+        g2 = self.profile.g2
+        repeat = self.profile.repeat
         result = bytearray()
-        for ch in s:
+        i = 0
+        n = len(s)
+        while i < n:
+            ch = s[i]
+            i += 1
             if ch in C.ACCENT_MAP:
                 accent_code, base_char = C.ACCENT_MAP[ch]
-                result.extend([C.SS2, accent_code, base_char])
+                if g2:
+                    result.extend([C.SS2, accent_code, base_char])
+                else:
+                    result.append(base_char)
+            elif ch in C.G2_SYMBOL_MAP:
+                if g2:
+                    result.extend([C.SS2, C.G2_SYMBOL_MAP[ch]])
+                else:
+                    result.extend(C.G2_FALLBACK_MAP[ch].encode("ascii"))
             elif ch == "\n":
                 result.extend([C.CR, C.LF])
+            elif " " <= ch < "\x7f":
+                result.append(ord(ch))
+                if repeat:
+                    # REP repeats the last character: worth it from 4 in a row
+                    j = i
+                    while j < n and s[j] == ch:
+                        j += 1
+                    run = j - i
+                    if run >= 3:
+                        while run > 0:
+                            count = min(run, C.REP_MAX)
+                            result.extend([C.REP, C.REP_OFFSET + count])
+                            run -= count
+                        i = j
             elif ord(ch) < 0x80:
                 result.append(ord(ch))
             else:
@@ -34,6 +78,14 @@ class VideotexProtocol(MinitelProtocol):
                 result.append(ord("?"))
         return bytes(result)
 
+    def static_text(self, s: str) -> bytes:
+        encoded = self._static.get(s)
+        if encoded is None:
+            if len(self._static) >= STATIC_CACHE_SIZE:
+                self._static.clear()
+            encoded = self._static[s] = self.text(s)
+        return encoded
+
     def set_text_color(self, color: int) -> bytes:
         return bytes([C.ESC, C.ATTR_TEXT + color])
 
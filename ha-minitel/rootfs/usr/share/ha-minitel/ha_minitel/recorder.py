@@ -0,0 +1,156 @@
+"""Recording of Home Assistant traffic and Minitel input, for replay.
+
+A recording is a gzip-compressed file of JSON lines. The first line is a
+header; each following line is one record, a list starting with the
+seconds elapsed since recording began and the record kind:
+
+    [t, "ha", frame]                    text frame received from Home Assistant
+    [t, "out", command]                 command sent to Home Assistant
+    [t, "open", transport_id, kind, rom] session started (rom: "" unless known at connect time)
+    [t, "in", transport_id, data]       input bytes, decoded as latin-1
+    [t, "close", transport_id]
+
+Frames are stored as received, so an event storm replays byte for byte.
+The authentication exchange is not recorded. bench/replay.py feeds a
+recording back through the application.
+"""
+
+from __future__ import annotations
+
+import gzip
+import json
+import logging
+import os
+import time
+from datetime import datetime, timezone
+from typing import Iterator
+
+from .transport.base import CloseReason, Transport, TransportStats
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 1
+
+# Seconds between flushes of the compressed stream to disk. If the process
+# is killed, the recording is readable up to the last flush.
+FLUSH_INTERVAL = 1.0
+
+
+class Recorder:
+    """Appends records to a recording file."""
+
+    def __init__(self, path: str, settings: dict | None = None):
+        # strftime fields give each run its own file
+        self.path = path = time.strftime(path)
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._file = gzip.open(path, "wt", encoding="utf-8", compresslevel=6)
+        self._start = time.monotonic()
+        self._flushed = self._start
+        self._write({
+            "version": FORMAT_VERSION,
+            "started": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            # What shapes the screens besides the traffic, for the replay
+            "settings": settings or {},
+        })
+        logger.info("Recording to %s", path)
+
+    def _write(self, record) -> None:
+        if self._file is None:
+            return
+        self._file.write(json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n")
+        now = time.monotonic()
+        if now - self._flushed >= FLUSH_INTERVAL:
+            self._flushed = now
+            self._file.flush()
+
+    def _record(self, kind: str, *fields) -> None:
+        self._write([round(time.monotonic() - self._start, 4), kind, *fields])
+
+    def ha_frame(self, frame: str) -> None:
+        self._record("ha", frame)
+
+    def command(self, payload: dict) -> None:
+        self._record("out", payload)
+
+    def opened(self, transport_id: str, kind: str, rom: bytes) -> None:
+        self._record("open", transport_id, kind, rom.decode("latin-1"))
+
+    def input(self, transport_id: str, data: bytes) -> None:
+        self._record("in", transport_id, data.decode("latin-1"))
+
+    def closed(self, transport_id: str) -> None:
+        self._record("close", transport_id)
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def read_recording(path: str) -> tuple[dict, Iterator[list]]:
+    """Return a recording's header and an iterator over its records."""
+    file = gzip.open(path, "rt", encoding="utf-8")
+    header = json.loads(file.readline())
+    if header.get("version") != FORMAT_VERSION:
+        file.close()
+        raise ValueError(f"Unsupported recording version: {header.get('version')}")
+
+    def records():
+        with file:
+            try:
+                for line in file:
+                    if line.strip():
+                        yield json.loads(line)
+            except (EOFError, json.JSONDecodeError):
+                # Killed while recording: the last line may be cut short
+                logger.warning("Recording %s is truncated", path)
+
+    return header, records()
+
+
+class RecordingTransport(Transport):
+    """Wraps a transport and records the input read from it."""
+
+    def __init__(self, inner: Transport, recorder: Recorder):
+        # No Transport.__init__: state, counters and close tracking are the inner transport's
+        self.inner = inner
+        self.recorder = recorder
+        self.kind = inner.kind
+
+    async def send(self, data: bytes) -> None:
+        await self.inner.send(data)
+
+    async def recv(self) -> bytes:
+        data = await self.inner.recv()
+        self.recorder.input(self.inner.transport_id, data)
+        return data
+
+    async def close(self, reason: CloseReason = CloseReason.LOCAL) -> None:
+        await self.inner.close(reason)
+
+    @property
+    def is_connected(self) -> bool:
+        return self.inner.is_connected
+
+    @property
+    def transport_id(self) -> str:
+        return self.inner.transport_id
+
+    @property
+    def stats(self) -> TransportStats:
+        return self.inner.stats
+
+    @property
+    def buffered(self) -> int:
+        return self.inner.buffered
+
+    @property
+    def terminal_profile(self):
+        return self.inner.terminal_profile
+
+    @property
+    def close_reason(self) -> CloseReason | None:
+        return self.inner.close_reason
+
+    async def wait_closed(self) -> CloseReason:
+        return await self.inner.wait_closed()
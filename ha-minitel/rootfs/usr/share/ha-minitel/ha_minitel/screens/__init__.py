@@ -7,8 +7,12 @@ from .entity_detail import EntityDetailScreen
 from .entity_control import EntityControlScreen
 from .automations import AutomationsScreen
 from .logs import LogsScreen
+from .search import SearchScreen
+from .favorites import FavoritesScreen
+from .connecting import ConnectingScreen
 
 __all__ = [
     "Screen", "HomeScreen", "RoomsScreen", "EntityDetailScreen",
     "EntityControlScreen", "AutomationsScreen", "LogsScreen",
+    "SearchScreen", "FavoritesScreen", "ConnectingScreen",
 ]
@@ -12,6 +12,16 @@ from ..protocol.input_handler import InputEvent, EventType
 logger = logging.getLogger(__name__)
 
 ITEMS_PER_PAGE = 8
+FIRST_ROW = 5
+STATUS_ROW = 21
+PROMPT_ROW = 22
+
+# Domain -> service that runs one of its entities
+TRIGGER_SERVICES = {
+    "automation": "trigger",
+    "script": "turn_on",
+    "scene": "turn_on",
+}
 
 
 def friendly_name(entity: dict) -> str:
@@ -19,14 +29,27 @@ def friendly_name(entity: dict) -> str:
 
 
 class AutomationsScreen(Screen):
-    """List automations with pagination, trigger with N+ENVOI."""
+    """List automations with pagination, trigger with N+ENVOI.
+
+    The list is paged straight from the client's domain index; page flips
+    and state changes rewrite only the rows that differ. Scripts and
+    scenes can be listed the same way by passing their domain.
+    """
 
-    def __init__(self, session):
+    def __init__(self, session, domain: str = "automation"):
         super().__init__(session)
-        self.automations: list[dict] = []
+        self.domain = domain
+        self.automations: list[dict] = []  # current page
         self.page = 0
-        self.total_pages = 1
+        self.total = 0
         self.input_buf = ""
+        self._shown: dict[int, tuple[str, str]] = {}  # row -> (name, state)
+        self._page_text = ""
+        self._status = ""
+
+    @property
+    def total_pages(self) -> int:
+        return max(1, math.ceil(self.total / ITEMS_PER_PAGE))
 
     async def draw(self) -> bytes:
         p = self.protocol
@@ -36,48 +59,88 @@ class AutomationsScreen(Screen):
         buf += p.clear_screen()
         buf += p.hide_cursor()
 
-        buf += self.draw_header(i18n.t("automations.title"))
+        buf += self.draw_header_label("automations.title")
+        self._shown = {}
+        self._page_text = ""
+        self._status = ""
+
+        await self._load_page()
+        buf += self._draw_rows()
+
+        buf += self.draw_label(20, "automations.trigger", C.COLOR_CYAN)
+        buf += self.draw_footer_label("automations.footer")
+        buf += self._prompt()
+        return bytes(buf)
 
+    async def _load_page(self):
         try:
-            self.automations = await self.session.ha_client.get_automations()
+            self.automations, self.total = await self.session.ha_client.get_domain_entities(
+                self.domain, self.page * ITEMS_PER_PAGE, ITEMS_PER_PAGE
+            )
         except Exception:
             logger.exception("Failed to load automations")
-            self.automations = []
-
-        self.total_pages = max(1, math.ceil(len(self.automations) / ITEMS_PER_PAGE))
-
-        # Page info
-        buf += p.move_cursor(3, 1)
-        buf += p.set_text_color(C.COLOR_CYAN)
-        buf += p.text(i18n.t("rooms.page", current=self.page + 1, total=self.total_pages))
-
-        start = self.page * ITEMS_PER_PAGE
-        page_items = self.automations[start:start + ITEMS_PER_PAGE]
-
-        for i, auto in enumerate(page_items):
-            name = friendly_name(auto)
-            state = auto.get("state", "?")[:5]
-            buf += self.draw_menu_item(5 + i, i + 1, name, state)
+            self.automations, self.total = [], 0
+        if self.page >= self.total_pages:
+            # Entities were removed under the last page
+            self.page = self.total_pages - 1
+            await self._load_page()
+
+    def _slice_page(self):
+        """Re-read the current page from the domain index, without awaiting Home Assistant."""
+        ha_client = self.session.ha_client
+        self.automations, self.total = ha_client.domain_entities(
+            self.domain, self.page * ITEMS_PER_PAGE, ITEMS_PER_PAGE
+        )
+        if self.page >= self.total_pages:
+            self.page = self.total_pages - 1
+            self._slice_page()
+
+    def _draw_rows(self) -> bytes:
+        """Rewrite the page indicator and the rows whose content changed."""
+        p = self.protocol
+        buf = bytearray()
 
-        buf += self.draw_text_line(20, i18n.t("automations.trigger"), C.COLOR_CYAN)
+        page_text = self.i18n.t("rooms.page", current=self.page + 1, total=self.total_pages)
+        if page_text != self._page_text:
+            buf += p.move_cursor(3, 1)
+            buf += p.set_text_color(C.COLOR_CYAN)
+            buf += p.text(page_text.ljust(len(self._page_text)))
+            self._page_text = page_text
+
+        for i in range(ITEMS_PER_PAGE):
+            row = FIRST_ROW + i
+            previous = self._shown.get(row)
+            if i < len(self.automations):
+                auto = self.automations[i]
+                current = (friendly_name(auto)[:30], auto.get("state", "?")[:5])
+                if current != previous:
+                    buf += self.redraw_menu_item(row, i + 1, *current, previous)
+                    self._shown[row] = current
+            elif previous:
+                buf += self.clear_row(row)
+                del self._shown[row]
+        return bytes(buf)
 
-        # Input prompt
-        buf += p.move_cursor(22, 1)
+    def _prompt(self) -> bytes:
+        p = self.protocol
+        buf = bytearray()
+        buf += p.move_cursor(PROMPT_ROW, 1)
         buf += p.set_text_color(C.COLOR_WHITE)
-        buf += p.text("N\xb0: ")
+        buf += p.text("N\xb0: " + self.input_buf)
         buf += p.show_cursor()
-
-        buf += self.draw_footer(i18n.t("automations.footer"))
         return bytes(buf)
 
+    async def _flip(self, page: int) -> bytes:
+        self.page = page
+        await self._load_page()
+        return self._draw_rows() + self._prompt()
+
     async def handle_input(self, event: InputEvent) -> bytes | None:
         if event.event_type == EventType.FKEY:
             if event.fkey == "suite" and self.page < self.total_pages - 1:
-                self.page += 1
-                return await self.draw()
+                return await self._flip(self.page + 1)
             elif event.fkey == "retour" and self.page > 0:
-                self.page -= 1
-                return await self.draw()
+                return await self._flip(self.page - 1)
             elif event.fkey == "envoi":
                 return await self._trigger()
             return None
@@ -104,15 +167,35 @@ class AutomationsScreen(Screen):
             return None
         self.input_buf = ""
 
-        start = self.page * ITEMS_PER_PAGE
-        idx = start + num - 1
+        idx = num - 1
         if 0 <= idx < len(self.automations):
             auto = self.automations[idx]
             eid = auto["entity_id"]
+            service = TRIGGER_SERVICES.get(self.domain, "turn_on")
             try:
-                await self.session.ha_client.call_service("automation", "trigger", eid)
-                return self.draw_text_line(22, self.i18n.t("automations.triggered"), C.COLOR_GREEN)
+                await self.session.ha_client.call_service(self.domain, service, eid)
+                return self._show_status(self.i18n.t("automations.triggered"), C.COLOR_GREEN)
             except Exception:
                 logger.exception("Trigger failed")
-                return self.draw_text_line(22, self.i18n.t("common.error"), C.COLOR_RED)
-        return None
+                return self._show_status(self.i18n.t("common.error"), C.COLOR_RED)
+        return self.clear_row(PROMPT_ROW) + self._prompt()
+
+    def _show_status(self, text: str, color: int) -> bytes:
+        """Report on the line above the prompt, then clear the typed number."""
+        line = self.draw_text_line(STATUS_ROW, text.ljust(len(self._status)), color)
+        self._status = text
+        return line + self.clear_row(PROMPT_ROW) + self._prompt()
+
+    async def on_state_changed(self, entity_id: str, new_state: dict) -> bytes | None:
+        """Patch the rows of this page that the change affects."""
+        if not entity_id.startswith(self.domain + "."):
+            return None
+        # The domain index already holds the change: re-slice the page. This
+        # runs inside the receive loop, so nothing here may await a reply
+        if not self.session.ha_client.store.loaded:
+            return None
+        self._slice_page()
+        update = self._draw_rows()
+        if not update:
+            return None
+        return update + self._prompt()
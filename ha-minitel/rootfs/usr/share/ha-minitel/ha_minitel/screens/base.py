@@ -36,6 +36,14 @@ class Screen(ABC):
 
     def draw_header(self, title: str) -> bytes:
         """Draw a header bar at row 1 with inverted text."""
+        # Pad title to 40 chars
+        return self._draw_header(self.protocol.text(title[:40].center(40)))
+
+    def draw_header_label(self, key: str) -> bytes:
+        """Draw a header bar with a translated label, encoded once."""
+        return self._draw_header(self.protocol.static_text(self.i18n.t(key)[:40].center(40)))
+
+    def _draw_header(self, title: bytes) -> bytes:
         p = self.protocol
         buf = bytearray()
         buf += p.move_cursor(1, 1)
@@ -43,23 +51,27 @@ class Screen(ABC):
         buf += p.set_text_color(C.COLOR_WHITE)
         buf += p.set_bg_color(C.COLOR_BLUE)
         buf += p.set_invert(True)
-        # Pad title to 40 chars
-        padded = title[:40].center(40)
-        buf += p.text(padded)
+        buf += title
         buf += p.set_invert(False)
         buf += p.set_normal_size()
         return bytes(buf)
 
     def draw_footer(self, text: str) -> bytes:
         """Draw a footer at row 24."""
+        return self._draw_footer(self.protocol.text(text[:40].center(40)))
+
+    def draw_footer_label(self, key: str) -> bytes:
+        """Draw a footer with a translated label, encoded once."""
+        return self._draw_footer(self.protocol.static_text(self.i18n.t(key)[:40].center(40)))
+
+    def _draw_footer(self, text: bytes) -> bytes:
         p = self.protocol
         buf = bytearray()
         buf += p.move_cursor(C.LAST_ROW, 1)
         buf += p.set_text_color(C.COLOR_WHITE)
         buf += p.set_bg_color(C.COLOR_BLUE)
         buf += p.set_invert(True)
-        padded = text[:40].center(40)
-        buf += p.text(padded)
+        buf += text
         buf += p.set_invert(False)
         return bytes(buf)
 
@@ -69,7 +81,7 @@ class Screen(ABC):
         buf = bytearray()
         buf += p.move_cursor(row, 1)
         buf += p.set_text_color(C.COLOR_YELLOW)
-        buf += p.text(f"{number}.")
+        buf += p.static_text(f"{number}.")
         buf += p.set_text_color(C.COLOR_WHITE)
         buf += p.text(f" {label[:30]}")
         if state:
@@ -78,6 +90,15 @@ class Screen(ABC):
             buf += p.text(state[:5])
         return bytes(buf)
 
+    def redraw_menu_item(
+        self, row: int, number: int, label: str, state: str, previous: tuple[str, str] | None
+    ) -> bytes:
+        """Redraw a menu item in place, padding over what the previous one showed."""
+        old_label, old_state = previous or ("", "")
+        return self.draw_menu_item(
+            row, number, label[:30].ljust(len(old_label[:30])), state[:5].ljust(len(old_state[:5]))
+        )
+
     def draw_text_line(self, row: int, text: str, color: int = C.COLOR_WHITE) -> bytes:
         """Draw a line of text at the given row."""
         p = self.protocol
@@ -87,12 +108,21 @@ class Screen(ABC):
         buf += p.text(text[:40])
         return bytes(buf)
 
+    def draw_label(self, row: int, key: str, color: int = C.COLOR_WHITE) -> bytes:
+        """Draw a translated label at the given row, encoded once."""
+        p = self.protocol
+        buf = bytearray()
+        buf += p.move_cursor(row, 1)
+        buf += p.set_text_color(color)
+        buf += p.static_text(self.i18n.t(key)[:40])
+        return bytes(buf)
+
     def clear_row(self, row: int) -> bytes:
         """Clear a row by writing spaces."""
         p = self.protocol
         buf = bytearray()
         buf += p.move_cursor(row, 1)
-        buf += p.text(" " * 40)
+        buf += p.static_text(" " * 40)
         return bytes(buf)
 
     def draw_input_field(self, row: int, label: str, width: int = 20) -> bytes:
@@ -103,7 +133,7 @@ class Screen(ABC):
         buf += p.set_text_color(C.COLOR_WHITE)
         buf += p.text(label)
         buf += p.set_underline(True)
-        buf += p.text("." * width)
+        buf += p.static_text("." * width)
         buf += p.set_underline(False)
         buf += p.move_cursor(row, len(label) + 1)
         buf += p.show_cursor()
@@ -0,0 +1,29 @@
+"""Connecting screen: shown while Home Assistant is unreachable."""
+
+from __future__ import annotations
+
+from .base import Screen
+from ..protocol import constants as C
+from ..protocol.input_handler import InputEvent
+
+
+class ConnectingScreen(Screen):
+    """Stands in for the home screen until Home Assistant answers.
+
+    Needs nothing from Home Assistant, so terminals get it right away;
+    the session manager replaces it with the home screen on connection.
+    """
+
+    async def draw(self) -> bytes:
+        p = self.protocol
+        buf = bytearray()
+        buf += p.clear_screen()
+        buf += p.hide_cursor()
+        buf += self.draw_header_label("home.title")
+        buf += self.draw_label(10, "connecting.message", C.COLOR_YELLOW)
+        buf += self.draw_label(12, "connecting.hint")
+        buf += self.draw_footer_label("connecting.footer")
+        return bytes(buf)
+
+    async def handle_input(self, event: InputEvent) -> bytes | None:
+        return None
@@ -5,11 +5,15 @@ from __future__ import annotations
 import logging
 
 from .base import Screen
+from .optimistic import PendingChange
 from ..protocol import constants as C
 from ..protocol.input_handler import InputEvent, EventType
 
 logger = logging.getLogger(__name__)
 
+FIRST_ROW = 5
+STATUS_ROW = 22
+
 
 def entity_domain(entity_id: str) -> str:
     return entity_id.split(".")[0]
@@ -36,8 +40,20 @@ CONTROL_MAP = {
 }
 
 
+def format_value(value) -> str:
+    """Show whole numbers without a decimal part."""
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
 class EntityControlScreen(Screen):
-    """Form screen for controlling entity attributes."""
+    """Form screen for controlling entity attributes.
+
+    A submitted value is shown as current at once and confirmed by the
+    entity's state_changed event; the previous value comes back if the
+    call fails or no event arrives in time.
+    """
 
     def __init__(self, session, entity: dict):
         super().__init__(session)
@@ -46,6 +62,9 @@ class EntityControlScreen(Screen):
         self.controls = CONTROL_MAP.get(self.domain, [])
         self.current_field = 0
         self.input_buf = ""
+        self.pending: PendingChange | None = None
+        self._current: dict[int, str] = {}  # row -> "Actuel" line shown
+        self._status = ""
 
     async def draw(self) -> bytes:
         p = self.protocol
@@ -58,26 +77,56 @@ class EntityControlScreen(Screen):
         buf += self.draw_header(i18n.t("control.title", name=name))
 
         if not self.controls:
-            buf += self.draw_text_line(5, i18n.t("entity.unavailable"), C.COLOR_RED)
-            buf += self.draw_footer(i18n.t("entity.back"))
+            buf += self.draw_label(5, "entity.unavailable", C.COLOR_RED)
+            buf += self.draw_footer_label("entity.back")
             return bytes(buf)
 
-        row = 5
-        for i, (attr_key, _, _, label_key) in enumerate(self.controls):
-            current_val = self.entity.get("attributes", {}).get(attr_key, "?")
-            buf += self.draw_text_line(row, f"  Actuel: {current_val}", C.COLOR_GREEN)
-            row += 1
-            if i == self.current_field:
-                buf += self.draw_input_field(row, f"  {i18n.t(label_key)} ")
-            else:
-                buf += self.draw_text_line(row, f"  {i18n.t(label_key)}", C.COLOR_WHITE)
-            row += 2
-
-        buf += self.draw_text_line(20, i18n.t("control.submit"), C.COLOR_CYAN)
+        self._current = {}
+        self._status = ""
+        buf += self._draw_current()
+        row = FIRST_ROW
+        for i, (_, _, _, label_key) in enumerate(self.controls):
+            if i != self.current_field:
+                buf += self.draw_text_line(row + 1, f"  {i18n.t(label_key)}", C.COLOR_WHITE)
+            row += 3
+
+        buf += self.draw_label(20, "control.submit", C.COLOR_CYAN)
         buf += self.draw_footer(name[:40])
+        buf += self._input_field()
 
         return bytes(buf)
 
+    def _draw_current(self) -> bytes:
+        """Rewrite the current-value lines that changed."""
+        buf = bytearray()
+        attrs = self.entity.get("attributes", {})
+        for i, (attr_key, _, _, _) in enumerate(self.controls):
+            row = FIRST_ROW + 3 * i
+            text = f"  Actuel: {format_value(attrs.get(attr_key, '?'))}"
+            previous = self._current.get(row, "")
+            if text != previous:
+                buf += self.draw_text_line(row, text.ljust(len(previous)), C.COLOR_GREEN)
+                self._current[row] = text
+        return bytes(buf)
+
+    def _input_label(self) -> str:
+        return f"  {self.i18n.t(self.controls[self.current_field][3])} "
+
+    def _input_field(self) -> bytes:
+        """The (empty) field for the current control, with the cursor in it."""
+        return self.draw_input_field(FIRST_ROW + 3 * self.current_field + 1, self._input_label())
+
+    def _cursor(self) -> bytes:
+        """Put the cursor back after what has been typed."""
+        row = FIRST_ROW + 3 * self.current_field + 1
+        col = len(self._input_label()) + len(self.input_buf) + 1
+        return self.protocol.move_cursor(row, col) + self.protocol.show_cursor()
+
+    def _show_status(self, text: str, color: int) -> bytes:
+        line = self.draw_text_line(STATUS_ROW, text.ljust(len(self._status)), color)
+        self._status = text
+        return line
+
     async def handle_input(self, event: InputEvent) -> bytes | None:
         p = self.protocol
         i18n = self.i18n
@@ -108,25 +157,39 @@ class EntityControlScreen(Screen):
             value = float(self.input_buf)
         except ValueError:
             self.input_buf = ""
-            return self.draw_text_line(22, i18n.t("control.error", msg="invalid"), C.COLOR_RED)
+            return (self._show_status(i18n.t("control.error", msg="invalid"), C.COLOR_RED)
+                    + self._input_field())
+        if value.is_integer():
+            value = int(value)
 
-        _, service, data_key, _ = self.controls[self.current_field]
+        attr_key, service, data_key, _ = self.controls[self.current_field]
         eid = self.entity["entity_id"]
-
-        try:
-            await self.session.ha_client.call_service(
-                self.domain, service, eid, {data_key: value}
-            )
-            self.input_buf = ""
-            result = self.draw_text_line(22, i18n.t("control.success"), C.COLOR_GREEN)
-            # Refresh entity
-            states = await self.session.ha_client.get_states()
-            for s in states:
-                if s["entity_id"] == eid:
-                    self.entity = s
-                    break
-            return result + await self.draw()
-        except Exception as e:
-            logger.exception("Service call failed")
-            self.input_buf = ""
-            return self.draw_text_line(22, i18n.t("control.error", msg=str(e)[:30]), C.COLOR_RED)
+        command = self.session.ha_client.control(self.domain, service, eid, {data_key: value})
+        if self.pending:
+            self.pending.settle()
+        self.pending = PendingChange(self.entity, {attr_key: value}, command, self._on_failure)
+        self.input_buf = ""
+        return (self._draw_current() + self._show_status(i18n.t("control.success"), C.COLOR_GREEN)
+                + self._input_field())
+
+    async def _on_failure(self, pending: PendingChange, message_key: str):
+        """The previous value is back in the entity: show it and why."""
+        if pending is self.pending:
+            self.pending = None
+        update = self._draw_current() + self._show_status(self.i18n.t(message_key), C.COLOR_RED)
+        await self.session.send_from(self, update + self._cursor())
+
+    async def on_state_changed(self, entity_id: str, new_state: dict) -> bytes | None:
+        if entity_id != self.entity["entity_id"]:
+            return None
+        self.entity["state"] = new_state.get("state", self.entity["state"])
+        if "attributes" in new_state:
+            self.entity["attributes"] = dict(new_state["attributes"])
+        if self.pending:
+            self.pending.resolve()
+            if self.pending.settled:
+                self.pending = None
+        update = self._draw_current()
+        if not update:
+            return None
+        return update + self._cursor()
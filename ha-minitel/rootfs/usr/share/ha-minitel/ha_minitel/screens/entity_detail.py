@@ -5,6 +5,7 @@ from __future__ import annotations
 import logging
 
 from .base import Screen
+from .optimistic import PendingChange
 from ..protocol import constants as C
 from ..protocol.input_handler import InputEvent, EventType
 
@@ -14,6 +15,17 @@ logger = logging.getLogger(__name__)
 TOGGLEABLE = {"light", "switch", "fan", "input_boolean", "automation", "cover", "media_player"}
 # Domains that have controllable attributes
 CONTROLLABLE = {"light", "cover", "climate", "fan"}
+# State a toggle is expected to lead to; others are shown once HA reports them
+TOGGLED_STATES = {"on": "off", "off": "on", "open": "closed", "closed": "open"}
+# Explicit service for an expected state: unlike toggles, these coalesce
+STATE_SERVICES = {"on": "turn_on", "off": "turn_off", "open": "open_cover", "closed": "close_cover"}
+# Attributes listed under the state
+ATTRIBUTES = ("brightness", "color_temp", "temperature", "current_temperature", "position")
+
+STATE_ROW = 6
+FIRST_ATTRIBUTE_ROW = 8
+LAST_ATTRIBUTE_ROW = 16
+STATUS_ROW = 20
 
 
 def entity_domain(entity_id: str) -> str:
@@ -25,11 +37,21 @@ def friendly_name(entity: dict) -> str:
 
 
 class EntityDetailScreen(Screen):
-    """Show entity state and available controls."""
+    """Show entity state and available controls.
+
+    A toggle shows its expected state at once; the entity's state_changed
+    event confirms it, and if none arrives in time (or the call fails)
+    the previous state comes back. Only lines whose text changed are
+    rewritten.
+    """
 
     def __init__(self, session, entity: dict):
         super().__init__(session)
-        self.entity = entity
+        # Edited in place by events and pending changes: keep our own copy
+        self.entity = {**entity, "attributes": dict(entity.get("attributes", {}))}
+        self.pending: PendingChange | None = None
+        self._lines: dict[int, str] = {}  # row -> text shown
+        self._status = ""
 
     async def draw(self) -> bytes:
         p = self.protocol
@@ -40,7 +62,7 @@ class EntityDetailScreen(Screen):
         buf += p.hide_cursor()
 
         name = friendly_name(self.entity)
-        buf += self.draw_header(i18n.t("entity.title"))
+        buf += self.draw_header_label("entity.title")
 
         # Entity name
         buf += p.move_cursor(3, 1)
@@ -49,37 +71,61 @@ class EntityDetailScreen(Screen):
         buf += p.text(f" {name[:38]}")
         buf += p.set_normal_size()
 
-        # State
-        state = self.entity.get("state", "unknown")
-        buf += p.move_cursor(6, 1)
-        buf += p.set_text_color(C.COLOR_WHITE)
-        buf += p.text(i18n.t("entity.state", state=state))
-
-        # Attributes
-        attrs = self.entity.get("attributes", {})
-        row = 8
-        for key in ("brightness", "color_temp", "temperature", "current_temperature", "position"):
-            if key in attrs:
-                buf += self.draw_text_line(row, f"  {key}: {attrs[key]}", C.COLOR_GREEN)
-                row += 1
-                if row > 16:
-                    break
+        # State and attributes
+        self._lines = {}
+        self._status = ""
+        buf += self._draw_fields()
 
         # Actions
         domain = entity_domain(self.entity["entity_id"])
         action_row = 18
         if domain in TOGGLEABLE:
-            buf += self.draw_text_line(action_row, i18n.t("entity.toggle"), C.COLOR_YELLOW)
+            buf += self.draw_label(action_row, "entity.toggle", C.COLOR_YELLOW)
             action_row += 1
         if domain in CONTROLLABLE:
-            buf += self.draw_text_line(action_row, i18n.t("entity.control"), C.COLOR_YELLOW)
+            buf += self.draw_label(action_row, "entity.control", C.COLOR_YELLOW)
             action_row += 1
 
-        buf += self.draw_text_line(22, i18n.t("entity.back"), C.COLOR_CYAN)
+        buf += self.draw_label(22, "entity.back", C.COLOR_CYAN)
         buf += self.draw_footer(name[:40])
 
         return bytes(buf)
 
+    def _field_lines(self) -> dict[int, tuple[str, int]]:
+        """Row -> (text, color) for the state line and the attribute lines."""
+        state = self.entity.get("state", "unknown")
+        lines = {STATE_ROW: (self.i18n.t("entity.state", state=state), C.COLOR_WHITE)}
+        attrs = self.entity.get("attributes", {})
+        row = FIRST_ATTRIBUTE_ROW
+        for key in ATTRIBUTES:
+            if key in attrs and row <= LAST_ATTRIBUTE_ROW:
+                lines[row] = (f"  {key}: {attrs[key]}", C.COLOR_GREEN)
+                row += 1
+        return lines
+
+    def _draw_fields(self) -> bytes:
+        """Rewrite the field lines that differ from what is shown."""
+        buf = bytearray()
+        lines = self._field_lines()
+        for row in sorted(lines.keys() | self._lines.keys()):
+            text, color = lines.get(row, ("", C.COLOR_WHITE))
+            previous = self._lines.get(row, "")
+            if text == previous:
+                continue
+            buf += self.draw_text_line(row, text[:40].ljust(len(previous[:40])), color)
+            if text:
+                self._lines[row] = text
+            else:
+                del self._lines[row]
+        return bytes(buf)
+
+    def _show_status(self, text: str, color: int) -> bytes:
+        if text == self._status:
+            return b""
+        line = self.draw_text_line(STATUS_ROW, text.ljust(len(self._status)), color)
+        self._status = text
+        return line
+
     async def handle_input(self, event: InputEvent) -> bytes | None:
         if event.event_type != EventType.CHAR:
             return None
@@ -88,19 +134,21 @@ class EntityDetailScreen(Screen):
         eid = self.entity["entity_id"]
 
         if event.char == "1" and domain in TOGGLEABLE:
-            try:
-                service = "toggle"
-                await self.session.ha_client.call_service(domain, service, eid)
-                # Refresh state
-                states = await self.session.ha_client.get_states()
-                for s in states:
-                    if s["entity_id"] == eid:
-                        self.entity = s
-                        break
-                return await self.draw()
-            except Exception:
-                logger.exception("Toggle failed")
-                return self.draw_text_line(20, self.i18n.t("common.error"), C.COLOR_RED)
+            ha_client = self.session.ha_client
+            expected = TOGGLED_STATES.get(self.entity.get("state"))
+            if expected is None:
+                # No safe guess: the state_changed event will show the result
+                try:
+                    await ha_client.control(domain, "toggle", eid)
+                    return self._show_status("", C.COLOR_WHITE)
+                except Exception:
+                    logger.exception("Toggle failed")
+                    return self._show_status(self.i18n.t("common.error"), C.COLOR_RED)
+            if self.pending:
+                self.pending.settle()
+            command = ha_client.control(domain, STATE_SERVICES[expected], eid)
+            self.pending = PendingChange(self.entity, {"state": expected}, command, self._on_failure)
+            return self._draw_fields() + self._show_status("", C.COLOR_WHITE)
 
         if event.char == "2" and domain in CONTROLLABLE:
             from .entity_control import EntityControlScreen
@@ -110,12 +158,23 @@ class EntityDetailScreen(Screen):
 
         return None
 
+    async def _on_failure(self, pending: PendingChange, message_key: str):
+        """The previous values are back in the entity: show them and why."""
+        if pending is self.pending:
+            self.pending = None
+        update = self._draw_fields() + self._show_status(self.i18n.t(message_key), C.COLOR_RED)
+        await self.session.send_from(self, update)
+
     async def on_state_changed(self, entity_id: str, new_state: dict) -> bytes | None:
         if entity_id != self.entity["entity_id"]:
             return None
         self.entity["state"] = new_state.get("state", self.entity["state"])
         if "attributes" in new_state:
-            self.entity.setdefault("attributes", {}).update(new_state["attributes"])
-        # Partial redraw: just the state line
-        state = self.entity.get("state", "unknown")
-        return self.draw_text_line(6, self.i18n.t("entity.state", state=state))
+            # Events carry the full attribute set: dropped ones must go
+            self.entity["attributes"] = dict(new_state["attributes"])
+        if self.pending:
+            self.pending.resolve()
+            if self.pending.settled:
+                self.pending = None
+        # Partial redraw: just the lines whose text changed
+        return self._draw_fields() or None
@@ -0,0 +1,179 @@
+"""Favorites screen: a live dashboard of pinned entities."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+
+from .base import Screen
+from ..protocol import constants as C
+from ..protocol.input_handler import InputEvent, EventType
+
+logger = logging.getLogger(__name__)
+
+MAX_FAVORITES = 20
+FIRST_ROW = 3
+VALUE_COL = 29
+VALUE_WIDTH = 12
+PROMPT_ROW = 23
+
+# Shortest gap between two writes of one value cell (seconds). A sensor
+# reporting every second would otherwise keep a 1200 baud line busy.
+CELL_INTERVAL = 2.0
+
+
+def value_text(state: dict | None) -> str:
+    """State with its unit, e.g. "21.5 °C"."""
+    if not state:
+        return "?"
+    unit = state.get("attributes", {}).get("unit_of_measurement")
+    value = state.get("state", "?")
+    return f"{value} {unit}" if unit else value
+
+
+class FavoritesScreen(Screen):
+    """One line per pinned entity (the `favorites` option), N+ENVOI for details.
+
+    Only value cells are ever rewritten after the first draw. Each cell
+    is written at most once per CELL_INTERVAL: changes arriving sooner
+    mark it dirty, later changes replace the pending value, and one
+    timer flushes every due cell in a single send.
+    """
+
+    def __init__(self, session):
+        super().__init__(session)
+        self.entity_ids: list[str] = list(session.favorites[:MAX_FAVORITES])
+        self.input_buf = ""
+        self._rows = {entity_id: FIRST_ROW + i for i, entity_id in enumerate(self.entity_ids)}
+        self._shown: dict[str, str] = {}  # entity_id -> value shown
+        self._written: dict[str, float] = {}  # entity_id -> loop time of the last write
+        self._dirty: set[str] = set()
+        self._flush: asyncio.TimerHandle | None = None
+
+    async def draw(self) -> bytes:
+        p = self.protocol
+        buf = bytearray()
+
+        buf += p.clear_screen()
+        buf += p.hide_cursor()
+        buf += self.draw_header_label("favorites.title")
+        self._shown = {}
+        self._written = {}
+        self._dirty.clear()
+        if self._flush:
+            self._flush.cancel()
+            self._flush = None
+
+        if not self.entity_ids:
+            buf += self.draw_label(5, "favorites.none", C.COLOR_YELLOW)
+            buf += self.draw_footer_label("favorites.footer")
+            return bytes(buf)
+
+        try:
+            store = await self.session.ha_client.ensure_store()
+        except Exception:
+            logger.exception("Failed to load states")
+            store = None
+        names = self.session.ha_client.search_index
+        for i, entity_id in enumerate(self.entity_ids):
+            row = self._rows[entity_id]
+            buf += p.move_cursor(row, 1)
+            buf += p.set_text_color(C.COLOR_YELLOW)
+            buf += p.text(f"{i + 1:>2}")
+            buf += p.set_text_color(C.COLOR_WHITE)
+            buf += p.text(f" {names.name(entity_id)[:24]}")
+            buf += self._write_cell(entity_id, store.get(entity_id) if store else None)
+
+        buf += self.draw_footer_label("favorites.footer")
+        buf += self._prompt()
+        return bytes(buf)
+
+    def _write_cell(self, entity_id: str, state: dict | None) -> bytes:
+        """Write a value cell (right-aligned, so no padding is needed)."""
+        p = self.protocol
+        text = value_text(state)[:VALUE_WIDTH]
+        self._shown[entity_id] = text
+        self._written[entity_id] = asyncio.get_event_loop().time()
+        return (
+            p.move_cursor(self._rows[entity_id], VALUE_COL)
+            + p.set_text_color(C.COLOR_CYAN)
+            + p.text(text.rjust(VALUE_WIDTH))
+        )
+
+    def _prompt(self) -> bytes:
+        p = self.protocol
+        buf = bytearray()
+        buf += p.move_cursor(PROMPT_ROW, 1)
+        buf += p.set_text_color(C.COLOR_WHITE)
+        buf += p.text("N\xb0: " + self.input_buf)
+        buf += p.show_cursor()
+        return bytes(buf)
+
+    def _prompt_cursor(self) -> bytes:
+        col = len("N\xb0: " + self.input_buf) + 1
+        return self.protocol.move_cursor(PROMPT_ROW, col) + self.protocol.show_cursor()
+
+    async def handle_input(self, event: InputEvent) -> bytes | None:
+        if event.event_type == EventType.FKEY and event.fkey == "envoi":
+            return await self._select()
+        if event.event_type != EventType.CHAR:
+            return None
+        if event.char.isdigit() and len(self.input_buf) < 2:
+            self.input_buf += event.char
+            return self.protocol.text(event.char)
+        if event.char == "\r":
+            return await self._select()
+        if event.char == "\b" and self.input_buf:
+            self.input_buf = self.input_buf[:-1]
+            return self.protocol.text("\b \b")
+        return None
+
+    async def _select(self) -> bytes | None:
+        if not self.input_buf:
+            return None
+        num = int(self.input_buf)
+        self.input_buf = ""
+        state = None
+        if 1 <= num <= len(self.entity_ids):
+            state = self.session.ha_client.store.get(self.entity_ids[num - 1])
+        if state is None:
+            return self.clear_row(PROMPT_ROW) + self._prompt()
+        from .entity_detail import EntityDetailScreen
+        await self.session.push_screen(EntityDetailScreen(self.session, state))
+        return None
+
+    async def on_state_changed(self, entity_id: str, new_state: dict) -> bytes | None:
+        """Rewrite the entity's value cell now, or once its interval has passed."""
+        if entity_id not in self._shown:
+            return None
+        state = self.session.ha_client.store.get(entity_id) or new_state
+        if value_text(state)[:VALUE_WIDTH] == self._shown[entity_id]:
+            self._dirty.discard(entity_id)
+            return None
+        loop = asyncio.get_event_loop()
+        due = self._written[entity_id] + CELL_INTERVAL
+        if due <= loop.time() and entity_id not in self._dirty:
+            return self._write_cell(entity_id, state) + self._prompt_cursor()
+        # Too soon: the flush writes whatever the latest value is by then
+        self._dirty.add(entity_id)
+        self._schedule_flush()
+        return None
+
+    def _schedule_flush(self):
+        if self._flush or not self._dirty:
+            return
+        due = min(self._written[e] for e in self._dirty) + CELL_INTERVAL
+        self._flush = asyncio.get_event_loop().call_at(due, lambda: asyncio.ensure_future(self._send_due()))
+
+    async def _send_due(self):
+        self._flush = None
+        now = asyncio.get_event_loop().time()
+        store = self.session.ha_client.store
+        buf = bytearray()
+        for entity_id in sorted(self._dirty, key=self._rows.__getitem__):
+            if self._written[entity_id] + CELL_INTERVAL <= now:
+                self._dirty.discard(entity_id)
+                buf += self._write_cell(entity_id, store.get(entity_id))
+        self._schedule_flush()
+        if buf:
+            await self.session.send_from(self, bytes(buf) + self._prompt_cursor())
@@ -10,13 +10,35 @@ from ..protocol.input_handler import InputEvent, EventType
 
 logger = logging.getLogger(__name__)
 
+# Area summary cells: (first column, width, color)
+LIGHTS_CELL = (25, 3, C.COLOR_YELLOW)
+COVERS_CELL = (30, 3, C.COLOR_CYAN)
+TEMPERATURE_CELL = (34, 6, C.COLOR_GREEN)
+
+
+def summary_cells(summary) -> list[tuple[tuple[int, int, int], str]]:
+    """The three summary cells of an area row and their text."""
+    temperature = summary.temperature
+    return [
+        (LIGHTS_CELL, str(summary.lights_on) if summary.lights_on else "-"),
+        (COVERS_CELL, str(summary.covers_open) if summary.covers_open else "-"),
+        (TEMPERATURE_CELL, f"{temperature:.1f}\xb0" if temperature is not None else "-"),
+    ]
+
 
 class HomeScreen(Screen):
-    """Main menu: list areas (1-8), automations (9), logs (0)."""
+    """Main menu: list areas (1-8), automations (9), logs (0).
+
+    Each area row ends with a live summary (lights on, covers open,
+    average temperature) read from the area index; state changes patch
+    only the cells whose text changed.
+    """
 
     def __init__(self, session):
         super().__init__(session)
         self.areas: list[dict] = []
+        self._area_rows: dict[str, int] = {}  # area_id -> row
+        self._cells: dict[tuple[int, int], str] = {}  # (row, col) -> text shown
 
     async def draw(self) -> bytes:
         p = self.protocol
@@ -27,13 +49,13 @@ class HomeScreen(Screen):
         buf += p.hide_cursor()
 
         # Header
-        buf += self.draw_header(i18n.t("home.title"))
+        buf += self.draw_header_label("home.title")
 
         # Subtitle
         buf += p.move_cursor(3, 1)
         buf += p.set_text_color(C.COLOR_CYAN)
         buf += p.set_double_height()
-        buf += p.text(f"  {i18n.t('home.subtitle')}")
+        buf += p.static_text(f"  {i18n.t('home.subtitle')}")
         buf += p.set_normal_size()
 
         # Load areas
@@ -43,31 +65,80 @@ class HomeScreen(Screen):
             logger.exception("Failed to load areas")
             self.areas = []
 
-        # Areas header
+        # Areas header, with the summary column titles
         buf += p.move_cursor(6, 1)
         buf += p.set_text_color(C.COLOR_GREEN)
-        buf += p.text(f"  {i18n.t('home.areas_header')}:")
+        buf += p.static_text(f"  {i18n.t('home.areas_header')}:")
+        if self.areas:
+            buf += p.move_cursor(6, LIGHTS_CELL[0])
+            buf += p.static_text(i18n.t("home.summary_header"))
 
         # List areas (max 8)
+        self._area_rows = {}
+        self._cells = {}
+        area_index = self.session.ha_client.area_index
         for i, area in enumerate(self.areas[:8]):
             name = area.get("name", area.get("area_id", "?"))
-            buf += self.draw_menu_item(8 + i, i + 1, name)
+            buf += self.draw_menu_item(8 + i, i + 1, name[:19])
+            area_id = area.get("area_id", "")
+            self._area_rows[area_id] = 8 + i
+            buf += self._draw_cells(8 + i, area_index.summary(area_id))
 
         # Automations & Logs
         row = max(17, 8 + len(self.areas[:8]) + 1)
         buf += self.draw_menu_item(row, 9, i18n.t("home.automations"))
         buf += self.draw_menu_item(row + 1, 0, i18n.t("home.logs"))
+        buf += self.draw_label(row + 3, "home.search", C.COLOR_YELLOW)
+        if self.session.favorites:
+            buf += self.draw_label(row + 4, "home.favorites", C.COLOR_YELLOW)
 
         # Footer
-        buf += self.draw_footer(i18n.t("home.footer"))
+        buf += self.draw_footer_label("home.footer")
 
         return bytes(buf)
 
+    def _draw_cells(self, row: int, summary) -> bytes:
+        """Write the summary cells of a row that differ from what is shown."""
+        p = self.protocol
+        buf = bytearray()
+        for (col, width, color), text in summary_cells(summary):
+            text = text[:width].rjust(width)
+            if self._cells.get((row, col)) == text:
+                continue
+            buf += p.move_cursor(row, col)
+            buf += p.set_text_color(color)
+            buf += p.text(text)
+            self._cells[(row, col)] = text
+        return bytes(buf)
+
+    async def on_state_changed(self, entity_id: str, new_state: dict) -> bytes | None:
+        """Patch the summary of the area the entity belongs to, if listed."""
+        area_index = self.session.ha_client.area_index
+        area_id = area_index.area_of(entity_id)
+        row = self._area_rows.get(area_id)
+        if row is None:
+            return None
+        return self._draw_cells(row, area_index.summary(area_id)) or None
+
     async def handle_input(self, event: InputEvent) -> bytes | None:
+        if event.event_type == EventType.FKEY and event.fkey == "guide":
+            from .search import SearchScreen
+            await self.session.push_screen(SearchScreen(self.session))
+            return None
+
         if event.event_type != EventType.CHAR:
             return None
 
         ch = event.char
+        if ch == "*" and self.session.favorites:
+            from .favorites import FavoritesScreen
+            await self.session.push_screen(FavoritesScreen(self.session))
+            return None
+        if ch.isalpha():
+            # Typing a name starts a search with that letter
+            from .search import SearchScreen
+            await self.session.push_screen(SearchScreen(self.session, query=ch))
+            return None
         if ch.isdigit():
             num = int(ch)
             if 1 <= num <= len(self.areas):
@@ -31,7 +31,7 @@ class LogsScreen(Screen):
         buf += p.clear_screen()
         buf += p.hide_cursor()
 
-        buf += self.draw_header(i18n.t("logs.title"))
+        buf += self.draw_header_label("logs.title")
 
         try:
             self.entries = await self.session.ha_client.get_logbook(hours=24)
@@ -42,8 +42,8 @@ class LogsScreen(Screen):
             self.entries = []
 
         if not self.entries:
-            buf += self.draw_text_line(5, i18n.t("logs.empty"), C.COLOR_YELLOW)
-            buf += self.draw_footer(i18n.t("logs.footer"))
+            buf += self.draw_label(5, "logs.empty", C.COLOR_YELLOW)
+            buf += self.draw_footer_label("logs.footer")
             return bytes(buf)
 
         self.total_pages = max(1, math.ceil(len(self.entries) / ITEMS_PER_PAGE))
@@ -66,7 +66,7 @@ class LogsScreen(Screen):
             buf += p.set_text_color(C.COLOR_CYAN)
             buf += p.text(f"{message[:18]}")
 
-        buf += self.draw_footer(i18n.t("logs.footer"))
+        buf += self.draw_footer_label("logs.footer")
         return bytes(buf)
 
     async def handle_input(self, event: InputEvent) -> bytes | None:
@@ -0,0 +1,105 @@
+"""Optimistic changes: show a command's effect at once, confirm it from events."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Awaitable, Callable
+
+logger = logging.getLogger(__name__)
+
+# Seconds to wait for the state_changed event that confirms a command
+CONFIRM_TIMEOUT = 5.0
+
+
+def same_value(a, b) -> bool:
+    """Compare HA values loosely, so 128, 128.0 and "128" are equal."""
+    if a == b:
+        return True
+    try:
+        return float(a) == float(b)
+    except (TypeError, ValueError):
+        return False
+
+
+def entity_fields(entity: dict, keys) -> dict:
+    """Current value of each field: "state" or an attribute name."""
+    attrs = entity.get("attributes", {})
+    return {key: entity.get("state") if key == "state" else attrs.get(key) for key in keys}
+
+
+def apply_fields(entity: dict, fields: dict) -> None:
+    for key, value in fields.items():
+        if key == "state":
+            entity["state"] = value
+        else:
+            entity.setdefault("attributes", {})[key] = value
+
+
+class PendingChange:
+    """A command whose expected effect is already on screen.
+
+    `expected` and `previous` map fields ("state" or attribute names) to
+    values. The screen passes each state_changed of the entity through
+    resolve(). If the command fails, or no event settles the change
+    before the deadline, on_failure runs with an i18n message key and
+    the screen puts the previous values back.
+    """
+
+    def __init__(
+        self,
+        entity: dict,
+        expected: dict,
+        command: Awaitable[dict],
+        on_failure: Callable[["PendingChange", str], Awaitable[None]],
+        timeout: float = CONFIRM_TIMEOUT,
+    ):
+        self.entity = entity
+        self.expected = expected
+        self.previous = entity_fields(entity, expected)
+        self.settled = False
+        self._on_failure = on_failure
+        apply_fields(entity, expected)
+        self._timer = asyncio.get_event_loop().call_later(timeout, self._expire)
+        self._task = asyncio.ensure_future(self._send(command))
+
+    async def _send(self, command: Awaitable[dict]):
+        try:
+            result = await command
+            failed = isinstance(result, dict) and result.get("success") is False
+            if failed:
+                logger.warning("Command refused for %s: %s", self.entity["entity_id"], result.get("error"))
+        except Exception:
+            logger.exception("Command failed for %s", self.entity["entity_id"])
+            failed = True
+        if failed and not self.settled:
+            await self._fail("common.error")
+
+    def _expire(self):
+        if not self.settled:
+            logger.info("No confirmation for %s, reverting", self.entity["entity_id"])
+            self._task = asyncio.ensure_future(self._fail("common.not_confirmed"))
+
+    async def _fail(self, message_key: str):
+        self.settle()
+        apply_fields(self.entity, self.previous)
+        await self._on_failure(self, message_key)
+
+    def settle(self) -> None:
+        self.settled = True
+        self._timer.cancel()
+
+    def resolve(self) -> None:
+        """Call after merging an event into the entity.
+
+        While the event still carries the previous values (HA has not
+        acted yet) the expected ones stay on screen; any other value,
+        expected or not (e.g. "opening"), settles the change.
+        """
+        if self.settled:
+            return
+        current = entity_fields(self.entity, self.expected)
+        if all(same_value(current[key], self.previous[key]) for key in current):
+            apply_fields(self.entity, self.expected)
+        else:
+            self.settle()
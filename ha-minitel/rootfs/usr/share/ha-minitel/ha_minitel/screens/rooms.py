@@ -2,16 +2,28 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
 import math
 
 from .base import Screen
+from .optimistic import PendingChange
 from ..protocol import constants as C
 from ..protocol.input_handler import InputEvent, EventType
 
 logger = logging.getLogger(__name__)
 
 ITEMS_PER_PAGE = 8
+FIRST_ROW = 5
+BULK_ROW = 20
+STATUS_ROW = 21
+PROMPT_ROW = 22
+
+# Key -> (domain, service, resulting state, i18n help key): one call for the whole room
+BULK_ACTIONS = {
+    "*": ("light", "turn_off", "off", "rooms.bulk_lights"),
+    "#": ("cover", "close_cover", "closed", "rooms.bulk_covers"),
+}
 
 
 def friendly_name(entity: dict) -> str:
@@ -23,7 +35,12 @@ def short_state(entity: dict) -> str:
 
 
 class RoomsScreen(Screen):
-    """Display entities in a room with pagination."""
+    """Display entities in a room with pagination.
+
+    '*' switches off every light of the room and '#' closes every cover,
+    each with a single service call. The rows show the expected states
+    at once and events confirm them (see PendingChange).
+    """
 
     def __init__(self, session, area: dict):
         super().__init__(session)
@@ -32,6 +49,11 @@ class RoomsScreen(Screen):
         self.page = 0
         self.total_pages = 1
         self.input_buf = ""
+        self.pending: dict[str, PendingChange] = {}
+        self._shown: dict[int, str] = {}  # row -> state shown
+        self._status = ""
+        self._failure = ""
+        self._flush_scheduled = False
 
     async def draw(self) -> bytes:
         p = self.protocol
@@ -44,17 +66,23 @@ class RoomsScreen(Screen):
         area_name = self.area.get("name", self.area.get("area_id", "?"))
         buf += self.draw_header(i18n.t("rooms.title", name=area_name))
 
-        # Load entities
+        # Load entities: copies, since events and pending changes edit them
         try:
             area_id = self.area.get("area_id", self.area.get("id", ""))
-            self.entities = await self.session.ha_client.get_area_entities(area_id)
+            entities = await self.session.ha_client.get_area_entities(area_id)
+            self.entities = [
+                self.pending[e["entity_id"]].entity if e["entity_id"] in self.pending else dict(e)
+                for e in entities
+            ]
         except Exception:
             logger.exception("Failed to load entities")
             self.entities = []
+        self._shown = {}
+        self._status = ""
 
         if not self.entities:
-            buf += self.draw_text_line(5, i18n.t("rooms.no_entities"), C.COLOR_YELLOW)
-            buf += self.draw_footer(i18n.t("rooms.footer"))
+            buf += self.draw_label(5, "rooms.no_entities", C.COLOR_YELLOW)
+            buf += self.draw_footer_label("rooms.footer")
             return bytes(buf)
 
         self.total_pages = max(1, math.ceil(len(self.entities) / ITEMS_PER_PAGE))
@@ -68,17 +96,52 @@ class RoomsScreen(Screen):
 
         # Entity list
         for i, ent in enumerate(page_entities):
-            buf += self.draw_menu_item(5 + i, i + 1, friendly_name(ent), short_state(ent))
+            buf += self.draw_menu_item(FIRST_ROW + i, i + 1, friendly_name(ent), short_state(ent))
+            self._shown[FIRST_ROW + i] = short_state(ent)
+
+        # Bulk actions that apply to this room
+        domains = {ent["entity_id"].partition(".")[0] for ent in self.entities}
+        bulk = [i18n.t(help_key) for domain, _, _, help_key in BULK_ACTIONS.values() if domain in domains]
+        if bulk:
+            buf += self.draw_text_line(BULK_ROW, "  ".join(bulk), C.COLOR_CYAN)
+
+        buf += self.draw_footer_label("rooms.footer")
 
         # Input prompt
-        buf += p.move_cursor(22, 1)
+        buf += p.move_cursor(PROMPT_ROW, 1)
         buf += p.set_text_color(C.COLOR_WHITE)
-        buf += p.text("N\xb0: ")
+        buf += p.text("N\xb0: " + self.input_buf)
         buf += p.show_cursor()
+        return bytes(buf)
 
-        buf += self.draw_footer(i18n.t("rooms.footer"))
+    def _draw_states(self) -> bytes:
+        """Rewrite the state column of the rows on this page that changed."""
+        p = self.protocol
+        buf = bytearray()
+        start = self.page * ITEMS_PER_PAGE
+        for i, ent in enumerate(self.entities[start:start + ITEMS_PER_PAGE]):
+            row = FIRST_ROW + i
+            state = short_state(ent)
+            if self._shown.get(row) == state:
+                continue
+            buf += p.move_cursor(row, 35)
+            buf += p.set_text_color(C.COLOR_CYAN)
+            # Pad so a shorter state blanks the end of the previous one
+            buf += p.text(state.ljust(5))
+            self._shown[row] = state
         return bytes(buf)
 
+    def _show_status(self, text: str, color: int) -> bytes:
+        if text == self._status:
+            return b""
+        line = self.draw_text_line(STATUS_ROW, text.ljust(len(self._status)), color)
+        self._status = text
+        return line
+
+    def _prompt_cursor(self) -> bytes:
+        col = len("N\xb0: " + self.input_buf) + 1
+        return self.protocol.move_cursor(PROMPT_ROW, col) + self.protocol.show_cursor()
+
     async def _redraw_page(self) -> bytes:
         """Redraw current page content."""
         return await self.draw()
@@ -99,6 +162,8 @@ class RoomsScreen(Screen):
             return None
 
         if event.event_type == EventType.CHAR:
+            if event.char in BULK_ACTIONS:
+                return self._bulk(*BULK_ACTIONS[event.char][:3])
             if event.char.isdigit():
                 self.input_buf += event.char
                 return self.protocol.text(event.char)
@@ -129,20 +194,53 @@ class RoomsScreen(Screen):
             await self.session.push_screen(screen)
         return None
 
+    def _bulk(self, domain: str, service: str, state: str) -> bytes:
+        """One service call for every entity of the domain not already in the state."""
+        targets = [
+            ent for ent in self.entities
+            if ent["entity_id"].startswith(domain + ".") and ent.get("state") not in (state, "unavailable")
+        ]
+        if not targets:
+            return self._show_status(self.i18n.t("rooms.bulk_none"), C.COLOR_YELLOW) + self._prompt_cursor()
+        entity_ids = [ent["entity_id"] for ent in targets]
+        command = asyncio.ensure_future(self.session.ha_client.call_service(domain, service, entity_ids))
+        for ent in targets:
+            previous = self.pending.pop(ent["entity_id"], None)
+            if previous:
+                previous.settle()
+            self.pending[ent["entity_id"]] = PendingChange(ent, {"state": state}, command, self._on_failure)
+        self._failure = ""
+        status = self.i18n.t("rooms.bulk_sent", count=len(targets))
+        return self._draw_states() + self._show_status(status, C.COLOR_GREEN) + self._prompt_cursor()
+
+    async def _on_failure(self, pending: PendingChange, message_key: str):
+        """Batch the rollbacks of one bulk action into a single redraw."""
+        if self.pending.get(pending.entity["entity_id"]) is pending:
+            del self.pending[pending.entity["entity_id"]]
+        self._failure = message_key
+        if not self._flush_scheduled:
+            self._flush_scheduled = True
+            await asyncio.sleep(0)  # let the other rollbacks of the batch run
+            self._flush_scheduled = False
+            update = self._draw_states() + self._show_status(self.i18n.t(self._failure), C.COLOR_RED)
+            await self.session.send_from(self, update + self._prompt_cursor())
+
     async def on_state_changed(self, entity_id: str, new_state: dict) -> bytes | None:
         """Partial redraw: update just the state column for matching entity."""
-        start = self.page * ITEMS_PER_PAGE
-        page_entities = self.entities[start:start + ITEMS_PER_PAGE]
-        for i, ent in enumerate(page_entities):
+        for ent in self.entities:
             if ent["entity_id"] == entity_id:
                 ent["state"] = new_state.get("state", ent["state"])
                 if "attributes" in new_state:
-                    ent.setdefault("attributes", {}).update(new_state["attributes"])
-                row = 5 + i
-                p = self.protocol
-                buf = bytearray()
-                buf += p.move_cursor(row, 35)
-                buf += p.set_text_color(C.COLOR_CYAN)
-                buf += p.text(short_state(ent))
-                return bytes(buf)
-        return None
+                    ent["attributes"] = dict(new_state["attributes"])
+                pending = self.pending.get(entity_id)
+                if pending:
+                    pending.resolve()
+                    if pending.settled:
+                        del self.pending[entity_id]
+                break
+        else:
+            return None
+        update = self._draw_states()
+        if not update:
+            return None
+        return update + self._prompt_cursor()
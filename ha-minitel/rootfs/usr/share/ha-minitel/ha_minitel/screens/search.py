@@ -0,0 +1,234 @@
+"""Search screen: find any entity by typing the start of its name."""
+
+from __future__ import annotations
+
+import logging
+import math
+
+from .base import Screen
+from ..protocol import constants as C
+from ..protocol.input_handler import InputEvent, EventType
+
+logger = logging.getLogger(__name__)
+
+ITEMS_PER_PAGE = 8
+FIRST_RESULT_ROW = 6
+QUERY_ROW = 3
+COUNT_ROW = 4
+PROMPT_ROW = 22
+MAX_QUERY = 25
+
+
+def short_state(entity: dict) -> str:
+    return entity.get("state", "?")[:5]
+
+
+class SearchScreen(Screen):
+    """Search-as-you-type over all entities, then N+ENVOI to open one.
+
+    Typing edits the query and refreshes the results in place; ENVOI
+    switches to choosing a result by number. Only result rows whose
+    content changed are rewritten.
+    """
+
+    def __init__(self, session, query: str = ""):
+        super().__init__(session)
+        self.query = query
+        self.page = 0
+        self.total = 0
+        self.results: list[dict] = []
+        self.selecting = False
+        self.input_buf = ""
+        self._shown: dict[int, tuple[str, str]] = {}  # row -> (name, state)
+        self._count_text = ""
+
+    @property
+    def total_pages(self) -> int:
+        return max(1, math.ceil(self.total / ITEMS_PER_PAGE))
+
+    async def draw(self) -> bytes:
+        p = self.protocol
+        i18n = self.i18n
+        buf = bytearray()
+
+        buf += p.clear_screen()
+        buf += p.hide_cursor()
+        buf += self.draw_header_label("search.title")
+        self._shown = {}
+        self._count_text = ""
+
+        await self._search()
+        buf += self._draw_results()
+
+        buf += self.draw_label(20, "search.help", C.COLOR_CYAN)
+        buf += self.draw_footer_label("search.footer")
+        buf += self.draw_input_field(QUERY_ROW, i18n.t("search.prompt"), MAX_QUERY)
+        buf += p.text(self.query)
+        if self.selecting:
+            buf += self._prompt()
+        return bytes(buf)
+
+    async def _search(self):
+        try:
+            self.results, self.total = await self.session.ha_client.search_entities(
+                self.query, ITEMS_PER_PAGE, self.page * ITEMS_PER_PAGE
+            )
+        except Exception:
+            logger.exception("Search failed")
+            self.results, self.total = [], 0
+
+    def _draw_results(self) -> bytes:
+        """Rewrite the count line and the result rows that changed."""
+        p = self.protocol
+        i18n = self.i18n
+        buf = bytearray()
+
+        if not self.query.strip():
+            count = i18n.t("search.type")
+        elif not self.total:
+            count = i18n.t("search.none")
+        else:
+            count = i18n.t("search.count", total=self.total, current=self.page + 1, pages=self.total_pages)
+        if count != self._count_text:
+            buf += p.move_cursor(COUNT_ROW, 1)
+            buf += p.set_text_color(C.COLOR_GREEN)
+            buf += p.text(count.ljust(len(self._count_text)))
+            self._count_text = count
+
+        for i in range(ITEMS_PER_PAGE):
+            row = FIRST_RESULT_ROW + i
+            previous = self._shown.get(row)
+            if i < len(self.results):
+                entity = self.results[i]
+                name = self.session.ha_client.search_index.name(entity["entity_id"])[:30]
+                current = (name, short_state(entity))
+                if current == previous:
+                    continue
+                buf += self.redraw_menu_item(row, i + 1, *current, previous)
+                self._shown[row] = current
+            elif previous:
+                buf += self.clear_row(row)
+                del self._shown[row]
+        return bytes(buf)
+
+    def _cursor_to_query(self) -> bytes:
+        p = self.protocol
+        col = len(self.i18n.t("search.prompt")) + len(self.query) + 1
+        return p.move_cursor(QUERY_ROW, col) + p.show_cursor()
+
+    def _prompt(self) -> bytes:
+        p = self.protocol
+        buf = bytearray()
+        buf += p.move_cursor(PROMPT_ROW, 1)
+        buf += p.set_text_color(C.COLOR_WHITE)
+        buf += p.text("N\xb0: " + self.input_buf)
+        buf += p.show_cursor()
+        return bytes(buf)
+
+    async def _refresh(self) -> bytes:
+        await self._search()
+        return self._draw_results() + (self._prompt() if self.selecting else self._cursor_to_query())
+
+    async def _set_query(self, query: str) -> bytes:
+        self.query = query
+        self.page = 0
+        return await self._refresh()
+
+    async def handle_input(self, event: InputEvent) -> bytes | None:
+        if event.event_type == EventType.FKEY:
+            if event.fkey == "suite" and self.page < self.total_pages - 1:
+                self.page += 1
+                return await self._refresh()
+            elif event.fkey == "retour" and self.page > 0:
+                self.page -= 1
+                return await self._refresh()
+            elif event.fkey == "envoi":
+                return await self._envoi()
+            elif event.fkey == "annulation":
+                if self.selecting:
+                    return self._stop_selecting()
+                return await self._set_query("") + self._clear_query_field()
+            elif event.fkey == "correction":
+                return await self._backspace()
+            return None
+
+        if event.event_type == EventType.CHAR:
+            if event.char == "\r":
+                return await self._envoi()
+            if event.char == "\b":
+                return await self._backspace()
+            if self.selecting:
+                if event.char.isdigit():
+                    self.input_buf += event.char
+                    return self.protocol.text(event.char)
+                return None
+            if len(self.query) < MAX_QUERY:
+                # Echo, then refresh the results for the longer prefix
+                echo = self.protocol.text(event.char)
+                return echo + await self._set_query(self.query + event.char)
+        return None
+
+    def _clear_query_field(self) -> bytes:
+        p = self.protocol
+        label = self.i18n.t("search.prompt")
+        buf = bytearray()
+        buf += p.move_cursor(QUERY_ROW, len(label) + 1)
+        buf += p.set_underline(True)
+        buf += p.text("." * MAX_QUERY)
+        buf += p.set_underline(False)
+        buf += self._cursor_to_query()
+        return bytes(buf)
+
+    async def _backspace(self) -> bytes | None:
+        if self.selecting:
+            if not self.input_buf:
+                return None
+            self.input_buf = self.input_buf[:-1]
+            return self.protocol.text("\b \b")
+        if not self.query:
+            return None
+        self.query = self.query[:-1]
+        p = self.protocol
+        # Restore the dotted field under the deleted character
+        erase = p.text("\b") + p.set_underline(True) + p.text(".") + p.set_underline(False)
+        return erase + await self._set_query(self.query)
+
+    async def _envoi(self) -> bytes | None:
+        if not self.selecting:
+            if not self.results:
+                return None
+            self.selecting = True
+            self.input_buf = ""
+            return self._prompt()
+        return await self._select()
+
+    def _stop_selecting(self) -> bytes:
+        self.selecting = False
+        self.input_buf = ""
+        return self.clear_row(PROMPT_ROW) + self._cursor_to_query()
+
+    async def _select(self) -> bytes | None:
+        if not self.input_buf:
+            return None
+        num = int(self.input_buf)
+        self.input_buf = ""
+        if 1 <= num <= len(self.results):
+            entity = self.results[num - 1]
+            self.selecting = False
+            from .entity_detail import EntityDetailScreen
+            await self.session.push_screen(EntityDetailScreen(self.session, entity))
+            return None
+        return self.clear_row(PROMPT_ROW) + self._prompt()
+
+    async def on_state_changed(self, entity_id: str, new_state: dict) -> bytes | None:
+        """Keep the visible rows current; renamed or new entities may enter the page."""
+        # This runs inside the receive loop, so nothing here may await a reply
+        if not self.query.strip() or not self.session.ha_client.store.loaded:
+            return None
+        self.results, self.total = self.session.ha_client.find_entities(
+            self.query, ITEMS_PER_PAGE, self.page * ITEMS_PER_PAGE
+        )
+        update = self._draw_results()
+        if not update:
+            return None
+        return update + (self._prompt() if self.selecting else self._cursor_to_query())
@@ -4,20 +4,37 @@ from __future__ import annotations
 
 import asyncio
 import logging
+import time
 from typing import Callable, Awaitable
 
-from .transport.base import Transport
+from .transport.base import CloseReason, Transport
 from .protocol.base import MinitelProtocol
 from .protocol.input_handler import InputHandler, EventType
+from .protocol import constants as C
+from .protocol import terminal
+from .protocol.terminal import TerminalProfile
+from .protocol.videotex import VideotexProtocol
 from .ha_client.client import HAClient
 from .i18n import I18n
+from .recorder import Recorder, RecordingTransport
+from . import loop_monitor, metrics, tracing
+from .screens.connecting import ConnectingScreen
 from .screens.home import HomeScreen
 
 logger = logging.getLogger(__name__)
 
+# Seconds after connecting during which a ROM identification reply is
+# looked for in the input
+IDENTIFY_TIMEOUT = 2.0
+
 
 class Session:
-    """A single Minitel session tied to one transport."""
+    """A single Minitel session tied to one transport.
+
+    With protocol_for, the terminal is asked for its ROM as the session
+    starts, without waiting: the first screens use protocol, and once the
+    reply shows up in the input the session switches to protocol_for(profile).
+    """
 
     def __init__(
         self,
@@ -25,23 +42,47 @@ class Session:
         ha_client: HAClient,
         protocol: MinitelProtocol,
         i18n: I18n,
+        profile: TerminalProfile = terminal.DEFAULT_PROFILE,
+        protocol_for: Callable[[TerminalProfile], MinitelProtocol] | None = None,
+        idle_timeout: float = 0,
+        hibernate_after: float = 0,
+        favorites: list[str] | None = None,
     ):
         self.transport = transport
         self.ha_client = ha_client
         self.protocol = protocol
         self.i18n = i18n
+        self.profile = profile
         self._screen_stack: list = []
         self._input_handler = InputHandler()
+        self._protocol_for = protocol_for
+        self._identify_until = 0.0
+        self._rom_buf = b""
         self._task: asyncio.Task | None = None
+        self.idle_timeout = idle_timeout
+        self.hibernate_after = hibernate_after
+        self.favorites = favorites or []
+        self._hibernated = False
 
     @property
     def current_screen(self):
         return self._screen_stack[-1] if self._screen_stack else None
 
+    def _home_screen(self):
+        """The home screen, or a placeholder while Home Assistant is unreachable and nothing is known."""
+        if self.ha_client.connected or self.ha_client.has_data:
+            return HomeScreen(self)
+        return ConnectingScreen(self)
+
     async def start(self):
         """Initialize session: show home screen, start input loop."""
-        home = HomeScreen(self)
-        await self.push_screen(home)
+        if self._protocol_for:
+            self._identify_until = asyncio.get_running_loop().time() + IDENTIFY_TIMEOUT
+            try:
+                await self.transport.send(terminal.enq_rom())
+            except ConnectionError:
+                pass
+        await self.push_screen(self._home_screen())
         self._task = asyncio.create_task(self._input_loop())
 
     async def stop(self):
@@ -68,66 +109,170 @@ class Session:
     async def go_home(self):
         """Navigate back to the home screen."""
         self._screen_stack.clear()
-        home = HomeScreen(self)
-        self._screen_stack.append(home)
+        self._screen_stack.append(self._home_screen())
         await self._send_screen()
 
     async def _send_screen(self):
         """Draw the current screen and send to transport."""
         screen = self.current_screen
         if screen:
+            loop_monitor.touch(self, screen)
             try:
-                data = await screen.draw()
-                await self.transport.send(data)
+                start = time.perf_counter()
+                with tracing.span("encode"):
+                    data = await screen.draw()
+                metrics.SCREEN_DRAW_SECONDS.observe(time.perf_counter() - start, type(screen).__name__)
+                with tracing.span("write"):
+                    await self.transport.send(data)
             except Exception:
                 logger.exception("Error drawing screen")
 
+    async def send_from(self, screen, data: bytes):
+        """Send output a screen produced on its own (e.g. from a timer), if it is still shown."""
+        if data and screen is self.current_screen:
+            try:
+                await self.transport.send(data)
+            except Exception:
+                logger.exception("Error sending screen update")
+
     async def _input_loop(self):
         """Read input from transport and dispatch to current screen."""
+        raw = b""
         try:
-            while self.transport.is_connected:
-                try:
-                    raw = await self.transport.recv()
-                except ConnectionError:
-                    break
+            while True:
+                if not raw:
+                    try:
+                        raw = await self._recv()
+                    except ConnectionError:
+                        break
+                if self._identify_until:
+                    raw = self._take_rom_reply(raw)
+                    if not raw:
+                        continue
+
+                if self._hibernated:
+                    # Any key wakes the session on a fresh home screen
+                    self._hibernated = False
+                    raw = b""
+                    await self.go_home()
+                    continue
 
+                received = time.perf_counter()
                 events = self._input_handler.feed(raw)
+                # Decoding is done per chunk; share it between its keys
+                parse = (time.perf_counter() - received) / max(len(events), 1)
+                raw = b""
                 for event in events:
-                    response = None
-
-                    # Global key handling
-                    if event.event_type == EventType.FKEY:
-                        if event.fkey == "sommaire":
-                            await self.go_home()
-                            continue
-                        elif event.fkey == "retour":
-                            popped = await self.pop_screen()
-                            if popped:
-                                continue
-                            # If at home, let screen handle it
-                        elif event.fkey == "repetition":
-                            await self._send_screen()
-                            continue
-
-                    # Delegate to current screen
                     screen = self.current_screen
-                    if screen:
-                        try:
-                            response = await screen.handle_input(event)
-                        except Exception:
-                            logger.exception("Error handling input")
-
-                    if response:
-                        await self.transport.send(response)
+                    token = tracing.start(
+                        type(screen).__name__ if screen else "-", event.fkey or event.char, received, parse
+                    )
+                    try:
+                        with tracing.span("handler"):
+                            await self._dispatch(event)
+                    finally:
+                        tracing.finish(token)
         except asyncio.CancelledError:
             raise
         except Exception:
             logger.exception("Input loop error for %s", self.transport.transport_id)
+            await self.transport.close()
+
+    def _take_rom_reply(self, raw: bytes) -> bytes:
+        """Apply a ROM identification reply found in the input; return the rest of the input."""
+        buf = self._rom_buf + raw
+        self._rom_buf = b""
+        span = terminal.find_rom_reply(buf)
+        if span is not None:
+            start, end = span
+            self._identify_until = 0.0
+            self._identified(terminal.profile_from_rom(bytes(buf[start + 1:end - 1])))
+            return buf[:start] + buf[end:]
+        if asyncio.get_running_loop().time() >= self._identify_until:
+            self._identify_until = 0.0  # no answer: keep the plain encoding
+            return buf
+        start = buf.find(C.SOH)
+        if start >= 0:
+            # The start of a reply: hold it back until the rest arrives
+            self._rom_buf = buf[start:]
+            return buf[:start]
+        return buf
+
+    def _identified(self, profile: TerminalProfile):
+        """Encode for the terminal's profile from now on."""
+        self.profile = profile
+        self.protocol = self._protocol_for(profile)
+        for screen in self._screen_stack:
+            screen.protocol = self.protocol
+        logger.info("Terminal identified: %s (%s)", self.transport.transport_id, profile.model)
+
+    async def _dispatch(self, event):
+        """Handle one input event: global keys first, then the current screen."""
+        response = None
+
+        # Global key handling
+        if event.event_type == EventType.FKEY:
+            if event.fkey == "sommaire":
+                await self.go_home()
+                return
+            elif event.fkey == "retour":
+                popped = await self.pop_screen()
+                if popped:
+                    return
+                # If at home, let screen handle it
+            elif event.fkey == "repetition":
+                await self._send_screen()
+                return
+
+        # Delegate to current screen
+        screen = self.current_screen
+        if screen:
+            loop_monitor.touch(self, screen)
+            try:
+                response = await screen.handle_input(event)
+            except Exception:
+                logger.exception("Error handling input")
+
+        if response:
+            with tracing.span("write"):
+                await self.transport.send(response)
+
+    async def _recv(self) -> bytes:
+        """Wait for input; hibernate, then close the session, when idle."""
+        while True:
+            hibernating = (
+                not self._hibernated
+                and self.hibernate_after > 0
+                and (not self.idle_timeout or self.hibernate_after < self.idle_timeout)
+            )
+            if hibernating:
+                timeout = self.hibernate_after
+            elif self.idle_timeout:
+                timeout = self.idle_timeout - (self.hibernate_after if self._hibernated else 0)
+            else:
+                timeout = None
+            try:
+                return await asyncio.wait_for(self.transport.recv(), timeout)
+            except asyncio.TimeoutError:
+                if hibernating:
+                    self._hibernate()
+                    continue
+                logger.info("Session idle, closing: %s", self.transport.transport_id)
+                await self.transport.close(CloseReason.IDLE)
+                raise ConnectionError("Session idle")
+
+    def _hibernate(self):
+        """Drop the screen stack (and the entity lists it holds) while idle."""
+        logger.debug("Session hibernating: %s", self.transport.transport_id)
+        self._hibernated = True
+        self._screen_stack.clear()
+        self._input_handler = InputHandler()
 
     async def on_state_changed(self, entity_id: str, new_state: dict):
         """Forward state change to the current screen for partial redraw."""
         screen = self.current_screen
         if screen:
+            loop_monitor.touch(self, screen)
             try:
                 response = await screen.on_state_changed(entity_id, new_state)
                 if response:
@@ -139,26 +284,115 @@ class Session:
 class SessionManager:
     """Manages all active sessions and broadcasts HA events."""
 
-    def __init__(self, ha_client: HAClient, protocol: MinitelProtocol, i18n: I18n):
+    def __init__(
+        self,
+        ha_client: HAClient,
+        protocol: MinitelProtocol,
+        i18n: I18n,
+        max_sessions: int = 0,
+        idle_timeout: float = 0,
+        hibernate_after: float = 0,
+        favorites: list[str] | None = None,
+        recorder: Recorder | None = None,
+    ):
         self.ha_client = ha_client
         self.protocol = protocol
         self.i18n = i18n
+        self.recorder = recorder
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self.hibernate_after = hibernate_after
+        self.favorites = favorites or []
         self._sessions: dict[str, Session] = {}
+        self._protocols: dict[TerminalProfile, MinitelProtocol] = {
+            terminal.DEFAULT_PROFILE: protocol,
+        }
 
     async def on_transport_connected(self, transport: Transport):
         """Create and start a new session for the transport."""
-        session = Session(transport, self.ha_client, self.protocol, self.i18n)
+        # Serial terminals are wired to the add-on and reopened by their
+        # supervisor as soon as they close: they are neither capped nor
+        # hung up when idle
+        serial = transport.kind == "serial"
+        if not serial and self.max_sessions and self._network_sessions() >= self.max_sessions:
+            logger.warning("Session limit (%d) reached, rejecting %s",
+                           self.max_sessions, transport.transport_id)
+            await self._reject(transport)
+            return
+
+        # Terminals without a known profile are identified by the session,
+        # from the input, so the first screen is not held up
+        profile = transport.terminal_profile
+        if self.recorder:
+            # A ROM reply to come is recorded with the input
+            self.recorder.opened(transport.transport_id, transport.kind, profile.rom if profile else b"")
+            transport = RecordingTransport(transport, self.recorder)
+        session = Session(
+            transport, self.ha_client, self._protocol_for(profile or terminal.DEFAULT_PROFILE), self.i18n,
+            profile=profile or terminal.DEFAULT_PROFILE,
+            protocol_for=None if profile else self._protocol_for,
+            idle_timeout=0 if serial else self.idle_timeout, hibernate_after=self.hibernate_after,
+            favorites=self.favorites,
+        )
+        # Nothing is awaited between the limit check and here, so
+        # connections arriving together each see the others' slots
         self._sessions[transport.transport_id] = session
-        logger.info("Session started: %s", transport.transport_id)
+        logger.info("Session started: %s (%s)", transport.transport_id, session.profile.model)
         await session.start()
 
+    def _network_sessions(self) -> int:
+        """Sessions counted against max_sessions."""
+        return sum(1 for session in self._sessions.values() if session.transport.kind != "serial")
+
+    async def _reject(self, transport: Transport):
+        """Tell the terminal the service is full and hang up."""
+        p = self.protocol
+        try:
+            await transport.send(
+                p.clear_screen() + p.move_cursor(12, 1) + p.static_text(self.i18n.t("common.busy"))
+            )
+        except ConnectionError:
+            pass
+        await transport.close(CloseReason.REJECTED)
+
+    def _protocol_for(self, profile: TerminalProfile) -> MinitelProtocol:
+        """Return the shared encoder for a terminal profile."""
+        protocol = self._protocols.get(profile)
+        if protocol is None:
+            protocol = self._protocols[profile] = VideotexProtocol(profile)
+        return protocol
+
+    def collect_metrics(self):
+        """Refresh the session and transport gauges (run at scrape time)."""
+        metrics.SESSIONS.clear()
+        for metric in (metrics.SESSION_BYTES, metrics.SESSION_FRAMES, metrics.SESSION_QUEUED_BYTES):
+            metric.clear()
+        per_kind: dict[str, int] = {}
+        for transport_id, session in self._sessions.items():
+            transport = session.transport
+            per_kind[transport.kind] = per_kind.get(transport.kind, 0) + 1
+            metrics.SESSION_BYTES.set(transport.stats.bytes_sent, transport_id, transport.kind)
+            metrics.SESSION_FRAMES.set(transport.stats.frames, transport_id, transport.kind)
+            metrics.SESSION_QUEUED_BYTES.set(transport.buffered, transport_id, transport.kind)
+        for kind, count in per_kind.items():
+            metrics.SESSIONS.set(count, kind)
+
     async def on_transport_disconnected(self, transport: Transport):
         """Stop and remove a session."""
+        if self.recorder:
+            self.recorder.closed(transport.transport_id)
         session = self._sessions.pop(transport.transport_id, None)
         if session:
             await session.stop()
             logger.info("Session ended: %s", transport.transport_id)
 
+    async def on_ha_connection(self, connected: bool):
+        """Move sessions waiting for Home Assistant to the home screen once it answers."""
+        if not connected:
+            return
+        waiting = [s for s in self._sessions.values() if isinstance(s.current_screen, ConnectingScreen)]
+        await asyncio.gather(*(session.go_home() for session in waiting))
+
     async def on_state_changed(self, event_data: dict):
         """Broadcast state change to all sessions."""
         entity_id = event_data.get("entity_id", "")
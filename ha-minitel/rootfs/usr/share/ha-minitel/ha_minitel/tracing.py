@@ -0,0 +1,149 @@
+"""Keypress-to-last-byte latency tracing, broken down by phase.
+
+A trace starts when a key arrives in Session._input_loop and ends once
+its response has been handed to the transport. Code along the way marks
+phases with span(); the current trace travels in a context variable, so
+HA commands awaited deep inside a screen are charged to the key that
+caused them. Each span only counts its own time: an HA wait inside a
+draw counts as "ha", not "encode".
+"""
+
+from __future__ import annotations
+
+import contextvars
+import json
+import logging
+import time
+from contextlib import contextmanager
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+# parse: input decoding; handler: screen logic; ha: waiting for Home
+# Assistant; encode: building full screens; write: transport.send
+PHASES = ("parse", "handler", "ha", "encode", "write")
+
+# Keys slower than this are logged with their breakdown (seconds)
+SLOW_KEY = 0.5
+
+# Finer at the low end than the defaults: most phases of a key take well
+# under a millisecond, and the quantiles in summary() interpolate in buckets
+KEY_BUCKETS = (0.0001, 0.00025, 0.0005) + metrics.DEFAULT_BUCKETS
+
+KEY_SECONDS = metrics.REGISTRY.register(metrics.Histogram(
+    "minitel_key_seconds", "Time from a key arriving to the last byte of its response being sent",
+    ("screen",), KEY_BUCKETS))
+KEY_PHASE_SECONDS = metrics.REGISTRY.register(metrics.Histogram(
+    "minitel_key_phase_seconds", "Time per phase of handling a key", ("screen", "phase"), KEY_BUCKETS))
+
+
+class Trace:
+    """Timings of one key, from its arrival to the end of its response."""
+
+    __slots__ = ("screen", "key", "start", "phases", "finished")
+
+    def __init__(self, screen: str, key: str, start: float):
+        self.screen = screen
+        self.key = key
+        self.start = start
+        self.phases = dict.fromkeys(PHASES, 0.0)
+        self.finished = False
+
+
+class _Span:
+    __slots__ = ("parent", "child_time")
+
+    def __init__(self, parent: "_Span | None"):
+        self.parent = parent
+        self.child_time = 0.0
+
+
+_current: contextvars.ContextVar[tuple[Trace, "_Span | None"] | None] = contextvars.ContextVar(
+    "minitel_trace", default=None
+)
+
+
+def start(screen: str, key: str, started: float, parse: float = 0.0) -> contextvars.Token:
+    """Make a new trace current; started is when its input arrived (perf_counter)."""
+    trace = Trace(screen, key, started)
+    trace.phases["parse"] = parse
+    return _current.set((trace, None))
+
+
+def finish(token: contextvars.Token) -> Trace:
+    """Close the current trace, record it and restore the previous context."""
+    trace = _current.get()[0]
+    _current.reset(token)
+    trace.finished = True
+    total = time.perf_counter() - trace.start
+    KEY_SECONDS.observe(total, trace.screen)
+    for phase, seconds in trace.phases.items():
+        KEY_PHASE_SECONDS.observe(seconds, trace.screen, phase)
+    if total >= SLOW_KEY:
+        logger.warning("Slow key %r on %s: %.0f ms (%s)", trace.key, trace.screen, total * 1000, _breakdown(trace))
+    elif logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Key %r on %s: %.1f ms (%s)", trace.key, trace.screen, total * 1000, _breakdown(trace))
+    return trace
+
+
+def _breakdown(trace: Trace) -> str:
+    return ", ".join(f"{phase} {seconds * 1000:.1f}" for phase, seconds in trace.phases.items())
+
+
+@contextmanager
+def span(phase: str):
+    """Charge the time spent in the block (minus nested spans) to phase."""
+    state = _current.get()
+    if state is None or state[0].finished:
+        yield
+        return
+    trace, parent = state
+    node = _Span(parent)
+    token = _current.set((trace, node))
+    began = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - began
+        _current.reset(token)
+        trace.phases[phase] += elapsed - node.child_time
+        if parent is not None:
+            parent.child_time += elapsed
+
+
+def quantile(histogram: metrics.Histogram, counts: list[int], q: float) -> float:
+    """Estimate a quantile from bucket counts, interpolating within the bucket."""
+    total = sum(counts)
+    if not total:
+        return 0.0
+    rank = q * total
+    seen = 0
+    lower = 0.0
+    for bound, n in zip(histogram.buckets, counts):
+        if seen + n >= rank:
+            return lower + (bound - lower) * ((rank - seen) / n if n else 0.0)
+        seen += n
+        lower = bound
+    return histogram.buckets[-1]  # in the +Inf bucket: report the largest bound
+
+
+def summary() -> dict:
+    """Per screen: key count, latency quantiles and mean time per phase (ms)."""
+    phases = KEY_PHASE_SECONDS.series()
+    screens = {}
+    for (screen,), (counts, total, count) in sorted(KEY_SECONDS.series().items()):
+        screens[screen] = {
+            "keys": count,
+            "mean_ms": round(total / count * 1000, 2),
+            **{f"p{int(q * 100)}_ms": round(quantile(KEY_SECONDS, counts, q) * 1000, 2) for q in (0.5, 0.9, 0.99)},
+            "phases_mean_ms": {
+                phase: round(phases[(screen, phase)][1] / count * 1000, 2)
+                for phase in PHASES if (screen, phase) in phases
+            },
+        }
+    return screens
+
+
+def summary_json() -> str:
+    return json.dumps(summary(), indent=2) + "\n"
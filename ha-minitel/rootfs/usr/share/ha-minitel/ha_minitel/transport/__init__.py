@@ -1,7 +1,12 @@
 """Transport layer for Minitel connections."""
 
-from .base import Transport
+from .base import CloseReason, Transport, TransportStats
 from .websocket_server import WebSocketServer, WebSocketTransport
 from .serial_transport import SerialMinitelTransport
+from .serial_discovery import SerialSupervisor
+from .tcp_server import TcpServer, TcpTransport
 
-__all__ = ["Transport", "WebSocketServer", "WebSocketTransport", "SerialMinitelTransport"]
+__all__ = [
+    "CloseReason", "Transport", "TransportStats", "WebSocketServer", "WebSocketTransport",
+    "SerialMinitelTransport", "SerialSupervisor", "TcpServer", "TcpTransport",
+]
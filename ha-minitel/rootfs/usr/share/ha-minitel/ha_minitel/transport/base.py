@@ -1,10 +1,62 @@
 """Transport ABC for Minitel connections."""
 
+from __future__ import annotations
+
+import asyncio
 from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from enum import Enum
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from ..protocol.terminal import TerminalProfile
+
+
+class CloseReason(Enum):
+    """Why a transport stopped."""
+
+    LOCAL = "closed locally"
+    REMOTE = "closed by terminal"
+    ERROR = "transport error"
+    IDLE = "idle timeout"
+    REJECTED = "session limit reached"
+
+
+@dataclass
+class TransportStats:
+    """Outbound traffic counters for one transport.
+
+    writes counts send() calls; frames counts what actually went on the
+    wire (WebSocket messages, serial writes). overhead_saved is the framing
+    overhead avoided by merging writes into fewer frames.
+    """
+
+    writes: int = 0
+    frames: int = 0
+    bytes_sent: int = 0
+    overhead_saved: int = 0
+
+    @property
+    def coalesced(self) -> int:
+        """Writes that did not need a frame of their own."""
+        return self.writes - self.frames
 
 
 class Transport(ABC):
-    """Abstract base class for Minitel transports (WS or serial)."""
+    """Abstract base class for Minitel transports (WS or serial).
+
+    Subclasses call _set_open() when the link comes up and _set_closed()
+    as soon as they see it go down, so that wait_closed() waiters wake
+    immediately instead of polling is_connected.
+    """
+
+    # Transport type, for logs and metrics
+    kind = "transport"
+
+    def __init__(self):
+        self._closed = asyncio.Event()
+        self._close_reason: CloseReason | None = None
+        self.stats = TransportStats()
 
     @abstractmethod
     async def send(self, data: bytes) -> None:
@@ -12,11 +64,11 @@ class Transport(ABC):
 
     @abstractmethod
     async def recv(self) -> bytes:
-        """Receive raw bytes from the Minitel."""
+        """Receive raw bytes from the Minitel. Raises ConnectionError once closed."""
 
     @abstractmethod
-    async def close(self) -> None:
-        """Close the transport."""
+    async def close(self, reason: CloseReason = CloseReason.LOCAL) -> None:
+        """Close the transport, recording why."""
 
     @property
     @abstractmethod
@@ -27,3 +79,34 @@ class Transport(ABC):
     @abstractmethod
     def transport_id(self) -> str:
         """Unique identifier for this transport instance."""
+
+    @property
+    def buffered(self) -> int:
+        """Bytes accepted by send() but not yet written out."""
+        return 0
+
+    @property
+    def terminal_profile(self) -> TerminalProfile | None:
+        """Terminal profile found while opening the link, if any."""
+        return None
+
+    @property
+    def close_reason(self) -> CloseReason | None:
+        """Why the transport closed, or None while it is open."""
+        return self._close_reason
+
+    async def wait_closed(self) -> CloseReason:
+        """Wait until the transport closes and return why."""
+        await self._closed.wait()
+        return self._close_reason
+
+    def _set_open(self) -> None:
+        """Re-arm the closed notification (transports that can reopen)."""
+        self._closed.clear()
+        self._close_reason = None
+
+    def _set_closed(self, reason: CloseReason) -> None:
+        """Record the first close reason and wake wait_closed() waiters."""
+        if self._close_reason is None:
+            self._close_reason = reason
+        self._closed.set()
@@ -0,0 +1,114 @@
+"""Serial device discovery: one supervised transport per matching device."""
+
+from __future__ import annotations
+
+import asyncio
+import glob
+import logging
+from typing import Callable, Awaitable
+
+from .base import Transport
+from .serial_transport import SerialMinitelTransport
+
+logger = logging.getLogger(__name__)
+
+# Seconds between scans for hotplugged devices
+RESCAN_INTERVAL = 5.0
+
+
+def is_pattern(device: str) -> bool:
+    return glob.has_magic(device)
+
+
+def expand_devices(patterns: list[str]) -> set[str]:
+    """Resolve device paths and globs to the set of devices to supervise.
+
+    Plain paths are always kept, even when missing, so that their
+    supervisor keeps retrying until the adapter is plugged in. Glob
+    patterns only yield devices that currently exist.
+    """
+    devices = set()
+    for pattern in patterns:
+        if is_pattern(pattern):
+            devices.update(glob.glob(pattern))
+        else:
+            devices.add(pattern)
+    return devices
+
+
+class SerialSupervisor:
+    """Runs a reconnecting SerialMinitelTransport per discovered device."""
+
+    def __init__(
+        self,
+        patterns: list[str],
+        on_connect: Callable[[Transport], Awaitable[None]],
+        on_disconnect: Callable[[Transport], Awaitable[None]],
+        baud_rate: int = 1200,
+        parity: str = "even",
+        auto_speed: bool = False,
+        rescan_interval: float = RESCAN_INTERVAL,
+    ):
+        self._patterns = list(patterns)
+        self._on_connect = on_connect
+        self._on_disconnect = on_disconnect
+        self._baud_rate = baud_rate
+        self._parity = parity
+        self._auto_speed = auto_speed
+        self._rescan_interval = rescan_interval
+        self._tasks: dict[str, asyncio.Task] = {}
+
+    @property
+    def devices(self) -> list[str]:
+        """Devices currently supervised."""
+        return sorted(self._tasks)
+
+    async def run(self):
+        """Supervise devices, rescanning globs for hotplugged adapters."""
+        has_globs = any(is_pattern(p) for p in self._patterns)
+        try:
+            while True:
+                self._sync(expand_devices(self._patterns))
+                if not has_globs:
+                    await asyncio.gather(*self._tasks.values())
+                    return
+                await asyncio.sleep(self._rescan_interval)
+        finally:
+            for task in self._tasks.values():
+                task.cancel()
+            await asyncio.gather(*self._tasks.values(), return_exceptions=True)
+
+    def _sync(self, devices: set[str]):
+        for device in devices - self._tasks.keys():
+            logger.info("Serial device found: %s", device)
+            self._tasks[device] = asyncio.create_task(self._supervise(device))
+        for device in self._tasks.keys() - devices:
+            logger.info("Serial device removed: %s", device)
+            self._tasks.pop(device).cancel()
+
+    async def _supervise(self, device: str):
+        """Connect serial transport and register with session manager."""
+        transport = SerialMinitelTransport(
+            device=device,
+            baud_rate=self._baud_rate,
+            parity=self._parity,
+            auto_speed=self._auto_speed,
+        )
+        backoff = 1
+        while True:
+            try:
+                await transport.open()
+                backoff = 1
+                await self._on_connect(transport)
+                reason = await transport.wait_closed()
+                logger.info("Serial transport on %s closed: %s", device, reason.value)
+                # Don't spin on a port that closes as soon as it opens
+                await asyncio.sleep(1)
+            except Exception:
+                logger.exception("Serial transport error on %s, reconnecting in %ds",
+                                 device, backoff)
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 60)
+            finally:
+                await self._on_disconnect(transport)
+                await transport.close()
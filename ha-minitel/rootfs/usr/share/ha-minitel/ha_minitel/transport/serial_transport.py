@@ -6,9 +6,12 @@ import asyncio
 import logging
 import uuid
 
+import serial
 import serial_asyncio
 
-from .base import Transport
+from .base import CloseReason, Transport
+from ..protocol import constants as C
+from ..protocol import terminal
 
 logger = logging.getLogger(__name__)
 
@@ -18,20 +21,37 @@ PARITY_MAP = {
     "odd": "O",
 }
 
+# Seconds to wait for the terminal to answer a probe
+PROBE_TIMEOUT = 1.0
+
 
 class SerialMinitelTransport(Transport):
     """Wraps a pyserial-asyncio connection as a Transport."""
 
-    def __init__(self, device: str, baud_rate: int = 1200, parity: str = "even"):
+    kind = "serial"
+
+    def __init__(
+        self,
+        device: str,
+        baud_rate: int = 1200,
+        parity: str = "even",
+        auto_speed: bool = False,
+    ):
+        super().__init__()
         self._device = device
+        self._initial_baud_rate = baud_rate
         self._baud_rate = baud_rate
+        self._auto_speed = auto_speed
         self._parity = PARITY_MAP.get(parity, "E")
         self._reader: asyncio.StreamReader | None = None
         self._writer: asyncio.StreamWriter | None = None
         self._id = f"serial-{uuid.uuid4().hex[:8]}"
         self._connected = False
+        self._profile: terminal.TerminalProfile | None = None
 
     async def open(self) -> None:
+        self._baud_rate = self._initial_baud_rate
+        self._profile = None
         self._reader, self._writer = await serial_asyncio.open_serial_connection(
             url=self._device,
             baudrate=self._baud_rate,
@@ -40,33 +60,152 @@ class SerialMinitelTransport(Transport):
             stopbits=1,
         )
         self._connected = True
+        self._set_open()
         logger.info("Serial port opened: %s @ %d baud", self._device, self._baud_rate)
+        if self._auto_speed:
+            try:
+                await self._negotiate_speed()
+            except Exception:
+                logger.exception("Speed negotiation failed on %s", self._device)
+                self._set_port_speed(self._initial_baud_rate)
+
+    async def _negotiate_speed(self) -> None:
+        """Switch the terminal and the port to the highest common speed."""
+        profile = self._profile = await self._identify()
+        if profile is None:
+            logger.info("No ROM identification from %s, keeping %d baud",
+                        self._device, self._initial_baud_rate)
+            self._set_port_speed(self._initial_baud_rate)
+            return
+        logger.info("Terminal on %s: %s (up to %d baud)",
+                    self._device, profile.model, profile.max_speed)
+
+        for speed in sorted(C.SPEED_CODES, reverse=True):
+            if speed <= self._baud_rate:
+                break
+            if speed > profile.max_speed:
+                continue
+            previous = self._baud_rate
+            self._writer.write(terminal.program_speed(speed))
+            await self._writer.drain()
+            await self._wait_sent()
+            self._set_port_speed(speed)
+            if await self._confirm_speed(speed):
+                logger.info("Serial link on %s upgraded to %d baud", self._device, speed)
+                return
+            # The terminal rejected the speed: resync at the previous one
+            self._set_port_speed(previous)
+            if not await self._confirm_speed(previous):
+                logger.warning("Terminal on %s does not answer speed status at %d baud",
+                               self._device, previous)
+                return
+
+    async def _identify(self) -> terminal.TerminalProfile | None:
+        """Probe the terminal ROM, starting at the configured speed.
+
+        A terminal left at a faster speed by a previous negotiation (port
+        reopened without a power cycle) is found by trying the other speeds.
+        """
+        others = sorted(set(C.SPEED_CODES) - {self._baud_rate}, reverse=True)
+        for speed in [self._baud_rate] + others:
+            self._set_port_speed(speed)
+            profile = terminal.parse_rom(await self._probe(terminal.enq_rom(), 5))
+            if profile is not None:
+                return profile
+        return None
+
+    async def _confirm_speed(self, speed: int) -> bool:
+        reply = await self._probe(terminal.query_speed(), 4)
+        return terminal.parse_speed_status(reply) == speed
+
+    async def _probe(self, request: bytes, reply_len: int) -> bytes:
+        """Send a protocol request and collect its reply, or b"" on timeout."""
+        self._writer.write(request)
+        await self._writer.drain()
+        buf = bytearray()
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + PROBE_TIMEOUT
+        while len(buf) < reply_len:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                chunk = await asyncio.wait_for(self._reader.read(64), remaining)
+            except asyncio.TimeoutError:
+                break
+            if not chunk:
+                break
+            buf.extend(chunk)
+        return bytes(buf)
+
+    async def _wait_sent(self) -> None:
+        """Wait until the output buffer has left the UART at the current speed."""
+        port = self._writer.transport.serial
+        while port.out_waiting:
+            await asyncio.sleep(0.01)
+        # Last character time (10 bits per 7E1 frame) plus margin
+        await asyncio.sleep(20 / self._baud_rate)
+
+    def _set_port_speed(self, speed: int) -> None:
+        if self._writer:
+            self._writer.transport.serial.baudrate = speed
+        self._baud_rate = speed
 
     async def send(self, data: bytes) -> None:
         if self._writer:
-            self._writer.write(data)
-            await self._writer.drain()
+            try:
+                self._writer.write(data)
+                self.stats.writes += 1
+                self.stats.frames += 1
+                self.stats.bytes_sent += len(data)
+                await self._writer.drain()
+            except (OSError, serial.SerialException) as e:
+                self._lost(CloseReason.ERROR)
+                raise ConnectionError(f"Serial write failed: {e}") from e
 
     async def recv(self) -> bytes:
         if not self._reader:
             raise ConnectionError("Serial port not open")
-        data = await self._reader.read(256)
+        try:
+            data = await self._reader.read(256)
+        except (OSError, serial.SerialException) as e:
+            self._lost(CloseReason.ERROR)
+            raise ConnectionError(f"Serial read failed: {e}") from e
         if not data:
-            self._connected = False
+            self._lost(CloseReason.REMOTE)
             raise ConnectionError("Serial port closed")
         return data
 
-    async def close(self) -> None:
+    def _lost(self, reason: CloseReason) -> None:
         self._connected = False
+        self._set_closed(reason)
+
+    async def close(self, reason: CloseReason = CloseReason.LOCAL) -> None:
+        self._lost(reason)
         if self._writer:
             self._writer.close()
             self._writer = None
         self._reader = None
 
+    @property
+    def buffered(self) -> int:
+        if not self._writer:
+            return 0
+        return self._writer.transport.get_write_buffer_size()
+
     @property
     def is_connected(self) -> bool:
         return self._connected
 
+    @property
+    def baud_rate(self) -> int:
+        """Current link speed, after any negotiation."""
+        return self._baud_rate
+
+    @property
+    def terminal_profile(self) -> terminal.TerminalProfile | None:
+        return self._profile
+
     @property
     def transport_id(self) -> str:
         return self._id
@@ -0,0 +1,188 @@
+"""Raw TCP (optionally telnet) server and transport for Videotex gateways."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import uuid
+from typing import Callable, Awaitable
+
+from .base import CloseReason, Transport, TransportStats
+
+logger = logging.getLogger(__name__)
+
+# Inbound buffer cap: reading pauses when this much input is unread
+READ_LIMIT = 4096
+
+# Telnet commands and options (RFC 854, 856, 857, 858)
+IAC = 0xFF
+DONT = 0xFE
+DO = 0xFD
+WONT = 0xFC
+WILL = 0xFB
+SB = 0xFA
+SE = 0xF0
+OPT_BINARY = 0x00
+OPT_ECHO = 0x01
+OPT_SGA = 0x03
+
+# Server echoes and suppresses go-ahead (character mode), 8-bit clean both ways
+TELNET_NEGOTIATION = bytes([
+    IAC, WILL, OPT_ECHO,
+    IAC, WILL, OPT_SGA,
+    IAC, DO, OPT_SGA,
+    IAC, WILL, OPT_BINARY,
+    IAC, DO, OPT_BINARY,
+])
+
+
+class TelnetFilter:
+    """Strips telnet commands from an inbound byte stream."""
+
+    def __init__(self):
+        self._state = 0  # 0 data, 1 after IAC, 2 option byte, 3 in SB, 4 IAC in SB
+        self._after_cr = False
+
+    def feed(self, data: bytes) -> bytes:
+        out = bytearray()
+        for b in data:
+            state = self._state
+            if state == 0:
+                if b == IAC:
+                    self._state = 1
+                elif b == 0 and self._after_cr:
+                    pass  # CR NUL is a bare CR
+                else:
+                    out.append(b)
+                self._after_cr = b == 0x0D
+            elif state == 1:
+                if b == IAC:
+                    out.append(IAC)
+                    self._state = 0
+                elif b in (WILL, WONT, DO, DONT):
+                    self._state = 2
+                elif b == SB:
+                    self._state = 3
+                else:
+                    self._state = 0
+            elif state == 2:
+                self._state = 0
+            elif state == 3:
+                if b == IAC:
+                    self._state = 4
+            else:
+                self._state = 0 if b == SE else 3
+        return bytes(out)
+
+
+class TcpTransport(Transport):
+    """Wraps an asyncio stream connection as a Transport."""
+
+    kind = "tcp"
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, telnet: bool = False):
+        super().__init__()
+        self._reader = reader
+        self._writer = writer
+        self._telnet = TelnetFilter() if telnet else None
+        self._id = f"tcp-{uuid.uuid4().hex[:8]}"
+
+    async def start(self) -> None:
+        """Send telnet option negotiation, if enabled."""
+        if self._telnet:
+            self._writer.write(TELNET_NEGOTIATION)
+            await self._writer.drain()
+
+    async def send(self, data: bytes) -> None:
+        if self._close_reason is not None:
+            raise ConnectionError("TCP connection closed")
+        if self._telnet and IAC in data:
+            data = data.replace(bytes([IAC]), bytes([IAC, IAC]))
+        try:
+            self._writer.write(data)
+            self.stats.writes += 1
+            self.stats.frames += 1
+            self.stats.bytes_sent += len(data)
+            await self._writer.drain()
+        except OSError as e:
+            self._set_closed(CloseReason.ERROR)
+            raise ConnectionError(f"TCP write failed: {e}") from e
+
+    async def recv(self) -> bytes:
+        while True:
+            try:
+                data = await self._reader.read(256)
+            except OSError as e:
+                self._set_closed(CloseReason.ERROR)
+                raise ConnectionError(f"TCP read failed: {e}") from e
+            if not data:
+                self._set_closed(CloseReason.REMOTE)
+                raise ConnectionError("TCP connection closed")
+            if self._telnet:
+                data = self._telnet.feed(data)
+                if not data:
+                    continue  # negotiation only
+            return data
+
+    async def close(self, reason: CloseReason = CloseReason.LOCAL) -> None:
+        self._set_closed(reason)
+        self._writer.close()
+        try:
+            await self._writer.wait_closed()
+        except OSError:
+            pass
+
+    @property
+    def buffered(self) -> int:
+        return self._writer.transport.get_write_buffer_size()
+
+    @property
+    def is_connected(self) -> bool:
+        return self._close_reason is None
+
+    @property
+    def transport_id(self) -> str:
+        return self._id
+
+
+class TcpServer:
+    """TCP server that creates a transport per connection."""
+
+    def __init__(
+        self,
+        port: int,
+        on_connect: Callable[[Transport], Awaitable[None]],
+        on_disconnect: Callable[[Transport], Awaitable[None]],
+        telnet: bool = False,
+    ):
+        self.port = port
+        self._on_connect = on_connect
+        self._on_disconnect = on_disconnect
+        self._telnet = telnet
+        self.stats = TransportStats()
+
+    async def serve(self):
+        server = await asyncio.start_server(self._handler, "0.0.0.0", self.port, limit=READ_LIMIT)
+        async with server:
+            logger.info("TCP server listening on port %d%s", self.port,
+                        " (telnet)" if self._telnet else "")
+            await server.serve_forever()
+
+    async def _handler(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        transport = TcpTransport(reader, writer, telnet=self._telnet)
+        peer = writer.get_extra_info("peername")
+        logger.info("New TCP connection: %s from %s", transport.transport_id, peer)
+        try:
+            await transport.start()
+            await self._on_connect(transport)
+            await transport.wait_closed()
+        except ConnectionError:
+            pass
+        finally:
+            await self._on_disconnect(transport)
+            await transport.close()
+            self.stats.writes += transport.stats.writes
+            self.stats.frames += transport.stats.frames
+            self.stats.bytes_sent += transport.stats.bytes_sent
+            logger.info("TCP disconnected: %s (%s)", transport.transport_id,
+                        transport.close_reason.value if transport.close_reason else "?")
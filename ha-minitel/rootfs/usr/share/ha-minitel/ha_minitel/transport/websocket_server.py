@@ -1,5 +1,7 @@
 """WebSocket server and transport for Minitel emulators."""
 
+from __future__ import annotations
+
 import asyncio
 import logging
 import uuid
@@ -7,31 +9,122 @@ from typing import Callable, Awaitable
 
 import websockets
 import websockets.connection
+import websockets.exceptions
 import websockets.server
+from websockets.extensions.permessage_deflate import ServerPerMessageDeflateFactory
 
-from .base import Transport
+from .base import CloseReason, Transport, TransportStats
 
 logger = logging.getLogger(__name__)
 
+# Buffered bytes above which send() waits for the pending frame to go out
+WRITE_HIGH_WATER = 4096
+
+# Videotex frames are a few hundred bytes: a small deflate window and
+# memLevel compress them as well as the defaults for far less memory.
+DEFLATE_WINDOW_BITS = 11
+DEFLATE_MEM_LEVEL = 4
+
+# Inbound limits: keystrokes are a few bytes, anything bigger is abuse
+MAX_MESSAGE_SIZE = 1024
+MAX_QUEUE = 8
+
+# Keepalive: detect dead emulator tabs without flooding idle links
+PING_INTERVAL = 30
+PING_TIMEOUT = 20
+
+
+def frame_header_size(length: int) -> int:
+    """Size of an unmasked (server to client) WebSocket frame header."""
+    if length < 126:
+        return 2
+    if length < 65536:
+        return 4
+    return 10
+
 
 class WebSocketTransport(Transport):
-    """Wraps a WebSocket connection as a Transport."""
+    """Wraps a WebSocket connection as a Transport.
+
+    send() only buffers: every write issued before the event loop gets
+    back to this transport is merged into a single binary frame.
+    """
+
+    kind = "websocket"
 
     def __init__(self, ws: websockets.server.ServerConnection):
+        super().__init__()
         self._ws = ws
         self._id = f"ws-{uuid.uuid4().hex[:8]}"
+        self._buf = bytearray()
+        self._buf_header_size = 0
+        self._flush_task: asyncio.Task | None = None
 
     async def send(self, data: bytes) -> None:
-        await self._ws.send(data)
+        if self._close_reason is not None:
+            raise ConnectionError("WebSocket closed")
+        if not data:
+            return
+        self._buf += data
+        self._buf_header_size += frame_header_size(len(data))
+        self.stats.writes += 1
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush())
+        if len(self._buf) >= WRITE_HIGH_WATER:
+            await self.drain()
+
+    async def drain(self) -> None:
+        """Wait until buffered writes have been handed to the connection."""
+        while self._flush_task is not None:
+            await asyncio.shield(self._flush_task)
+        if self._close_reason in (CloseReason.REMOTE, CloseReason.ERROR):
+            raise ConnectionError("WebSocket closed")
+
+    async def _flush(self) -> None:
+        try:
+            while self._buf:
+                frame = bytes(self._buf)
+                self.stats.overhead_saved += self._buf_header_size - frame_header_size(len(frame))
+                self._buf.clear()
+                self._buf_header_size = 0
+                await self._ws.send(frame)
+                self.stats.frames += 1
+                self.stats.bytes_sent += len(frame)
+        except websockets.exceptions.ConnectionClosed as e:
+            self._buf.clear()
+            self.connection_lost(e)
+        finally:
+            self._flush_task = None
+
+    @property
+    def buffered(self) -> int:
+        """Bytes waiting for the next frame, plus those the connection has not sent yet."""
+        transport = getattr(self._ws, "transport", None)
+        return len(self._buf) + (transport.get_write_buffer_size() if transport else 0)
 
     async def recv(self) -> bytes:
-        data = await self._ws.recv()
+        try:
+            data = await self._ws.recv()
+        except websockets.exceptions.ConnectionClosed as e:
+            self.connection_lost(e)
+            raise ConnectionError("WebSocket closed") from e
         if isinstance(data, str):
             return data.encode("latin-1")
         return data
 
-    async def close(self) -> None:
-        await self._ws.close()
+    def connection_lost(self, exc: websockets.exceptions.ConnectionClosed | None = None) -> None:
+        """Mark the transport closed by the peer, or by an error if exc says so."""
+        if isinstance(exc, websockets.exceptions.ConnectionClosedError):
+            self._set_closed(CloseReason.ERROR)
+        else:
+            self._set_closed(CloseReason.REMOTE)
+
+    async def close(self, reason: CloseReason = CloseReason.LOCAL) -> None:
+        self._set_closed(reason)
+        try:
+            await self.drain()
+        finally:
+            await self._ws.close()
 
     @property
     def is_connected(self) -> bool:
@@ -50,16 +143,47 @@ class WebSocketServer:
         port: int,
         on_connect: Callable[[Transport], Awaitable[None]],
         on_disconnect: Callable[[Transport], Awaitable[None]],
+        compression: bool = True,
+        deflate_window_bits: int = DEFLATE_WINDOW_BITS,
+        deflate_mem_level: int = DEFLATE_MEM_LEVEL,
+        ping_interval: float | None = PING_INTERVAL,
+        ping_timeout: float | None = PING_TIMEOUT,
+        max_message_size: int = MAX_MESSAGE_SIZE,
+        max_queue: int = MAX_QUEUE,
     ):
         self.port = port
         self._on_connect = on_connect
         self._on_disconnect = on_disconnect
+        self._compression = compression
+        self._deflate_window_bits = deflate_window_bits
+        self._deflate_mem_level = deflate_mem_level
+        self._ping_interval = ping_interval
+        self._ping_timeout = ping_timeout
+        self._max_message_size = max_message_size
+        self._max_queue = max_queue
+        self.stats = TransportStats()
+
+    def _extensions(self) -> list:
+        if not self._compression:
+            return []
+        return [ServerPerMessageDeflateFactory(
+            server_max_window_bits=self._deflate_window_bits,
+            client_max_window_bits=self._deflate_window_bits,
+            compress_settings={"memLevel": self._deflate_mem_level},
+        )]
 
     async def serve(self):
         async with websockets.serve(
             self._handler,
             "0.0.0.0",
             self.port,
+            compression=None,
+            extensions=self._extensions(),
+            ping_interval=self._ping_interval,
+            ping_timeout=self._ping_timeout,
+            max_size=self._max_message_size,
+            max_queue=self._max_queue,
+            write_limit=WRITE_HIGH_WATER,
         ):
             logger.info("WebSocket server listening on port %d", self.port)
             await asyncio.Future()  # run forever
@@ -70,6 +194,20 @@ class WebSocketServer:
         try:
             await self._on_connect(transport)
             await ws.wait_closed()
+            transport.connection_lost()
         finally:
             await self._on_disconnect(transport)
-            logger.info("WebSocket disconnected: %s", transport.transport_id)
+            self._add_stats(transport.stats)
+            logger.info("WebSocket disconnected: %s (%s)", transport.transport_id,
+                        transport.close_reason.value if transport.close_reason else "?")
+            logger.debug("%s: %d writes in %d frames, %d bytes, %d framing bytes saved",
+                         transport.transport_id, transport.stats.writes,
+                         transport.stats.frames, transport.stats.bytes_sent,
+                         transport.stats.overhead_saved)
+
+    def _add_stats(self, stats: TransportStats):
+        """Fold a closed connection's counters into the server totals."""
+        self.stats.writes += stats.writes
+        self.stats.frames += stats.frames
+        self.stats.bytes_sent += stats.bytes_sent
+        self.stats.overhead_saved += stats.overhead_saved
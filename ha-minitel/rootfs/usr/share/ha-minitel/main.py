@@ -16,19 +16,56 @@ def parse_args() -> Config:
     parser = argparse.ArgumentParser(description="ha-minitel: Minitel interface for Home Assistant")
     parser.add_argument("--language", default="fr", choices=["fr", "en"])
     parser.add_argument("--websocket-port", type=int, default=3615)
-    parser.add_argument("--serial-device", default="")
+    parser.add_argument("--websocket-compression", action=argparse.BooleanOptionalAction, default=True)
+    parser.add_argument("--websocket-deflate-window-bits", type=int, default=11, choices=range(9, 16))
+    parser.add_argument("--websocket-ping-interval", type=int, default=30, help="Seconds (0 disables)")
+    parser.add_argument("--max-sessions", type=int, default=16, help="0 for unlimited")
+    parser.add_argument("--session-hibernate-after", type=int, default=600, help="Seconds (0 disables)")
+    parser.add_argument("--session-idle-timeout", type=int, default=3600, help="Seconds (0 disables)")
+    parser.add_argument("--tcp-port", type=int, default=0, help="Raw TCP Videotex port (0 disables)")
+    parser.add_argument("--tcp-telnet", action="store_true")
+    parser.add_argument("--serial-device", action="append", default=[],
+                        help="Device path or glob (e.g. /dev/ttyUSB*); repeat or comma-separate for several")
     parser.add_argument("--serial-baud-rate", type=int, default=1200, choices=[1200, 4800, 9600])
     parser.add_argument("--serial-parity", default="even", choices=["none", "even", "odd"])
+    parser.add_argument("--serial-auto-speed", action="store_true")
+    parser.add_argument("--favorite", action="append", default=[],
+                        help="Entity ID for the favorites screen; repeat or comma-separate for several (20 max)")
+    parser.add_argument("--metrics-port", type=int, default=0,
+                        help="HTTP port serving Prometheus metrics at /metrics (0 disables)")
+    parser.add_argument("--record-path", default="",
+                        help="Record HA traffic and terminal input to this file (strftime fields allowed)")
+    parser.add_argument("--slow-callback-ms", type=int, default=100,
+                        help="Log event loop steps slower than this (0 disables the loop monitor)")
+    parser.add_argument("--snapshot-dir", default="",
+                        help="Keep a snapshot of states and areas here for a warm start (empty disables)")
+    parser.add_argument("--ha-url", default="ws://supervisor/core/websocket",
+                        help="Home Assistant WebSocket API URL")
     parser.add_argument("--log-level", default="info", choices=["debug", "info", "warning", "error"])
     args = parser.parse_args()
 
     return Config(
         language=args.language,
         websocket_port=args.websocket_port,
-        serial_device=args.serial_device,
+        websocket_compression=args.websocket_compression,
+        websocket_deflate_window_bits=args.websocket_deflate_window_bits,
+        websocket_ping_interval=args.websocket_ping_interval,
+        max_sessions=args.max_sessions,
+        session_hibernate_after=args.session_hibernate_after,
+        session_idle_timeout=args.session_idle_timeout,
+        tcp_port=args.tcp_port,
+        tcp_telnet=args.tcp_telnet,
+        serial_devices=[d.strip() for arg in args.serial_device for d in arg.split(",") if d.strip()],
         serial_baud_rate=args.serial_baud_rate,
         serial_parity=args.serial_parity,
+        serial_auto_speed=args.serial_auto_speed,
+        favorites=[e.strip() for arg in args.favorite for e in arg.split(",") if e.strip()],
+        metrics_port=args.metrics_port,
+        record_path=args.record_path,
+        slow_callback_ms=args.slow_callback_ms,
+        snapshot_dir=args.snapshot_dir,
         log_level=args.log_level,
+        ha_url=args.ha_url,
         ha_token=os.environ.get("SUPERVISOR_TOKEN", ""),
     )
 